@@ -0,0 +1,57 @@
+import random
+from typing import List
+
+
+BINARY_OPERATORS = ["&", "|", "=>", "<=>"]
+
+
+def get_variable_names(variable_count: int) -> List[str]:
+    return [f"x{i}" for i in range(variable_count)]
+
+
+def generate_expression(
+    rng: random.Random,
+    operator_count: int,
+    variable_count: int,
+    capture_count: int = 0,
+    depth: int = 0
+) -> str:
+    """
+    Random expression with operator_count binary operators split at random
+    points, so the tree stays shallow. The first leaves cover every
+    variable once, exactly capture_count subexpressions are captured and
+    the whole expression is wrapped in depth levels of "!( ... )".
+    """
+    operator_count = max(operator_count, variable_count - 1, capture_count)
+    names = get_variable_names(variable_count)
+    captured = set(rng.sample(range(operator_count), capture_count))
+    counters = {"leaf": 0, "operator": 0}
+
+    def build(count: int) -> str:
+        if count == 0:
+            leaf = counters["leaf"]
+            counters["leaf"] += 1
+            name = names[leaf] if leaf < len(names) else rng.choice(names)
+            return f"!{name}" if rng.random() < 0.25 else name
+        operator = counters["operator"]
+        counters["operator"] += 1
+        left_count = rng.randint(0, count - 1)
+        left = build(left_count)
+        right = build(count - 1 - left_count)
+        opening, closing = "[]" if operator in captured else "()"
+        return f"{opening}{left} {rng.choice(BINARY_OPERATORS)} {right}{closing}"
+
+    return "!(" * depth + build(operator_count) + ")" * depth
+
+
+def generate_corpus(
+    seed: int,
+    size: int,
+    operator_count: int,
+    variable_count: int,
+    capture_count: int = 0,
+    depth: int = 0
+) -> List[str]:
+    rng = random.Random(seed)
+    return [generate_expression(rng, operator_count, variable_count, capture_count, depth)
+            for _ in range(size)]
@@ -0,0 +1,71 @@
+import argparse
+import subprocess
+import sys
+from typing import List, Set, Tuple
+
+
+# What a short-lived headless worker imports.
+CORE_STATEMENT = (
+    "from parser import ExpressionParser, TableGenerator; "
+    "from bool_function import BoolFunctionManager")
+# Loaded on first use only; none of them may be pulled in by CORE_STATEMENT.
+LAZY_MODULES = ["tkinter", "numpy", "concurrent.futures", "multiprocessing",
+                "sqlite3", "cProfile", "solver.bdd", "solver.fingerprinter", "gui.gui"]
+IMPORT_TIME_BUDGET_MS = 50
+MARKER = "--import-time-start--"
+
+
+def measure_import_time(statement: str) -> Tuple[float, Set[str]]:
+    """
+    Runs statement in a fresh interpreter under -X importtime and returns
+    the milliseconds spent importing for it, not counting interpreter
+    startup, and the names of all modules loaded afterwards.
+    """
+    code = (f"import sys; sys.stderr.write({MARKER!r} + '\\n'); {statement}; "
+            "print('\\n'.join(sys.modules))")
+    process = subprocess.run([sys.executable, "-X", "importtime", "-c", code],
+                             capture_output=True, text=True, check=True)
+    lines = process.stderr.split(MARKER + "\n", 1)[1].splitlines()
+    total_us = 0
+    for line in lines:
+        if not line.startswith("import time:"):
+            continue
+        _, cumulative, name = line.split("|")
+        # Nested imports are indented and already part of their parent.
+        if not name.startswith("  "):
+            total_us += int(cumulative)
+    return total_us / 1000, set(process.stdout.split())
+
+
+def check_import_budget(statement: str = CORE_STATEMENT, budget_ms: float = IMPORT_TIME_BUDGET_MS,
+                        repeat: int = 5) -> List[str]:
+    """
+    Returns the problems found: eagerly loaded lazy modules and an import
+    time (best of repeat) over budget_ms.
+    """
+    runs = [measure_import_time(statement) for _ in range(repeat)]
+    milliseconds = min(ms for ms, _ in runs)
+    modules = runs[0][1]
+    problems = [f"{name} is imported eagerly" for name in LAZY_MODULES if name in modules]
+    if milliseconds > budget_ms:
+        problems.append(
+            f"import takes {milliseconds:.1f} ms, over the {budget_ms} ms budget")
+    print(f"{statement}: {milliseconds:.1f} ms", file=sys.stderr)
+    return problems
+
+
+def main(argv: List[str] = None) -> int:
+    arg_parser = argparse.ArgumentParser(
+        description="Check the import time of the headless core against a budget.")
+    arg_parser.add_argument("--budget-ms", type=float,
+                            default=IMPORT_TIME_BUDGET_MS)
+    arg_parser.add_argument("--repeat", type=int, default=5)
+    args = arg_parser.parse_args(argv)
+    problems = check_import_budget(budget_ms=args.budget_ms, repeat=args.repeat)
+    for problem in problems:
+        print(problem)
+    return 1 if len(problems) != 0 else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
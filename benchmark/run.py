@@ -0,0 +1,327 @@
+import argparse
+import json
+import math
+import os
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+from typing import Callable, Dict, List, Tuple
+
+from benchmark.corpus import generate_corpus, get_variable_names
+from bool_function.bool_function import BoolFunction
+from bool_function.bool_function_manager import BoolFunctionManager
+from bool_function.sqlite_bool_function_manager import SQLiteBoolFunctionManager
+from parser.expression_parser import ExpressionParser
+from parser.table_generator import TableGenerator
+
+
+# Parameter values per (benchmark, axis); "quick" is small enough for CI.
+SUITES: Dict[str, Dict[Tuple[str, str], List[int]]] = {
+    "full": {
+        ("tokenize", "length"): [16, 64, 256, 1024, 4096],
+        ("parse", "length"): [16, 64, 256, 1024, 4096],
+        ("parse", "depth"): [8, 64, 256, 1024],
+        ("parse", "captures"): [0, 8, 32, 128],
+        ("get_value", "variables"): [4, 6, 8, 10],
+        ("table_bitwise", "variables"): [4, 8, 12, 16],
+        ("table_bitwise", "captures"): [0, 4, 16, 64],
+        ("table_rowwise", "variables"): [4, 8, 12],
+        ("table_rows", "variables"): [12, 16, 20],
+        ("table_rows_parallel", "variables"): [12, 16, 20],
+        ("manager_save", "records"): [100, 1000, 10000],
+        ("manager_load_all", "records"): [100, 1000, 10000],
+        ("manager_load_by_name", "records"): [100, 1000, 10000],
+    },
+    "quick": {
+        ("tokenize", "length"): [16, 256],
+        ("parse", "length"): [16, 256],
+        ("parse", "depth"): [8, 64],
+        ("parse", "captures"): [0, 8],
+        ("get_value", "variables"): [4, 6],
+        ("table_bitwise", "variables"): [4, 8],
+        ("table_bitwise", "captures"): [0, 4],
+        ("table_rowwise", "variables"): [4, 8],
+        ("table_rows", "variables"): [8, 12],
+        ("table_rows_parallel", "variables"): [8, 12],
+        ("manager_save", "records"): [100],
+        ("manager_load_all", "records"): [100],
+        ("manager_load_by_name", "records"): [100],
+    },
+}
+
+# Defaults for the corpus dimensions that are not being varied.
+OPERATOR_COUNT = 32
+VARIABLE_COUNT = 8
+CAPTURE_OPERATOR_COUNT = 256
+TABLE_CAPTURE_VARIABLE_COUNT = 10
+MANAGER_CLASSES = [BoolFunctionManager, SQLiteBoolFunctionManager]
+
+
+class BenchmarkRunner:
+
+    """
+    Times every benchmark as the best of repeat runs over a generated
+    corpus, then reruns it once under tracemalloc for the peak memory.
+    """
+
+    def __init__(self, repeat: int = 3, corpus_size: int = 20, seed: int = 0):
+        self.repeat = repeat
+        self.corpus_size = corpus_size
+        self.seed = seed
+        self._base_path: str = None
+
+    def _corpus(self, operator_count: int = OPERATOR_COUNT, variable_count: int = VARIABLE_COUNT,
+                capture_count: int = 0, depth: int = 0) -> List[str]:
+        return generate_corpus(self.seed, self.corpus_size, operator_count,
+                               variable_count, capture_count, depth)
+
+    def _measure(self, function: Callable[[], None]) -> Tuple[float, int]:
+        seconds = math.inf
+        for _ in range(self.repeat):
+            start = time.perf_counter()
+            function()
+            seconds = min(seconds, time.perf_counter() - start)
+        tracemalloc.start()
+        try:
+            function()
+            _, peak_memory = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        return seconds, peak_memory
+
+    def _parse_all(self, expressions: List[str]) -> list:
+        expression_parser = ExpressionParser()
+        parsed = [expression_parser.parse(e) for e in expressions]
+        for _, _, err in parsed:
+            if err:
+                raise err
+        return parsed
+
+    def _prepare(self, benchmark: str, axis: str, parameter: int) -> Tuple[Callable[[], None], int, str]:
+        """
+        Returns the function to time, the number of items it processes and
+        the throughput unit.
+        """
+        if benchmark in ("tokenize", "parse"):
+            corpus = {
+                "length": lambda: self._corpus(operator_count=parameter),
+                "depth": lambda: self._corpus(depth=parameter),
+                "captures": lambda: self._corpus(
+                    operator_count=CAPTURE_OPERATOR_COUNT, capture_count=parameter),
+            }[axis]()
+            if benchmark == "tokenize":
+                expression_parser = ExpressionParser()
+                return (lambda: [expression_parser._tokenize(e) for e in corpus],
+                        sum(len(e) for e in corpus), "chars/s")
+
+            def parse():
+                # A fresh parser, so the parse cache never answers.
+                expression_parser = ExpressionParser(cache_size=0)
+                for expression in corpus:
+                    expression_parser.parse(expression)
+            return parse, len(corpus), "expressions/s"
+
+        if benchmark == "get_value":
+            parsed = self._parse_all(self._corpus(variable_count=parameter))
+            variable_dict = {name: i for i, name in enumerate(
+                get_variable_names(parameter))}
+            value_combinations = TableGenerator()._generate_value_combinations(
+                [None] * parameter, 0, parameter)
+
+            def get_value():
+                for tree, _, _ in parsed:
+                    for value_combination in value_combinations:
+                        tree.get_value(variable_dict, value_combination, {})
+            return get_value, len(parsed) * len(value_combinations), "rows/s"
+
+        if benchmark in ("table_bitwise", "table_rowwise"):
+            if axis == "variables":
+                variable_count = parameter
+                corpus = self._corpus(variable_count=variable_count)
+            else:
+                variable_count = TABLE_CAPTURE_VARIABLE_COUNT
+                corpus = self._corpus(operator_count=CAPTURE_OPERATOR_COUNT,
+                                      variable_count=variable_count, capture_count=parameter)
+            parsed = self._parse_all(corpus)
+            table_generator = TableGenerator(
+                bitwise=benchmark == "table_bitwise", cache_size=0)
+
+            def generate_table_content():
+                for tree, variables, _ in parsed:
+                    table_generator.generate_table_content(tree, variables)
+            return generate_table_content, len(parsed) << variable_count, "rows/s"
+
+        if benchmark in ("table_rows", "table_rows_parallel"):
+            # Row chunks of a single expression, serial against sharded over
+            # a process pool; the pool start-up is part of the parallel time.
+            expression = self._corpus(variable_count=parameter)[0]
+            table_generator = TableGenerator(cache_size=0)
+            if benchmark == "table_rows":
+                tree, variables, _ = self._parse_all([expression])[0]
+
+                def generate_rows():
+                    for _ in table_generator.generate_row_chunks(tree, variables, 1 << 16):
+                        pass
+            else:
+                def generate_rows():
+                    for _ in table_generator.generate_row_chunks_parallel(expression):
+                        pass
+            return generate_rows, 1 << parameter, "rows/s"
+
+        return self._prepare_manager(benchmark, parameter)
+
+    def _prepare_manager(self, benchmark: str, record_count: int) -> Tuple[Callable[[], None], int, str]:
+        base_path = self._base_path
+        prefix = f"{benchmark}_{record_count}"
+        expressions = self._corpus(operator_count=8)
+        bool_functions = [
+            BoolFunction(f"f{i}", expressions[i % len(expressions)],
+                         get_variable_names(VARIABLE_COUNT))
+            for i in range(record_count)]
+        for manager_class in MANAGER_CLASSES:
+            manager = manager_class(
+                f"{prefix}_{manager_class.__name__}", base_path)
+            manager.save_many(bool_functions)
+            if isinstance(manager, SQLiteBoolFunctionManager):
+                manager.close()
+        lookups = [f"f{i}" for i in range(0, record_count, max(record_count // 100, 1))]
+        runs = [0]
+
+        def run():
+            runs[0] += 1
+            for manager_class in MANAGER_CLASSES:
+                if benchmark == "manager_save":
+                    manager = manager_class(
+                        f"{prefix}_{manager_class.__name__}_{runs[0]}", base_path)
+                    manager.save_many(bool_functions)
+                else:
+                    manager = manager_class(
+                        f"{prefix}_{manager_class.__name__}", base_path)
+                    if benchmark == "manager_load_all":
+                        for _ in manager.load_all():
+                            pass
+                    else:
+                        for name in lookups:
+                            next(manager.load_by_name(name))
+                if isinstance(manager, SQLiteBoolFunctionManager):
+                    manager.close()
+
+        items = record_count if benchmark != "manager_load_by_name" else len(lookups)
+        return run, items * len(MANAGER_CLASSES), "records/s"
+
+    def _run_one(self, benchmark: str, axis: str, parameter: int) -> dict:
+        function, items, unit = self._prepare(benchmark, axis, parameter)
+        seconds, peak_memory = self._measure(function)
+        return {
+            "benchmark": benchmark,
+            "axis": axis,
+            "parameter": parameter,
+            "seconds": seconds,
+            "throughput": items / seconds if seconds > 0 else math.inf,
+            "unit": unit,
+            "peak_memory": peak_memory,
+        }
+
+    def run(self, suite: Dict[Tuple[str, str], List[int]], log=sys.stderr) -> dict:
+        results = []
+        directory = tempfile.TemporaryDirectory()
+        self._base_path = directory.name + os.sep
+        try:
+            for (benchmark, axis), parameters in suite.items():
+                for parameter in parameters:
+                    results.append(self._run_one(benchmark, axis, parameter))
+                    print(f"{get_result_key(results[-1]):40} {results[-1]['seconds']:10.4f} s "
+                          f"{results[-1]['throughput']:14.1f} {results[-1]['unit']:14} "
+                          f"{results[-1]['peak_memory'] / 1024:10.1f} KiB", file=log)
+        finally:
+            directory.cleanup()
+        return {
+            "metadata": {
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                "repeat": self.repeat,
+                "corpus_size": self.corpus_size,
+                "seed": self.seed,
+            },
+            "results": results,
+            "scaling": get_scaling(results),
+        }
+
+
+def get_result_key(result: dict) -> str:
+    return f"{result['benchmark']}[{result['axis']}={result['parameter']}]"
+
+
+def get_scaling(results: List[dict]) -> Dict[str, float]:
+    """
+    Least-squares slope of log(seconds) over log(parameter) per series, so
+    1.0 means linear and 2.0 quadratic scaling.
+    """
+    series: Dict[str, List[Tuple[float, float]]] = {}
+    for result in results:
+        if result["parameter"] > 0 and result["seconds"] > 0:
+            series.setdefault(f"{result['benchmark']}[{result['axis']}]", []).append(
+                (math.log(result["parameter"]), math.log(result["seconds"])))
+    scaling = {}
+    for name, points in series.items():
+        if len(points) < 2:
+            continue
+        mean_x = sum(x for x, _ in points) / len(points)
+        mean_y = sum(y for _, y in points) / len(points)
+        variance = sum((x - mean_x) ** 2 for x, _ in points)
+        scaling[name] = sum((x - mean_x) * (y - mean_y)
+                            for x, y in points) / variance
+    return scaling
+
+
+def compare(report: dict, baseline: dict, threshold: float) -> List[str]:
+    """
+    Returns the keys of results that got slower than the baseline by more
+    than threshold (0.25 = 25 %).
+    """
+    baseline_results = {get_result_key(result): result
+                        for result in baseline["results"]}
+    regressions = []
+    for result in report["results"]:
+        key = get_result_key(result)
+        if key in baseline_results and baseline_results[key]["seconds"] > 0:
+            ratio = result["seconds"] / baseline_results[key]["seconds"]
+            if ratio > 1 + threshold:
+                regressions.append(key)
+            print(f"{key:40} {ratio:6.2f}x{'  REGRESSION' if ratio > 1 + threshold else ''}")
+    return regressions
+
+
+def main(argv: List[str] = None) -> int:
+    arg_parser = argparse.ArgumentParser(
+        description="Benchmark tokenizing, parsing, evaluation, table generation and storage.")
+    arg_parser.add_argument("--suite", choices=SUITES, default="full")
+    arg_parser.add_argument("--repeat", type=int, default=3)
+    arg_parser.add_argument("--corpus-size", type=int, default=20)
+    arg_parser.add_argument("--seed", type=int, default=0)
+    arg_parser.add_argument("--output", default="benchmark_results.json",
+                            help="JSON file to write the results to")
+    arg_parser.add_argument("--compare", metavar="BASELINE",
+                            help="JSON results to compare against")
+    arg_parser.add_argument("--threshold", type=float, default=0.25,
+                            help="relative slowdown reported as a regression")
+    args = arg_parser.parse_args(argv)
+
+    runner = BenchmarkRunner(args.repeat, args.corpus_size, args.seed)
+    report = runner.run(SUITES[args.suite])
+    with open(args.output, "w") as file:
+        json.dump(report, file, indent=2)
+
+    if args.compare:
+        with open(args.compare, "r") as file:
+            baseline = json.load(file)
+        if len(compare(report, baseline, args.threshold)) != 0:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,27 @@
+"""
+Saved functions and the stores that keep them.
+Names are imported on first access (PEP 562), so importing the package
+itself costs next to nothing.
+"""
+import importlib
+from typing import Any, Dict, List
+
+_EXPORTS: Dict[str, str] = {
+    "BoolFunction": "bool_function.bool_function",
+    "BoolFunctionManager": "bool_function.bool_function_manager",
+    "SQLiteBoolFunctionManager": "bool_function.sqlite_bool_function_manager",
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name: str) -> Any:
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(_EXPORTS[name]), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> List[str]:
+    return sorted(set(globals()) | set(__all__))
@@ -1,46 +1,200 @@
-from typing import List, Generator, Union
+from typing import TYPE_CHECKING, Dict, List, Generator, Set, Tuple, Union
 from bool_function.bool_function import BoolFunction
 
+if TYPE_CHECKING:
+    from solver.fingerprinter import Fingerprinter
+
 
 class BoolFunctionManager:
 
     """
-    Need to throw / yield exception from generator functions
-    in case of fail
+    Functions are appended to a flat file, one record per line. An
+    in-memory index from name to the byte offset of its record is built
+    with a single scan on first use and kept up to date by save, so
+    lookups seek straight to the record.
+
+    Saved functions also get a semantic fingerprint (see Fingerprinter),
+    appended to a ".fingerprints" sidecar file as "[FINGERPRINT]:[NAME]".
+    Loaded into a fingerprint -> names index, it makes equivalence
+    lookups and duplicate detection a single probe. Fingerprinting is
+    not part of saving: records without a fingerprint yet are
+    fingerprinted in one batch whenever the index is next needed.
     """
-    
+
     # "[NAME]:[EXPRESSION]:[VARIABLES (comma separated)]"
     FUNCTION_FORMAT = "%s:%s:%s\n"
     BASE_PATH = "./data/"
+    ENCODING = "utf-8"
 
-    def __init__(self, filename: str):
+    def __init__(self, filename: str, base_path: str = None, fingerprinter: "Fingerprinter" = None):
         self._filename = filename
+        self._base_path = self.BASE_PATH if base_path is None else base_path
+        self._index: Dict[str, int] = None
+        self._fingerprinter = fingerprinter
+        self._fingerprint_index: Dict[str, List[str]] = None
+        # Names in _fingerprint_index, plus those that failed to fingerprint.
+        self._fingerprinted: Set[str] = None
+
+    def _get_path(self) -> str:
+        return f"{self._base_path}{self._filename}"
+
+    def _get_fingerprint_path(self) -> str:
+        return f"{self._get_path()}.fingerprints"
+
+    def _get_fingerprinter(self) -> "Fingerprinter":
+        # Imported here: parsing and the BDD are only needed once a
+        # fingerprint is, not to read and write records.
+        if self._fingerprinter is None:
+            from solver.fingerprinter import Fingerprinter
+            self._fingerprinter = Fingerprinter()
+        return self._fingerprinter
+
+    def _get_fingerprint(self, expression: str) -> Union[str, None]:
+        """
+        None for expressions that do not parse or fail to fingerprint;
+        those are left out of the index.
+        """
+        try:
+            return self._get_fingerprinter().get_expression_fingerprint(expression)
+        except Exception:
+            return None
+
+    def _add_fingerprints(self, fingerprints: List[Tuple[str, str]]) -> None:
+        with open(self._get_fingerprint_path(), "a", encoding=self.ENCODING) as file:
+            file.writelines(f"{fingerprint}:{name}\n" for name,
+                            fingerprint in fingerprints)
+        for name, fingerprint in fingerprints:
+            self._fingerprint_index.setdefault(fingerprint, []).append(name)
+
+    def _load_fingerprint_index(self) -> None:
+        index = self._get_index()
+        self._fingerprint_index, self._fingerprinted = {}, set()
+        try:
+            with open(self._get_fingerprint_path(), "r", encoding=self.ENCODING) as file:
+                for line in file:
+                    fingerprint, name = line.rstrip("\n").split(":", 1)
+                    # Empty fingerprints were written for failed records by
+                    # older versions; those records are tried again.
+                    if fingerprint and name in index and name not in self._fingerprinted:
+                        self._fingerprinted.add(name)
+                        self._fingerprint_index.setdefault(
+                            fingerprint, []).append(name)
+        except FileNotFoundError:
+            pass
+
+    def _get_fingerprint_index(self) -> Dict[str, List[str]]:
+        if self._fingerprint_index is None:
+            self._load_fingerprint_index()
+        index = self._get_index()
+        if len(self._fingerprinted) != len(index):
+            # One pass over the file instead of a seek per missing record;
+            # the first record of a name is the one the index points at.
+            fingerprints = []
+            for bool_function in self.load_all():
+                if bool_function.name in self._fingerprinted:
+                    continue
+                self._fingerprinted.add(bool_function.name)
+                fingerprint = self._get_fingerprint(bool_function.expression)
+                if fingerprint is not None:
+                    fingerprints.append((bool_function.name, fingerprint))
+            if len(fingerprints) != 0:
+                self._add_fingerprints(fingerprints)
+        return self._fingerprint_index
+
+    def _get_index(self) -> Dict[str, int]:
+        if self._index is None:
+            self._index = {}
+            try:
+                with open(self._get_path(), "rb") as file:
+                    offset = 0
+                    for line in file:
+                        if line.strip():
+                            name = line.split(b":", 1)[0].decode(
+                                self.ENCODING)
+                            self._index.setdefault(name, offset)
+                        offset += len(line)
+            except FileNotFoundError:
+                pass
+        return self._index
+
+    def _parse_record(self, line: bytes) -> BoolFunction:
+        name, rest = line.decode(self.ENCODING).rstrip("\n").split(":", 1)
+        expression, variables = rest.rsplit(":", 1)
+        variable_ls = variables.split(",") if variables else []
+        return BoolFunction(name, expression, variable_ls)
+
+    def reload_index(self) -> None:
+        self._index = None
+        self._fingerprint_index = None
+        self._fingerprinted = None
 
     def save(self, bool_function: BoolFunction) -> Union[Exception, None]:
-        for name in self.load_all_names():
-            if bool_function.name == name:
-                print("BAD")
-                # Throw / yield exception
-                return
+        index = self._get_index()
+        if bool_function.name in index:
+            return Exception(
+                f"Function with name {bool_function.name} already exists.")
         variables = ",".join(bool_function.variable_ls)
-        with open(f"{self.BASE_PATH}{self._filename}", "a") as file:
-            file.write(self.FUNCTION_FORMAT %
-                       (bool_function.name, bool_function.expression, variables))
+        record = self.FUNCTION_FORMAT % (
+            bool_function.name, bool_function.expression, variables)
+        with open(self._get_path(), "ab") as file:
+            offset = file.seek(0, 2)
+            file.write(record.encode(self.ENCODING))
+        index[bool_function.name] = offset
+        return None
+
+    def save_many(self, bool_functions: List[BoolFunction]) -> List[Union[Exception, None]]:
+        index = self._get_index()
+        results = []
+        with open(self._get_path(), "ab") as file:
+            offset = file.seek(0, 2)
+            for bool_function in bool_functions:
+                if bool_function.name in index:
+                    results.append(Exception(
+                        f"Function with name {bool_function.name} already exists."))
+                    continue
+                record = (self.FUNCTION_FORMAT % (
+                    bool_function.name, bool_function.expression,
+                    ",".join(bool_function.variable_ls))).encode(self.ENCODING)
+                file.write(record)
+                index[bool_function.name] = offset
+                offset += len(record)
+                results.append(None)
+        return results
 
     def load_all(self) -> Generator[BoolFunction, None, None]:
-        with open(f"{self.BASE_PATH}{self._filename}", "r") as file:
-            representation = file.read()
-            split_representation = representation.split("\n")
-            for result_ln in split_representation:
-                name, expression, variables = result_ln.split(":")
-                variable_ls = variables.split(",")
-                yield BoolFunction(name, expression, variable_ls)
+        try:
+            with open(self._get_path(), "rb") as file:
+                for line in file:
+                    if line.strip():
+                        yield self._parse_record(line)
+        except FileNotFoundError:
+            return
 
     def load_by_name(self, name: str) -> Generator[BoolFunction, None, None]:
-        for bool_function in self.load_all():
-            if bool_function.name == name:
-                yield bool_function
+        offset = self._get_index().get(name)
+        if offset is None:
+            return
+        with open(self._get_path(), "rb") as file:
+            file.seek(offset)
+            yield self._parse_record(file.readline())
 
     def load_all_names(self) -> Generator[str, None, None]:
-        for bool_function in self.load_all():
-            yield bool_function.name
+        yield from self._get_index()
+
+    def find_equivalent(self, expression: str) -> Generator[BoolFunction, None, None]:
+        """
+        Saved functions equivalent to expression, in saving order. Raises
+        if expression does not parse.
+        """
+        fingerprint = self._get_fingerprinter().get_expression_fingerprint(
+            expression)
+        for name in self._get_fingerprint_index().get(fingerprint, []):
+            yield from self.load_by_name(name)
+
+    def find_duplicates(self) -> List[List[str]]:
+        """
+        Names of the saved functions grouped by equivalence, for every
+        group with more than one function.
+        """
+        return [names for names in self._get_fingerprint_index().values()
+                if len(names) > 1]
@@ -0,0 +1,151 @@
+import sqlite3
+from typing import TYPE_CHECKING, Dict, Generator, List, Set, Union
+from bool_function.bool_function import BoolFunction
+
+if TYPE_CHECKING:
+    from solver.fingerprinter import Fingerprinter
+
+
+class SQLiteBoolFunctionManager:
+
+    """
+    BoolFunctionManager-compatible store backed by an SQLite database.
+    Names are unique-indexed, and neither names nor expressions are split
+    on separators, so they may contain ":". The database runs in WAL
+    mode so that several processes can read while one writes. Semantic
+    fingerprints (see Fingerprinter) live in an indexed column. Saving
+    leaves it NULL; it is filled in for all such rows in one batch by
+    the next equivalence lookup.
+    """
+
+    BASE_PATH = "./data/"
+    FETCH_SIZE = 1024
+
+    def __init__(self, filename: str, base_path: str = None, fingerprinter: "Fingerprinter" = None):
+        base_path = self.BASE_PATH if base_path is None else base_path
+        self._fingerprinter = fingerprinter
+        # Rows that failed to fingerprint keep a NULL fingerprint and are
+        # not tried again by this instance.
+        self._failed_ids: Set[int] = set()
+        self._connection = sqlite3.connect(f"{base_path}{filename}")
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        with self._connection:
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS functions ("
+                "id INTEGER PRIMARY KEY, "
+                "name TEXT NOT NULL UNIQUE, "
+                "expression TEXT NOT NULL, "
+                "variables TEXT NOT NULL, "
+                "fingerprint TEXT)")
+            columns = [row[1] for row in self._connection.execute(
+                "PRAGMA table_info(functions)")]
+            if "fingerprint" not in columns:
+                self._connection.execute(
+                    "ALTER TABLE functions ADD COLUMN fingerprint TEXT")
+            # Older versions stored failed fingerprints as ''.
+            self._connection.execute(
+                "UPDATE functions SET fingerprint = NULL WHERE fingerprint = ''")
+            self._connection.execute(
+                "CREATE INDEX IF NOT EXISTS functions_fingerprint ON functions (fingerprint)")
+
+    def close(self) -> None:
+        self._connection.close()
+
+    @staticmethod
+    def _to_bool_function(row: tuple) -> BoolFunction:
+        name, expression, variables = row
+        return BoolFunction(name, expression, variables.split(",") if variables else [])
+
+    def _get_fingerprinter(self) -> "Fingerprinter":
+        if self._fingerprinter is None:
+            from solver.fingerprinter import Fingerprinter
+            self._fingerprinter = Fingerprinter()
+        return self._fingerprinter
+
+    def _get_fingerprint(self, expression: str) -> Union[str, None]:
+        try:
+            return self._get_fingerprinter().get_expression_fingerprint(expression)
+        except Exception:
+            return None
+
+    def _insert(self, bool_function: BoolFunction) -> Union[Exception, None]:
+        cursor = self._connection.execute(
+            "INSERT OR IGNORE INTO functions (name, expression, variables) "
+            "VALUES (?, ?, ?)",
+            (bool_function.name, bool_function.expression, ",".join(bool_function.variable_ls)))
+        if cursor.rowcount == 0:
+            return Exception(
+                f"Function with name {bool_function.name} already exists.")
+        return None
+
+    def save(self, bool_function: BoolFunction) -> Union[Exception, None]:
+        with self._connection:
+            return self._insert(bool_function)
+
+    def save_many(self, bool_functions: List[BoolFunction]) -> List[Union[Exception, None]]:
+        with self._connection:
+            return [self._insert(bool_function) for bool_function in bool_functions]
+
+    def load_all(self) -> Generator[BoolFunction, None, None]:
+        cursor = self._connection.execute(
+            "SELECT name, expression, variables FROM functions ORDER BY id")
+        while True:
+            rows = cursor.fetchmany(self.FETCH_SIZE)
+            if len(rows) == 0:
+                return
+            for row in rows:
+                yield self._to_bool_function(row)
+
+    def load_by_name(self, name: str) -> Generator[BoolFunction, None, None]:
+        row = self._connection.execute(
+            "SELECT name, expression, variables FROM functions WHERE name = ?",
+            (name,)).fetchone()
+        if row is not None:
+            yield self._to_bool_function(row)
+
+    def load_all_names(self) -> Generator[str, None, None]:
+        cursor = self._connection.execute(
+            "SELECT name FROM functions ORDER BY id")
+        while True:
+            rows = cursor.fetchmany(self.FETCH_SIZE)
+            if len(rows) == 0:
+                return
+            for (name,) in rows:
+                yield name
+
+    def _fill_fingerprints(self) -> None:
+        fingerprints = []
+        for id, expression in self._connection.execute(
+                "SELECT id, expression FROM functions WHERE fingerprint IS NULL").fetchall():
+            if id in self._failed_ids:
+                continue
+            fingerprint = self._get_fingerprint(expression)
+            if fingerprint is None:
+                self._failed_ids.add(id)
+            else:
+                fingerprints.append((fingerprint, id))
+        if len(fingerprints) == 0:
+            return
+        with self._connection:
+            self._connection.executemany(
+                "UPDATE functions SET fingerprint = ? WHERE id = ?", fingerprints)
+
+    def find_equivalent(self, expression: str) -> Generator[BoolFunction, None, None]:
+        fingerprint = self._get_fingerprinter().get_expression_fingerprint(
+            expression)
+        self._fill_fingerprints()
+        cursor = self._connection.execute(
+            "SELECT name, expression, variables FROM functions WHERE fingerprint = ? ORDER BY id",
+            (fingerprint,))
+        for row in cursor.fetchall():
+            yield self._to_bool_function(row)
+
+    def find_duplicates(self) -> List[List[str]]:
+        self._fill_fingerprints()
+        groups: Dict[str, List[str]] = {}
+        for fingerprint, name in self._connection.execute(
+                "SELECT fingerprint, name FROM functions WHERE fingerprint IN ("
+                "SELECT fingerprint FROM functions WHERE fingerprint IS NOT NULL "
+                "GROUP BY fingerprint HAVING COUNT(*) > 1) ORDER BY id"):
+            groups.setdefault(fingerprint, []).append(name)
+        return list(groups.values())
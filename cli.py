@@ -0,0 +1,227 @@
+import argparse
+import csv
+import io
+import json
+import logging
+import os
+import sys
+from collections import deque
+from typing import TYPE_CHECKING, Deque, Generator, Iterable, Iterator, List, Tuple, Union
+
+from parser.expression_parser import ExpressionParser
+from parser.metrics import Metrics
+from parser.table_generator import TableGenerator
+
+if TYPE_CHECKING:
+    from concurrent.futures import Future
+
+
+logger = logging.getLogger(__name__)
+
+MODES = ("table", "column", "sat", "count")
+FORMATS = ("csv", "jsonl")
+
+# CSV columns per mode, written once as the header; error records leave
+# the result columns empty. Table columns depend on the expression, so
+# table mode writes a header row per expression instead.
+CSV_FIELDS = {
+    "table": ["id", "expression", "error"],
+    "column": ["id", "expression", "variables", "column", "error"],
+    "sat": ["id", "expression", "satisfiable", "assignment", "error"],
+    "count": ["id", "expression", "count", "error"],
+}
+
+# Per process, so --jobs workers keep their parse caches between lines.
+_metrics = Metrics()
+_expression_parser = ExpressionParser(metrics=_metrics, optimize=True)
+_table_generator = TableGenerator(cache_size=0, metrics=_metrics)
+
+# Tables from this many variables on get their rows sharded over --jobs
+# processes; smaller ones are not worth starting a pool for.
+PARALLEL_TABLE_VARIABLES = 16
+
+
+def _format_records(records: List[Union[dict, list]], mode: str, output_format: str) -> List[str]:
+    if output_format == "jsonl":
+        return [json.dumps(record) + "\n" for record in records]
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator="\n")
+    for record in records:
+        writer.writerow([record.get(field, "") for field in CSV_FIELDS[mode]]
+                        if isinstance(record, dict) else record)
+    return [buffer.getvalue()]
+
+
+def _format_error(expression_id: str, expression: str, err: Exception, mode: str, output_format: str) -> List[str]:
+    return _format_records([{"id": expression_id, "expression": expression,
+                             "error": str(err) or type(err).__name__}], mode, output_format)
+
+
+def generate_output(
+    expression_id: str,
+    expression: str,
+    mode: str,
+    output_format: str,
+    jobs: int = 1
+) -> Generator[str, None, None]:
+    """
+    Yields the output of one expression. Any failure ends the expression
+    with an error record instead of the whole run; in table mode it may
+    follow rows that were already written. With jobs, the rows of large
+    tables are generated by that many worker processes.
+    """
+    try:
+        yield from _generate_output(expression_id, expression, mode, output_format, jobs)
+    except Exception as e:
+        logger.debug("Evaluating %s failed", expression_id, exc_info=True)
+        yield from _format_error(expression_id, expression, e, mode, output_format)
+
+
+def _generate_output(
+    expression_id: str,
+    expression: str,
+    mode: str,
+    output_format: str,
+    jobs: int
+) -> Generator[str, None, None]:
+    tree, variables, err = _expression_parser.parse(expression)
+    if err:
+        yield from _format_error(expression_id, expression, err, mode, output_format)
+        return
+    variable_ls = sorted(list(variables), key=str.casefold)
+
+    if mode == "table":
+        header = _table_generator.get_table_header(tree, variables)
+        jsonl = output_format == "jsonl"
+        yield from _format_records(
+            [{"id": expression_id, "expression": expression, "header": header}
+             if jsonl else ["id"] + header], mode, output_format)
+        if jobs > 1 and len(variables) >= PARALLEL_TABLE_VARIABLES:
+            chunks = _table_generator.generate_row_chunks_parallel(
+                expression, workers=jobs)
+        else:
+            chunks = _table_generator.generate_row_chunks(tree, variables)
+        for chunk in chunks:
+            rows = [[int(x) for x in row] for row in chunk]
+            yield from _format_records(
+                [{"id": expression_id, "row": row} if jsonl else [expression_id] + row
+                 for row in rows], mode, output_format)
+        return
+
+    record = {"id": expression_id, "expression": expression}
+    if mode == "column":
+        _, masks = _table_generator.generate_table_masks(tree, variables)
+        record["variables"] = variable_ls if output_format == "jsonl" else ",".join(
+            variable_ls)
+        record["column"] = format(
+            masks[-1], f"0{1 << len(variable_ls)}b")[::-1]
+    elif mode == "sat":
+        from solver.sat_solver import SATSolver
+        assignment = SATSolver().solve(tree)
+        record["satisfiable"] = assignment is not None
+        if assignment is not None:
+            # The optimizer may have dropped variables the result does not
+            # depend on; any value satisfies those.
+            assignment = {name: assignment.get(name, False)
+                          for name in variable_ls}
+        if output_format == "jsonl":
+            record["assignment"] = assignment
+        else:
+            record["assignment"] = "" if assignment is None else " ".join(
+                f"{name}={int(value)}" for name, value in assignment.items())
+    elif mode == "count":
+        from solver.bdd import BDD
+        record["count"] = BDD(variable_ls).count_satisfying(tree)
+    yield from _format_records([record], mode, output_format)
+
+
+def evaluate_expression(expression_id: str, expression: str, mode: str, output_format: str) -> List[str]:
+    """
+    Collects the output of one expression, for running in a process pool.
+    """
+    return list(generate_output(expression_id, expression, mode, output_format))
+
+
+def read_expressions(args: argparse.Namespace) -> Iterator[Tuple[str, str]]:
+    if args.functions:
+        from bool_function.bool_function_manager import BoolFunctionManager
+        for bool_function in BoolFunctionManager(args.functions).load_all():
+            yield bool_function.name, bool_function.expression
+        return
+    file = sys.stdin if args.input == "-" else open(args.input, "r")
+    try:
+        for line_number, line in enumerate(file, 1):
+            if line.strip():
+                yield str(line_number), line.strip()
+    finally:
+        if file is not sys.stdin:
+            file.close()
+
+
+def run(expressions: Iterable[Tuple[str, str]], mode: str, output_format: str, jobs: int, output) -> None:
+    if output_format == "csv" and mode != "table":
+        output.writelines(_format_records([CSV_FIELDS[mode]], mode, output_format))
+    if jobs <= 1 or mode == "table":
+        # A whole table would have to be collected in a worker before it
+        # could be written, so tables stream from this process and only
+        # their rows are spread over the workers.
+        for expression_id, expression in expressions:
+            output.writelines(generate_output(
+                expression_id, expression, mode, output_format, jobs))
+        return
+
+    # Bounded window of in-flight expressions, written in input order.
+    from concurrent.futures import ProcessPoolExecutor
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        pending: Deque["Future"] = deque()
+        for expression_id, expression in expressions:
+            pending.append(executor.submit(
+                evaluate_expression, expression_id, expression, mode, output_format))
+            if len(pending) >= 4 * jobs:
+                output.writelines(pending.popleft().result())
+        while len(pending) != 0:
+            output.writelines(pending.popleft().result())
+
+
+def main(argv: List[str] = None):
+    arg_parser = argparse.ArgumentParser(
+        description="Evaluate logical expressions without the GUI, one per line.")
+    arg_parser.add_argument("input", nargs="?", default="-",
+                            help="file with one expression per line, - for stdin")
+    arg_parser.add_argument("--functions", metavar="FILENAME",
+                            help="read expressions from a saved functions file instead")
+    arg_parser.add_argument("--mode", choices=MODES, default="column")
+    arg_parser.add_argument("--format", choices=FORMATS, default="jsonl")
+    arg_parser.add_argument("--jobs", type=int, default=1,
+                            help="number of worker processes")
+    arg_parser.add_argument("--output", default="-",
+                            help="output file, - for stdout")
+    arg_parser.add_argument("--log-level", default="WARNING",
+                            choices=["DEBUG", "INFO", "WARNING", "ERROR"])
+    arg_parser.add_argument("--metrics", action="store_true",
+                            help="print stage timings and counters to stderr (without --jobs)")
+    arg_parser.add_argument("--profile", metavar="FILENAME",
+                            help="write cProfile stats of table generation (without --jobs)")
+    args = arg_parser.parse_args(argv)
+    logging.basicConfig(level=args.log_level)
+    if args.profile:
+        import cProfile
+        _metrics.profiler = cProfile.Profile()
+
+    output = sys.stdout if args.output == "-" else open(args.output, "w")
+    try:
+        run(read_expressions(args), args.mode, args.format, args.jobs, output)
+    except BrokenPipeError:
+        # The reader went away (e.g. piped into head); stop quietly.
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+    finally:
+        if output is not sys.stdout:
+            output.close()
+    if args.metrics:
+        print(json.dumps(_metrics.get_snapshot(), indent=2), file=sys.stderr)
+    if args.profile:
+        _metrics.profiler.dump_stats(args.profile)
+
+
+if __name__ == "__main__":
+    main()
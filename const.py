@@ -1 +1,5 @@
 WIN_WIDTH, WIN_HEIGHT = 960, 720
+MAX_DISPLAY_VARIABLES = 24
+# Tables up to this size are previewed while typing.
+LIVE_PREVIEW_MAX_VARIABLES = 16
+LIVE_PREVIEW_DELAY_MS = 30
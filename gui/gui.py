@@ -1,17 +1,26 @@
 import tkinter as tk
+from typing import List, Union
 
+from const import LIVE_PREVIEW_DELAY_MS, LIVE_PREVIEW_MAX_VARIABLES, MAX_DISPLAY_VARIABLES
 from gui.logic_table import LogicTable
+from gui.table_worker import TableWorker
 from parser.expression_parser import ExpressionParser
+from parser.live_evaluator import LiveEvaluator
 from parser.table_generator import TableGenerator
 from bool_function.bool_function_manager import BoolFunctionManager
 from bool_function.bool_function import BoolFunction
 
 
 class GUI(tk.Frame):
-    def __init__(self, *, master, expression_parser: ExpressionParser, table_generator: TableGenerator, bool_function_manager: BoolFunctionManager):
+    POLL_INTERVAL_MS = 50
+
+    def __init__(self, *, master, expression_parser: ExpressionParser, live_expression_parser: ExpressionParser, table_generator: TableGenerator, bool_function_manager: BoolFunctionManager):
         tk.Frame.__init__(self, master)
         self.master = master
         self.expression_parser = expression_parser
+        # The live preview keeps parser state between edits, so it gets an
+        # instance of its own rather than sharing expression_parser.
+        self.live_expression_parser = live_expression_parser
         self.table_generator = table_generator
         self.bool_function_manager = bool_function_manager
         self.pack()
@@ -24,8 +33,11 @@ class GUI(tk.Frame):
     def setup(self):
         self.setup_entry_expression()
         self.setup_button_generate_table()
+        self.setup_button_cancel_generation()
+        self.setup_checkbutton_live_preview()
         #self.setup_button_save_function()
         self.setup_label_error_message()
+        self.setup_label_progress()
         self.setup_logic_table()
 
     def setup_entry_expression(self):
@@ -40,6 +52,7 @@ class GUI(tk.Frame):
                 self.entry_expression_content.set(value[:maxlen])
                 self.entry_expression_previous_value = value
             self.entry_expression_has_changed = True
+            self.schedule_live_preview()
 
         self.entry_expression = tk.Entry(
             self, width=50, borderwidth=3, relief="sunken",
@@ -50,25 +63,143 @@ class GUI(tk.Frame):
         self.entry_expression.pack(side="top")
 
     def setup_button_generate_table(self):
+        self.table_worker: TableWorker = None
+        self.table_chunks: List[List[int]] = []
+        self.table_chunk_size = 1
+        self.table_variable_count = 0
+        self.table_row_count = 0
+
         def on_button_generate_table_click():
             if not self.entry_expression_has_changed:
                 return
+            self.cancel_table_worker()
             expr = self.entry_expression_content.get().strip()
+            # Parsed here, as the parser is shared with other callers on
+            # this thread and is not thread-safe; the worker gets the tree.
             tree, variables, err = self.expression_parser.parse(expr)
             if err:
                 self.label_error_message_content.set(str(err))
                 return
-            self.label_error_message_content.set("")
-            content = self.table_generator.generate_table_content(
-                tree, variables)
             self.entry_expression_has_changed = False
-            self.logic_table.populate(content)
-            self.current_variable_ls = variables
+            self.table_worker = TableWorker(
+                self.table_generator, tree, variables)
+            self.table_worker.start()
+            self.button_cancel_generation.configure(state="normal")
+            self.after(self.POLL_INTERVAL_MS,
+                       self.poll_table_worker, self.table_worker)
 
         self.button_generate_table = tk.Button(
             self, text="Generate Table", command=on_button_generate_table_click)
         self.button_generate_table.pack(side="top")
 
+    def setup_button_cancel_generation(self):
+        self.button_cancel_generation = tk.Button(
+            self, text="Cancel", state="disabled", command=self.cancel_table_worker)
+        self.button_cancel_generation.pack(side="top")
+
+    def setup_checkbutton_live_preview(self):
+        self.live_evaluator = LiveEvaluator(
+            self.live_expression_parser, self.table_generator)
+        self.live_preview_after_id = None
+        self.live_preview_enabled = tk.BooleanVar(value=True)
+        self.checkbutton_live_preview = tk.Checkbutton(
+            self, text="Live preview", variable=self.live_preview_enabled,
+            command=self.schedule_live_preview)
+        self.checkbutton_live_preview.pack(side="top")
+
+    def schedule_live_preview(self):
+        # Debounced: a burst of keystrokes evaluates once, after the last.
+        if self.live_preview_after_id is not None:
+            self.after_cancel(self.live_preview_after_id)
+            self.live_preview_after_id = None
+        if self.live_preview_enabled.get():
+            self.live_preview_after_id = self.after(
+                LIVE_PREVIEW_DELAY_MS, self.update_live_preview)
+
+    def update_live_preview(self):
+        self.live_preview_after_id = None
+        expr = self.entry_expression_content.get().strip()
+        if len(expr) == 0:
+            return
+        try:
+            tree, variables = self.live_evaluator.parse(expr)
+            if len(variables) > LIVE_PREVIEW_MAX_VARIABLES:
+                self.label_error_message_content.set("")
+                self.label_progress_content.set(
+                    "Press Generate Table for tables this large.")
+                return
+            header, masks = self.live_evaluator.evaluate(tree, variables)
+        except Exception as e:
+            self.label_error_message_content.set(str(e))
+            return
+
+        self.cancel_table_worker()
+        self.entry_expression_has_changed = False
+        variable_count = len(variables)
+        row_count = 1 << variable_count
+        self.label_error_message_content.set("")
+        self.table_chunks = [masks]
+        self.table_chunk_size = row_count
+        self.table_variable_count = variable_count
+        self.table_row_count = row_count
+        self.current_variable_ls = header[:variable_count]
+        self.logic_table.populate(
+            header, row_count, self.get_table_rows, keep_position=True)
+        self.label_progress_content.set(f"{row_count} / {row_count} rows")
+
+    def cancel_table_worker(self):
+        if self.table_worker is None:
+            return
+        self.table_worker.cancel()
+        self.table_worker = None
+        self.button_cancel_generation.configure(state="disabled")
+        # Let the same expression be generated again after a cancel.
+        self.entry_expression_has_changed = True
+
+    def poll_table_worker(self, worker: TableWorker):
+        if worker is not self.table_worker:
+            return
+        for kind, payload in worker.get_messages():
+            if kind == "header":
+                header, variables, row_count = payload
+                if len(variables) > MAX_DISPLAY_VARIABLES:
+                    self.label_error_message_content.set(
+                        "Too many variables, cannot show table.")
+                    self.cancel_table_worker()
+                    return
+                self.label_error_message_content.set("")
+                self.table_chunks = []
+                self.table_chunk_size = worker.chunk_size
+                self.table_variable_count = len(variables)
+                self.table_row_count = row_count
+                self.current_variable_ls = header[:len(variables)]
+                self.logic_table.populate(header, 0, self.get_table_rows)
+            elif kind == "chunk":
+                self.table_chunks.append(payload)
+            elif kind in ("done", "cancelled"):
+                self.table_worker = None
+                self.button_cancel_generation.configure(state="disabled")
+
+        if len(self.table_chunks) != 0:
+            row_count = min(len(self.table_chunks) *
+                            self.table_chunk_size, self.table_row_count)
+            self.logic_table.set_row_count(row_count)
+            self.label_progress_content.set(
+                f"{row_count} / {self.table_row_count} rows")
+        if self.table_worker is worker:
+            self.after(self.POLL_INTERVAL_MS, self.poll_table_worker, worker)
+
+    def get_table_rows(self, start: int, stop: int) -> List[List[Union[int, bool]]]:
+        rows = []
+        while start < stop:
+            chunk_idx, offset = divmod(start, self.table_chunk_size)
+            count = min(self.table_chunk_size - offset, stop - start)
+            masks = [mask >> offset for mask in self.table_chunks[chunk_idx]]
+            rows += self.table_generator.masks_to_rows(
+                masks, self.table_variable_count, count)
+            start += count
+        return rows
+
     def setup_button_save_function(self):
         def on_button_save_function():
             if len(self.entry_expression_content.get()) == 0:
@@ -77,7 +208,9 @@ class GUI(tk.Frame):
                 return
             new_function = BoolFunction(
                 "FUNCTION_NAME", self.entry_expression_content.get(), self.current_variable_ls)
-            self.bool_function_manager.save(new_function)
+            err = self.bool_function_manager.save(new_function)
+            if err:
+                self.label_error_message_content.set(str(err))
         self.button_save_function = tk.Button(
             self, text="Save Last Function", command=on_button_save_function)
         self.button_save_function.pack(side="top")
@@ -88,6 +221,12 @@ class GUI(tk.Frame):
             self, textvariable=self.label_error_message_content, fg="#f00")
         self.label_error_message.pack(side="top")
 
+    def setup_label_progress(self):
+        self.label_progress_content = tk.StringVar()
+        self.label_progress = tk.Label(
+            self, textvariable=self.label_progress_content)
+        self.label_progress.pack(side="top")
+
     def setup_logic_table(self):
         self.logic_table = LogicTable(self)
         self.logic_table.pack(side="bottom")
@@ -1,32 +1,119 @@
 import tkinter as tk
-from tkinter.font import BOLD, ITALIC
-from typing import List, Union
+from typing import Callable, List, Union
+
+
+RowSource = Callable[[int, int], List[List[Union[str, int, bool]]]]
 
 
 class LogicTable(tk.Frame):
-    def __init__(self, master):
+
+    """
+    Virtualized table: only the visible window of rows exists as canvas
+    items. Rows are pulled from row_source(start, stop) whenever the
+    window moves, and the same items are reused for every table.
+    """
+
+    CELL_WIDTH, ROW_HEIGHT = 120, 30
+    FONT = ("Helvetica", 16)
+
+    def __init__(self, master, visible_row_count: int = 16, width: int = 900):
         tk.Frame.__init__(self, master)
-        self.entries: List[List[tk.Widget]] = []
+        self._visible_row_count = visible_row_count
+        self._header: List[str] = []
+        self._row_count = 0
+        self._row_source: RowSource = lambda start, stop: []
+        self._first_row = 0
+        # Canvas text items, one list per displayed row (header first).
+        self._cells: List[List[int]] = []
+
+        self.canvas = tk.Canvas(
+            self, width=width, height=(visible_row_count + 1) * self.ROW_HEIGHT,
+            highlightthickness=0)
+        self.scrollbar_y = tk.Scrollbar(
+            self, orient="vertical", command=self._on_scroll_y)
+        self.scrollbar_x = tk.Scrollbar(
+            self, orient="horizontal", command=self.canvas.xview)
+        self.canvas.configure(xscrollcommand=self.scrollbar_x.set)
+        self.canvas.grid(row=0, column=0)
+        self.scrollbar_y.grid(row=0, column=1, sticky="ns")
+        self.scrollbar_x.grid(row=1, column=0, sticky="ew")
+
+        self.canvas.bind("<MouseWheel>", self._on_mouse_wheel)
+        self.canvas.bind("<Button-4>", lambda _: self._scroll_to(self._first_row - 3))
+        self.canvas.bind("<Button-5>", lambda _: self._scroll_to(self._first_row + 3))
 
     def _clear(self):
-        if len(self.entries) == 0:
-            return
-        rcount, ccount = len(self.entries), len(self.entries[0])
-        for i in range(rcount):
-            for j in range(ccount):
-                self.entries[i][j].grid_forget()
-        self.entries: List[List[tk.Widget]] = []
-
-    def populate(self, data: List[List[Union[str, bool]]]):
+        self.canvas.delete("all")
+        self._cells = []
+
+    def _create_cells(self, column_count: int):
         self._clear()
-        rcount, ccount = len(data), len(data[0])
-        self.entries = [[None for _ in range(ccount)] for _ in range(rcount)]
-        strvars = [[None for _ in range(ccount)] for _ in range(rcount)]
-        for i in range(rcount):
-            for j in range(ccount):
-                strvars[i][j] = tk.StringVar(value=data[i][j])
-                font_weight = "bold" if i == 0 else "normal"
-                self.entries[i][j] = tk.Entry(
-                    self, width=10, textvariable=strvars[i][j], font=("Helvetica", 16, font_weight))
-                self.entries[i][j].grid(row=i, column=j)
-                self.entries[i][j].configure(state="readonly")
+        for i in range(self._visible_row_count + 1):
+            font = self.FONT + (("bold",) if i == 0 else ())
+            row_cells = []
+            for j in range(column_count):
+                x, y = j * self.CELL_WIDTH, i * self.ROW_HEIGHT
+                self.canvas.create_rectangle(
+                    x, y, x + self.CELL_WIDTH, y + self.ROW_HEIGHT, outline="#888")
+                row_cells.append(self.canvas.create_text(
+                    x + self.CELL_WIDTH // 2, y + self.ROW_HEIGHT // 2, font=font))
+            self._cells.append(row_cells)
+        self.canvas.configure(scrollregion=(
+            0, 0, column_count * self.CELL_WIDTH,
+            (self._visible_row_count + 1) * self.ROW_HEIGHT))
+
+    @staticmethod
+    def _format(value: Union[str, int, bool]) -> str:
+        return value if isinstance(value, str) else str(int(value))
+
+    def _render(self):
+        stop = min(self._first_row + self._visible_row_count, self._row_count)
+        rows = self._row_source(self._first_row, stop)
+        for j, item in enumerate(self._cells[0]):
+            self.canvas.itemconfigure(item, text=self._header[j])
+        for i, row_cells in enumerate(self._cells[1:]):
+            row = rows[i] if i < len(rows) else None
+            for j, item in enumerate(row_cells):
+                self.canvas.itemconfigure(
+                    item, text="" if row is None else self._format(row[j]))
+        if self._row_count == 0:
+            self.scrollbar_y.set(0, 1)
+        else:
+            self.scrollbar_y.set(self._first_row / self._row_count,
+                                 stop / self._row_count)
+
+    def _scroll_to(self, first_row: int):
+        first_row = max(0, min(
+            first_row, self._row_count - self._visible_row_count))
+        if first_row != self._first_row:
+            self._first_row = first_row
+            self._render()
+
+    def _on_scroll_y(self, action: str, amount: str, unit: str = None):
+        if action == "moveto":
+            self._scroll_to(int(float(amount) * self._row_count))
+        elif unit == "pages":
+            self._scroll_to(
+                self._first_row + int(amount) * self._visible_row_count)
+        else:
+            self._scroll_to(self._first_row + int(amount))
+
+    def _on_mouse_wheel(self, event: tk.Event):
+        self._scroll_to(self._first_row - (1 if event.delta > 0 else -1) * 3)
+
+    def populate(self, header: List[str], row_count: int, row_source: RowSource, keep_position: bool = False):
+        if len(header) != len(self._header):
+            self._create_cells(len(header))
+        self._header = header
+        self._row_count = row_count
+        self._row_source = row_source
+        if keep_position:
+            self._first_row = max(0, min(
+                self._first_row, row_count - self._visible_row_count))
+        else:
+            self._first_row = 0
+        self._render()
+
+    def set_row_count(self, row_count: int):
+        self._row_count = row_count
+        self._render()
@@ -0,0 +1,62 @@
+import queue
+import threading
+from typing import Any, List, Set, Tuple
+
+from parser.table_generator import TableGenerator
+from parser.tree_node import TreeNode
+
+
+class TableWorker(threading.Thread):
+
+    """
+    Generates the table of an already parsed tree off the Tk main thread.
+    The parser is not thread-safe, so parsing stays with the caller and a
+    cancelled worker that is still running only reads its own tree.
+    Results are put on the messages queue as (kind, payload) tuples:
+    ("header", (header, variables, row_count)), ("chunk", masks) for every
+    chunk_size rows, then ("done", None) or ("cancelled", None). The GUI
+    drains the queue from after() callbacks.
+    """
+
+    def __init__(
+        self,
+        table_generator: TableGenerator,
+        tree: TreeNode,
+        variables: Set[str],
+        chunk_size: int = 4096
+    ):
+        threading.Thread.__init__(self, daemon=True)
+        self.table_generator = table_generator
+        self.tree = tree
+        self.variables = variables
+        self.chunk_size = chunk_size
+        self.messages: queue.Queue = queue.Queue()
+        self._cancel_event = threading.Event()
+
+    def cancel(self):
+        self._cancel_event.set()
+
+    def is_cancelled(self) -> bool:
+        return self._cancel_event.is_set()
+
+    def get_messages(self) -> List[Tuple[str, Any]]:
+        messages = []
+        while True:
+            try:
+                messages.append(self.messages.get_nowait())
+            except queue.Empty:
+                return messages
+
+    def run(self):
+        tree, variables = self.tree, self.variables
+        row_count = 1 << len(variables)
+        self.messages.put(("header", (self.table_generator.get_table_header(
+            tree, variables), variables, row_count)))
+        for start in range(0, row_count, self.chunk_size):
+            if self.is_cancelled():
+                self.messages.put(("cancelled", None))
+                return
+            _, masks = self.table_generator.generate_table_masks(
+                tree, variables, start, min(start + self.chunk_size, row_count))
+            self.messages.put(("chunk", masks))
+        self.messages.put(("done", None))
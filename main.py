@@ -1,23 +1,27 @@
-import tkinter as tk
 from const import WIN_WIDTH, WIN_HEIGHT
-from gui.gui import GUI
-from parser.expression_parser import ExpressionParser
-from parser.table_generator import TableGenerator
-from bool_function.bool_function_manager import BoolFunctionManager
 
 
 def main():
+    # tkinter and the GUI are imported here rather than at module level,
+    # so importing this module (or the library packages) stays headless.
+    import tkinter as tk
+    from gui.gui import GUI
+    from parser.expression_parser import ExpressionParser
+    from parser.table_generator import TableGenerator
+    from bool_function.bool_function_manager import BoolFunctionManager
+
     root = tk.Tk(className="truthtables")
     root.geometry(f"{WIN_WIDTH}x{WIN_HEIGHT}")
     root.minsize(WIN_WIDTH, WIN_HEIGHT)
     root.maxsize(WIN_WIDTH, WIN_HEIGHT)
 
-    expression_parser = ExpressionParser()
+    expression_parser = ExpressionParser(optimize=True)
+    live_expression_parser = ExpressionParser(optimize=True)
     table_generator = TableGenerator()
     bool_function_manager = BoolFunctionManager("functions")
 
     gui = GUI(master=root, expression_parser=expression_parser,
-              table_generator=table_generator, bool_function_manager=bool_function_manager)
+              live_expression_parser=live_expression_parser, table_generator=table_generator, bool_function_manager=bool_function_manager)
     gui.mainloop()
 
 
@@ -0,0 +1,32 @@
+"""
+Headless core: expression parsing, evaluation and table generation.
+Names are imported on first access (PEP 562), so importing the package
+itself costs next to nothing.
+"""
+import importlib
+from typing import Any, Dict, List
+
+_EXPORTS: Dict[str, str] = {
+    "ExpressionParser": "parser.expression_parser",
+    "TreeNode": "parser.tree_node",
+    "TreeOptimizer": "parser.tree_optimizer",
+    "TableGenerator": "parser.table_generator",
+    "LiveEvaluator": "parser.live_evaluator",
+    "Metrics": "parser.metrics",
+    "TableFileReader": "parser.table_file",
+    "write_table_file": "parser.table_file",
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name: str) -> Any:
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(_EXPORTS[name]), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> List[str]:
+    return sorted(set(globals()) | set(__all__))
@@ -1,7 +1,16 @@
+import bisect
+import logging
 import re
-from typing import Callable, List, Set, Tuple, Union
+from typing import Dict, Generator, List, Set, Tuple, Type, Union
 from enum import Enum, auto
-from parser.tree_node import TNExpression, TNOperatorAND, TNOperatorEquivalency, TNOperatorImplication, TNOperatorNOT, TNOperatorOR, TNValue, TNVariable, TreeNode
+from parser.lru_cache import LRUCache
+from parser.metrics import Metrics
+from parser.node_interner import NodeInterner
+from parser.tree_node import TNExpression, TNOperator, TNOperatorAND, TNOperatorEquivalency, TNOperatorImplication, TNOperatorNOT, TNOperatorOR, TNValue, TNVariable, TreeNode
+from parser.tree_optimizer import TreeOptimizer
+
+
+logger = logging.getLogger(__name__)
 
 
 class TokenType(Enum):
@@ -19,62 +28,141 @@ class TokenType(Enum):
 
 
 class Token:
-    def __init__(self, value: str, token_type: TokenType):
+    def __init__(self, value: str, token_type: TokenType, position: int = 0):
         if token_type == TokenType.VALUE:
             value = str(int(value))
         self.value = value
         self.token_type = token_type
+        self.position = position
 
 
 class ExpressionParser:
 
-    TOKEN_REPRESENTATIONS: List[Tuple[re.Pattern, TokenType]] = [
-        (re.compile("\&"), TokenType.AND),
-        (re.compile("\|"), TokenType.OR),
-        (re.compile("!"), TokenType.NOT),
-        (re.compile("=>"), TokenType.IMPLICATION),
-        (re.compile("<=>"), TokenType.EQUIVALENCY),
-        (re.compile("\("), TokenType.LPAREN),
-        (re.compile("\)"), TokenType.RPAREN),
-        (re.compile("\["), TokenType.LBRACKET),
-        (re.compile("\]"), TokenType.RBRACKET),
-        (re.compile("[01]"), TokenType.VALUE),
-        (re.compile("[a-zA-Z_][a-zA-Z0-9_]*"), TokenType.VARIABLE)
+    # Order matters: "<=>" has to be tried before "=>".
+    TOKEN_REPRESENTATIONS: List[Tuple[str, TokenType]] = [
+        (r"&", TokenType.AND),
+        (r"\|", TokenType.OR),
+        (r"!", TokenType.NOT),
+        (r"<=>", TokenType.EQUIVALENCY),
+        (r"=>", TokenType.IMPLICATION),
+        (r"\(", TokenType.LPAREN),
+        (r"\)", TokenType.RPAREN),
+        (r"\[", TokenType.LBRACKET),
+        (r"\]", TokenType.RBRACKET),
+        (r"[01]", TokenType.VALUE),
+        (r"[a-zA-Z_][a-zA-Z0-9_]*", TokenType.VARIABLE)
     ]
 
-    TREE_BUILDING_STRATEGIES: List[Callable[[
-        List[Token]], Union[List[Token], None]]] = []
+    TOKEN_PATTERN: re.Pattern = re.compile(r"\s*(?:" + "|".join(
+        f"(?P<{token_type.name}>{token_repr})"
+        for token_repr, token_type in TOKEN_REPRESENTATIONS
+    ) + ")")
+    WHITESPACE_PATTERN: re.Pattern = re.compile(r"\s*")
 
-    OPERATOR_PRIORITY: List[TokenType] = [
-        TokenType.EQUIVALENCY,
-        TokenType.IMPLICATION,
-        TokenType.OR,
-        TokenType.AND,
-        TokenType.NOT,
-    ]
+    # Higher priority binds tighter. All binary operators associate to the
+    # right, NOT is a prefix operator.
+    OPERATOR_PRIORITY: Dict[TokenType, int] = {
+        TokenType.EQUIVALENCY: 0,
+        TokenType.IMPLICATION: 1,
+        TokenType.OR: 2,
+        TokenType.AND: 3,
+        TokenType.NOT: 4,
+    }
+
+    OPERATOR_NODES: Dict[TokenType, Type[TNOperator]] = {
+        TokenType.EQUIVALENCY: TNOperatorEquivalency,
+        TokenType.IMPLICATION: TNOperatorImplication,
+        TokenType.OR: TNOperatorOR,
+        TokenType.AND: TNOperatorAND,
+        TokenType.NOT: TNOperatorNOT,
+    }
 
-    def __init__(self):
-        self.TREE_BUILDING_STRATEGIES.append(self._try_build_expression)
-        self.TREE_BUILDING_STRATEGIES.append(self._try_build_operator)
-        self.TREE_BUILDING_STRATEGIES.append(self._try_build_leaves)
+    ENCLOSERS: Dict[TokenType, TokenType] = {
+        TokenType.RPAREN: TokenType.LPAREN,
+        TokenType.RBRACKET: TokenType.LBRACKET,
+    }
+
+    def __init__(self, debug: bool = False, cache_size: int = 128, metrics: Metrics = None, optimize: bool = False):
+        # With debug, token lists and trees are logged at DEBUG level too.
+        self._debug = debug
+        # With optimize, trees are simplified by TreeOptimizer after parsing.
+        self._optimize = optimize
+        self.metrics = metrics or Metrics()
         self._variables = set()
+        self._interner = NodeInterner()
+        self._node_count = 0
+        # Maps normalized token streams to (tree, variables), so whitespace
+        # variants share one entry and every parse does one lookup.
+        self.cache = LRUCache(cache_size)
+
+    def _scan_tokens(self, expression: str, position: int = 0) -> Generator[Token, None, None]:
+        match_token = self.TOKEN_PATTERN.match
+        length = len(expression.rstrip())
+        while position < length:
+            match = match_token(expression, position)
+            if match is None:
+                position = self.WHITESPACE_PATTERN.match(
+                    expression, position).end()
+                raise Exception(
+                    f"Invalid symbol at column {position + 1}: "
+                    f"{expression[position:position + 5]}")
+            group = match.lastgroup
+            yield Token(match.group(group), TokenType[group], match.start(group))
+            position = match.end()
 
     def _tokenize(self, expression: str) -> List[Token]:
-        if len(expression) == 0:
+        if len(expression.strip()) == 0:
+            raise Exception("No expression entered.")
+        return list(self._scan_tokens(expression))
+
+    def tokenize_incremental(
+        self,
+        expression: str,
+        previous_expression: str,
+        previous_token_list: List[Token]
+    ) -> List[Token]:
+        """
+        Tokenizes expression given the tokens of previous_expression, only
+        scanning the edited region. Tokens ending before the first changed
+        character are kept; scanning resumes after them and stops at the
+        first token that starts where an old token of the unchanged tail
+        started, from which on the old tokens are reused, shifted.
+        """
+        if len(expression.strip()) == 0:
             raise Exception("No expression entered.")
+        prefix = 0
+        common_length = min(len(expression), len(previous_expression))
+        while prefix < common_length and expression[prefix] == previous_expression[prefix]:
+            prefix += 1
+        suffix = 0
+        while suffix < common_length - prefix and \
+                expression[-suffix - 1] == previous_expression[-suffix - 1]:
+            suffix += 1
+        shift = len(expression) - len(previous_expression)
+
+        # A kept token must also be followed by an unchanged character,
+        # since that decides where a name or operator ends.
         token_list = []
-        expression = "".join(expression.split())
-        while len(expression) > 0:
-            for token_repr, token_type in self.TOKEN_REPRESENTATIONS:
-                match = re.match(token_repr, expression)
-                if match:
-                    token = Token(expression[:match.end()], token_type)
-                    token_list.append(token)
-                    expression = expression[match.end():]
-                    break
-            else:
-                raise Exception(
-                    f"Invalid symbol at: {expression[:min(5, len(expression))]}")
+        for token in previous_token_list:
+            if token.position + len(token.value) >= prefix:
+                break
+            token_list.append(token)
+        position = 0
+        if len(token_list) != 0:
+            position = token_list[-1].position + len(token_list[-1].value)
+
+        tail_start = len(previous_expression) - suffix
+        tail_idx = bisect.bisect_left(
+            [token.position for token in previous_token_list], tail_start)
+        tail = {token.position + shift: idx for idx, token in enumerate(
+            previous_token_list[tail_idx:], tail_idx)}
+        for token in self._scan_tokens(expression, position):
+            idx = tail.get(token.position)
+            if idx is not None:
+                token_list += [Token(t.value, t.token_type, t.position + shift)
+                               for t in previous_token_list[idx:]]
+                break
+            token_list.append(token)
         return token_list
 
     @staticmethod
@@ -107,104 +195,150 @@ class ExpressionParser:
         if paren_nest != 0 or bracket_nest != 0:
             raise Exception("Invalid syntax.")
 
-    def _is_enclosed(self, token_list: List[Token], *, lchar: str, rchar: str) -> bool:
-        length = len(token_list)
-        if length == 0:
-            return False
-        if token_list[0].value != lchar or token_list[length-1].value != rchar:
-            return False
-        nest = 0
-        for i, token in enumerate(token_list):
-            if token.value == lchar:
-                nest += 1
-            elif token.value == rchar:
-                nest -= 1
-            if nest == 0 and i != length-1:
-                return False
-        return True
-
-    def _try_build_expression(self, token_list: List[Token]) -> Union[TreeNode, None]:
-        if self._is_enclosed(token_list, lchar="(", rchar=")"):
-            node = TNExpression(0, False)
-            node.add_child(self._build_tree(token_list[1:len(token_list)-1]))
-            return node
-        if self._is_enclosed(token_list, lchar="[", rchar="]"):
-            node = TNExpression(0, True, " ".join(
-                [t.value for t in token_list]))
-            node.add_child(self._build_tree(token_list[1:len(token_list)-1]))
-            return node
-        return None
-
-    def _try_build_operator(self, token_list: List[Token]) -> Union[TreeNode, None]:
-        for operator in self.OPERATOR_PRIORITY:
-            nest = 0
-            for i, token in enumerate(token_list):
-                tt = token.token_type
-                if tt in (TokenType.LPAREN, TokenType.LBRACKET):
-                    nest += 1
-                elif tt in (TokenType.RPAREN, TokenType.RBRACKET):
-                    nest -= 1
-                elif tt == operator and nest == 0:
-                    if tt == TokenType.AND:
-                        node = TNOperatorAND(0)
-                    elif tt == TokenType.OR:
-                        node = TNOperatorOR(0)
-                    elif tt == TokenType.NOT:
-                        node = TNOperatorNOT(0)
-                    elif tt == TokenType.IMPLICATION:
-                        node = TNOperatorImplication(0)
-                    elif tt == TokenType.EQUIVALENCY:
-                        node = TNOperatorEquivalency(0)
-
-                    if tt != TokenType.NOT:
-                        node.add_child(self._build_tree(token_list[:i]))
-                    elif i != 0:
-                        raise Exception("Invalid NOT syntax.")
-                    node.add_child(self._build_tree(token_list[i+1:]))
-                    return node
-        return None
-
-    def _try_build_leaves(self, token_list: List[Token]) -> Union[TreeNode, None]:
-        if len(token_list) != 0:
-            last_token = token_list[0]
-            if last_token.token_type == TokenType.VALUE:
-                return TNValue(0, last_token.value)
-            if last_token.token_type == TokenType.VARIABLE:
-                self._variables.add(last_token.value)
-                return TNVariable(0, last_token.value)
+    @staticmethod
+    def _get_syntax_error(token: Union[Token, None]) -> Exception:
+        if token is None:
+            return Exception("Invalid syntax: unexpected end of expression.")
+        return Exception(f"Invalid syntax at column {token.position + 1}.")
+
+    def _reduce(
+        self,
+        operands: List[TreeNode],
+        operators: List[Tuple[Token, int]],
+        priority: int
+    ) -> None:
+        while len(operators) != 0:
+            token = operators[-1][0]
+            tt = token.token_type
+            if tt not in self.OPERATOR_PRIORITY or self.OPERATOR_PRIORITY[tt] <= priority:
+                return
+            operators.pop()
+            node = self.OPERATOR_NODES[tt](self._next_id())
+            if tt != TokenType.NOT:
+                rnode = operands.pop()
+                node.add_child(operands.pop())
+                node.add_child(rnode)
+            else:
+                node.add_child(operands.pop())
+            operands.append(self._interner.intern(node))
+
+    def _next_id(self) -> int:
+        self._node_count += 1
+        return self._node_count
 
     def _build_tree(self, token_list: List[Token]) -> TreeNode:
-        print("CURRENT TOKEN LIST: ", [t.value for t in token_list])
+        """
+        Builds the tree in one pass over token_list with an operand stack
+        and an operator stack (shunting-yard), so neither time nor recursion
+        depth depend on how deeply the expression is nested. Every node goes
+        through the interner, so repeated sub-expressions share one node.
+        """
+        if self._debug and logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Token list: %s", [t.value for t in token_list])
 
-        for tree_building_strategy in self.TREE_BUILDING_STRATEGIES:
-            result = tree_building_strategy(token_list)
-            if result:
-                return result
+        operands: List[TreeNode] = []
+        # Pending operators and opening parentheses with their token index.
+        operators: List[Tuple[Token, int]] = []
+        expect_operand = True
+        for i, token in enumerate(token_list):
+            tt = token.token_type
+            if expect_operand:
+                if tt == TokenType.VALUE:
+                    operands.append(self._interner.intern(
+                        TNValue(self._next_id(), token.value)))
+                    expect_operand = False
+                elif tt == TokenType.VARIABLE:
+                    self._variables.add(token.value)
+                    operands.append(self._interner.intern(
+                        TNVariable(self._next_id(), token.value)))
+                    expect_operand = False
+                elif tt in (TokenType.NOT, TokenType.LPAREN, TokenType.LBRACKET):
+                    operators.append((token, i))
+                else:
+                    raise self._get_syntax_error(token)
+            elif tt in self.OPERATOR_PRIORITY and tt != TokenType.NOT:
+                self._reduce(operands, operators, self.OPERATOR_PRIORITY[tt])
+                operators.append((token, i))
+                expect_operand = True
+            elif tt in self.ENCLOSERS:
+                self._reduce(operands, operators, -1)
+                if len(operators) == 0 or operators[-1][0].token_type != self.ENCLOSERS[tt]:
+                    raise self._get_syntax_error(token)
+                _, start = operators.pop()
+                if tt == TokenType.RPAREN:
+                    node = TNExpression(self._next_id(), False)
+                else:
+                    node = TNExpression(self._next_id(), True, " ".join(
+                        [t.value for t in token_list[start:i+1]]))
+                node.add_child(operands.pop())
+                operands.append(self._interner.intern(node))
+            else:
+                raise self._get_syntax_error(token)
 
-        raise Exception("Invalid syntax.")
+        if expect_operand:
+            raise self._get_syntax_error(None)
+        self._reduce(operands, operators, -1)
+        if len(operators) != 0:
+            raise self._get_syntax_error(operators[-1][0])
+        return operands[0]
+
+    def parse_tokens(self, token_list: List[Token], interner: NodeInterner) -> Tuple[TreeNode, Set[str]]:
+        """
+        Builds the tree of an already tokenized expression, bypassing the
+        cache. Nodes are interned into interner, so subtrees it already
+        holds from an earlier parse are reused as they are. Raises on
+        invalid syntax.
+        """
+        with self.metrics.time("check_syntax"):
+            self._check_syntax(token_list)
+        self._variables = set()
+        self._interner = interner
+        with self.metrics.time("build_tree"):
+            tree = self._build_tree(token_list)
+        return self._optimize_tree(tree), self._variables
+
+    def _optimize_tree(self, tree: TreeNode) -> TreeNode:
+        if not self._optimize:
+            return tree
+        with self.metrics.time("optimize"):
+            return TreeOptimizer(self._interner).optimize(tree)
 
     def parse(self, expression: str) -> Union[
         Tuple[TreeNode, Set[str], None],
         Tuple[None, None, Exception]
     ]:
+        metrics = self.metrics
         try:
-            print("[TOKENIZING]")
-            token_list = self._tokenize(expression)
-            self._check_syntax(token_list)
-            print("[PARSING]")
-            self._variables.clear()
-            tree = self._build_tree(token_list)
-            print("[GENERATING_TABLE]")
+            logger.debug("Tokenizing %d characters", len(expression))
+            with metrics.time("tokenize"):
+                token_list = self._tokenize(expression)
+            normalized_expression = " ".join([t.value for t in token_list])
+            cached = self.cache.get(normalized_expression)
+            if cached is not None:
+                metrics.count("parse_cache_hits")
+                return [cached[0], set(cached[1]), None]
+            metrics.count("parse_cache_misses")
 
-            for t in token_list:
-                print(f"TYPE: {t.token_type}, VALUE: {t.value}")
-            print(tree)
-            print(self._variables)
+            with metrics.time("check_syntax"):
+                self._check_syntax(token_list)
+            logger.debug("Building tree from %d tokens", len(token_list))
+            self._variables = set()
+            self._interner = NodeInterner()
+            with metrics.time("build_tree"):
+                tree = self._build_tree(token_list)
+            metrics.count("tokens", len(token_list))
+            metrics.count("nodes_built", len(self._interner))
+            tree = self._optimize_tree(tree)
 
-            if len(self._variables) > 4:
-                raise Exception("Too many variables, cannot show table.")
+            if self._debug and logger.isEnabledFor(logging.DEBUG):
+                for t in token_list:
+                    logger.debug("Token %s: %s", t.token_type, t.value)
+                logger.debug("Tree:\n%s", tree)
+                logger.debug("Variables: %s", self._variables)
 
+            cached = (tree, frozenset(self._variables))
+            self.cache.put(normalized_expression, cached)
             return [tree, self._variables, None]
         except Exception as e:
-            print(f"[ERROR] {str(e)}")
+            logger.debug("Parsing failed: %s", e)
             return [None, None, e]
@@ -0,0 +1,89 @@
+from typing import Dict, List, Set, Tuple
+from parser.expression_parser import ExpressionParser, Token
+from parser.node_interner import NodeInterner
+from parser.table_generator import TableGenerator
+from parser.tree_node import TreeNode
+
+
+class LiveEvaluator:
+
+    """
+    Re-evaluates an expression as it is being edited. Only the edited
+    region is re-tokenized, and the interner and the mask memo outlive a
+    single parse, so subtrees that did not change come back as the same
+    nodes and keep their masks; only columns touched by the edit are
+    computed again. Both are cut back to the current tree after every
+    update and dropped when the set of variables changes.
+    """
+
+    def __init__(self, expression_parser: ExpressionParser, table_generator: TableGenerator):
+        self.expression_parser = expression_parser
+        self.table_generator = table_generator
+        self._expression = ""
+        self._token_list: List[Token] = []
+        self._interner = NodeInterner()
+        self._variable_ls: List[str] = None
+        self._variable_masks: Dict[str, int] = {}
+        self._full_mask = 0
+        # Keyed by node id; only ever holds nodes kept alive by _interner.
+        self._memo: Dict[int, int] = {}
+        self._expression_masks: Dict[str, int] = {}
+
+    def _set_variables(self, variables: Set[str]) -> None:
+        variable_ls = sorted(list(variables), key=str.casefold)
+        if variable_ls == self._variable_ls:
+            return
+        self._variable_ls = variable_ls
+        self._full_mask = (1 << (1 << len(variable_ls))) - 1
+        self._variable_masks = dict(zip(
+            variable_ls, self.table_generator._generate_variable_masks(len(variable_ls))))
+        self._memo = {}
+        self._expression_masks = {}
+
+    def _retain(self, tree: TreeNode) -> None:
+        nodes = []
+        tree.fold(lambda node, _: nodes.append(node))
+        self._interner = NodeInterner()
+        for node in nodes:
+            self._interner.intern(node)
+        self._memo = {id(node): self._memo[id(node)]
+                      for node in nodes if id(node) in self._memo}
+
+    def parse(self, expression: str) -> Tuple[TreeNode, Set[str]]:
+        """
+        Raises on an invalid expression, leaving the previous state usable
+        for the next edit.
+        """
+        token_list = self.expression_parser.tokenize_incremental(
+            expression, self._expression, self._token_list)
+        self._expression, self._token_list = expression, token_list
+        return self.expression_parser.parse_tokens(token_list, self._interner)
+
+    def evaluate(self, tree: TreeNode, variables: Set[str]) -> Tuple[List[str], List[int]]:
+        """
+        Returns the header and masks of the whole table of the tree last
+        returned by parse, in the layout of
+        TableGenerator.generate_table_masks.
+        """
+        self._set_variables(variables)
+        metrics = self.table_generator.metrics
+        with metrics.time("evaluate", profile=True):
+            # Captured masks are kept too: a capture's name is its text, so
+            # a reused capture node, whose memoized mask skips registering
+            # itself, still finds its column from an earlier update.
+            result_mask = tree.get_mask(
+                self._variable_masks, self._full_mask, self._expression_masks, self._memo)
+        metrics.count("rows_evaluated", 1 << len(self._variable_ls))
+        expression_names_ls = tree.get_expression_names()
+        self._expression_masks = {name: self._expression_masks[name]
+                                  for name in expression_names_ls}
+        self._retain(tree)
+
+        header = self._variable_ls + expression_names_ls + ["V"]
+        masks = [self._variable_masks[name] for name in self._variable_ls] + \
+            [self._expression_masks[name] for name in expression_names_ls] + \
+            [result_mask]
+        return header, masks
+
+    def update(self, expression: str) -> Tuple[List[str], List[int]]:
+        return self.evaluate(*self.parse(expression))
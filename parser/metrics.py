@@ -0,0 +1,65 @@
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from typing import TYPE_CHECKING, Callable, Dict, Iterator, Union
+
+if TYPE_CHECKING:
+    import cProfile
+
+
+# Called with ("time", stage, seconds) after every timed stage and with
+# ("count", counter, amount) on every count.
+MetricsCallback = Callable[[str, str, float], None]
+
+
+class Metrics:
+
+    """
+    Accumulates per-stage wall time and counters. Stages timed with
+    profile=True also run under the cProfile profiler, if one was asked
+    for, so table generation can be profiled without patching code.
+    """
+
+    def __init__(self, callback: MetricsCallback = None, profile: bool = False):
+        self.timings: Dict[str, float] = defaultdict(float)
+        self.counters: Dict[str, int] = defaultdict(int)
+        self.profiler: Union["cProfile.Profile", None] = None
+        if profile:
+            import cProfile
+            self.profiler = cProfile.Profile()
+        self._callback = callback
+        self._profile_depth = 0
+
+    @contextmanager
+    def time(self, stage: str, profile: bool = False) -> Iterator[None]:
+        profile = profile and self.profiler is not None
+        if profile:
+            if self._profile_depth == 0:
+                self.profiler.enable()
+            self._profile_depth += 1
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            if profile:
+                self._profile_depth -= 1
+                if self._profile_depth == 0:
+                    self.profiler.disable()
+            self.timings[stage] += elapsed
+            if self._callback is not None:
+                self._callback("time", stage, elapsed)
+
+    def count(self, counter: str, amount: int = 1) -> None:
+        self.counters[counter] += amount
+        if self._callback is not None:
+            self._callback("count", counter, amount)
+
+    def reset(self) -> None:
+        self.timings.clear()
+        self.counters.clear()
+        if self.profiler is not None:
+            self.profiler = type(self.profiler)()
+
+    def get_snapshot(self) -> Dict[str, Dict[str, float]]:
+        return {"timings": dict(self.timings), "counters": dict(self.counters)}
@@ -0,0 +1,23 @@
+from typing import Dict, Tuple
+from parser.tree_node import TreeNode
+
+
+class NodeInterner:
+
+    """
+    Hash-conses tree nodes: structurally identical subtrees are replaced
+    by a single shared node, turning the tree into a DAG. Children have
+    to be interned before their parent, since keys refer to them by id.
+    """
+
+    def __init__(self):
+        self._nodes: Dict[Tuple, TreeNode] = {}
+
+    def intern(self, node: TreeNode) -> TreeNode:
+        return self._nodes.setdefault(node.get_key(), node)
+
+    def clear(self) -> None:
+        self._nodes.clear()
+
+    def __len__(self) -> int:
+        return len(self._nodes)
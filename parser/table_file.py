@@ -0,0 +1,143 @@
+import mmap
+import struct
+from typing import BinaryIO, Generator, List, Set, Union
+from parser.table_generator import TableGenerator
+from parser.tree_node import TreeNode
+
+
+class TableFile:
+
+    """
+    Binary truth table layout:
+
+        magic "TTBL", version u16, reserved u16,
+        variable count u32, column count u32,
+        then every header name as u32 length + UTF-8 bytes,
+        zero padding to a multiple of 8,
+        then one bit-packed column per captured expression and V.
+
+    Bit j of a column byte k holds row 8k + j. Variable columns are not
+    stored, since row r assigns variable i the complement of bit n - 1 - i
+    of r; readers derive them from the row index.
+    """
+
+    MAGIC = b"TTBL"
+    VERSION = 1
+    PREFIX_FORMAT = "<4sHHII"
+
+    @staticmethod
+    def get_column_size(row_count: int) -> int:
+        return (row_count + 7) // 8
+
+
+class TableFileWriter(TableFile):
+    def __init__(self, file: BinaryIO, header: List[str], variable_count: int):
+        self._file = file
+        self._variable_count = variable_count
+        self._row_count = 1 << variable_count
+        self._column_count = len(header) - variable_count
+        names = b"".join(struct.pack("<I", len(name.encode("utf-8"))) + name.encode("utf-8")
+                         for name in header)
+        prefix = struct.pack(self.PREFIX_FORMAT, self.MAGIC, self.VERSION, 0,
+                             variable_count, len(header))
+        self._data_offset = (len(prefix) + len(names) + 7) // 8 * 8
+        self._file.write(prefix + names)
+        self._file.truncate(
+            self._data_offset + self._column_count * self.get_column_size(self._row_count))
+
+    def write_masks(self, start: int, row_count: int, masks: List[int]) -> None:
+        """
+        Writes rows start..start + row_count of the stored columns, given
+        as TableGenerator masks. start has to be a multiple of 8.
+        """
+        if start % 8 != 0:
+            raise Exception("Table file chunks have to start at a whole byte.")
+        column_size = self.get_column_size(self._row_count)
+        byte_count = self.get_column_size(row_count)
+        for i, mask in enumerate(masks):
+            self._file.seek(self._data_offset + i *
+                            column_size + start // 8)
+            self._file.write(mask.to_bytes(byte_count, "little"))
+
+
+def write_table_file(
+    path: str,
+    tree: TreeNode,
+    variables: Set[str],
+    table_generator: TableGenerator = None,
+    chunk_size: int = 1 << 20
+) -> None:
+    table_generator = table_generator or TableGenerator()
+    variable_count = len(variables)
+    row_count = 1 << variable_count
+    chunk_size = (chunk_size + 7) // 8 * 8
+    with open(path, "w+b") as file:
+        writer = TableFileWriter(file, table_generator.get_table_header(
+            tree, variables), variable_count)
+        for start in range(0, row_count, chunk_size):
+            stop = min(start + chunk_size, row_count)
+            _, masks = table_generator.generate_table_masks(
+                tree, variables, start, stop)
+            writer.write_masks(start, stop - start, masks[variable_count:])
+
+
+class TableFileReader(TableFile):
+
+    """
+    Memory-maps a table file; rows and columns are decoded only when
+    asked for.
+    """
+
+    def __init__(self, path: str):
+        self._file = open(path, "rb")
+        self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, _, self.variable_count, header_count = struct.unpack_from(
+            self.PREFIX_FORMAT, self._mmap, 0)
+        if magic != self.MAGIC or version != self.VERSION:
+            raise Exception(f"{path} is not a truth table file.")
+        offset = struct.calcsize(self.PREFIX_FORMAT)
+        self.header: List[str] = []
+        for _ in range(header_count):
+            (length,) = struct.unpack_from("<I", self._mmap, offset)
+            offset += 4
+            self.header.append(
+                self._mmap[offset:offset + length].decode("utf-8"))
+            offset += length
+        self._data_offset = (offset + 7) // 8 * 8
+        self.row_count = 1 << self.variable_count
+
+    def close(self) -> None:
+        self._mmap.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_):
+        self.close()
+
+    def get_column_bytes(self, column: int) -> memoryview:
+        if column < self.variable_count:
+            raise Exception("Variable columns are not stored.")
+        column_size = self.get_column_size(self.row_count)
+        offset = self._data_offset + \
+            (column - self.variable_count) * column_size
+        return memoryview(self._mmap)[offset:offset + column_size]
+
+    def get_column_mask(self, column: int, start: int = 0, stop: int = None) -> int:
+        if stop is None:
+            stop = self.row_count
+        if column < self.variable_count:
+            return TableGenerator._generate_variable_masks(
+                self.variable_count, start, stop)[column]
+        data = self.get_column_bytes(column)[start // 8:(stop + 7) // 8]
+        return (int.from_bytes(data, "little") >> (start % 8)) & ((1 << (stop - start)) - 1)
+
+    def get_rows(self, start: int, stop: int) -> List[List[Union[int, bool]]]:
+        masks = [self.get_column_mask(column, start, stop)
+                 for column in range(len(self.header))]
+        return TableGenerator.masks_to_rows(masks, self.variable_count, stop - start)
+
+    def generate_row_chunks(self, chunk_size: int = 4096) -> Generator[List[List[Union[int, bool]]], None, None]:
+        for start in range(0, self.row_count, chunk_size):
+            yield self.get_rows(start, min(start + chunk_size, self.row_count))
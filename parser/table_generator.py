@@ -1,10 +1,71 @@
-from typing import List, Set
+import os
+from collections import deque
+from typing import TYPE_CHECKING, Callable, Deque, Generator, Iterable, List, Sequence, Set, Tuple, TypeVar, Union
+from parser.expression_parser import ExpressionParser
+from parser.lru_cache import LRUCache
+from parser.metrics import Metrics
 from parser.tree_node import TreeNode
 
+if TYPE_CHECKING:
+    from concurrent.futures import Future
+
+# NumPy is optional and slow to import, so it is only loaded once a table
+# is actually generated with it; False once it turned out to be missing.
+np = None
+
+
+def _import_numpy():
+    global np
+    if np is None:
+        try:
+            import numpy
+            np = numpy
+        except ImportError:
+            np = False
+    return np
+
+
+T = TypeVar("T")
+
+# One parser per process, so a worker handed several shards of the same
+# expression parses it once and gets cache hits afterwards.
+_shard_parser: ExpressionParser = None
+
+
+def _parse_for_shard(expression: str) -> Tuple[TreeNode, Set[str]]:
+    global _shard_parser
+    if _shard_parser is None:
+        _shard_parser = ExpressionParser(optimize=True)
+    tree, variables, err = _shard_parser.parse(expression)
+    if err:
+        raise err
+    return tree, variables
+
+
+def _evaluate_shard(expression: str, start: int, stop: int) -> List[int]:
+    tree, variables = _parse_for_shard(expression)
+    return TableGenerator(cache_size=0).generate_table_masks(
+        tree, variables, start, stop)[1]
+
+
+def _evaluate_shard_rows(expression: str, start: int, stop: int) -> List[List[Union[int, bool]]]:
+    # Decoding the masks is the expensive part of producing rows, so it
+    # happens here rather than serially in the parent.
+    tree, variables = _parse_for_shard(expression)
+    masks = TableGenerator(cache_size=0).generate_table_masks(
+        tree, variables, start, stop)[1]
+    return TableGenerator.masks_to_rows(masks, len(variables), stop - start)
+
 
 class TableGenerator:
-    def __init__(self):
-        pass
+    def __init__(self, bitwise: bool = True, use_numpy: bool = True, cache_size: int = 16, metrics: Metrics = None):
+        self._bitwise = bitwise
+        self._use_numpy = use_numpy
+        # "evaluate" and "render" stages run under metrics.profiler, if any.
+        self.metrics = metrics or Metrics()
+        # Keyed by tree identity, which pairs with the parser cache handing
+        # out the same tree for repeated expressions.
+        self.cache = LRUCache(cache_size)
 
     def _generate_value_combinations(
         self,
@@ -25,24 +86,348 @@ class TableGenerator:
 
         return value_combinations
 
-    def generate_table_content(self, tree: TreeNode, variables: Set[str]) -> List[List[str]]:
+    @staticmethod
+    def _get_row_range(variable_count: int, start: int, stop: Union[int, None]) -> Tuple[int, int]:
+        row_count = 1 << variable_count
+        if stop is None:
+            stop = row_count
+        if not 0 <= start <= stop <= row_count:
+            raise Exception(
+                f"Invalid row range {start}:{stop} for a table of {row_count} rows.")
+        return start, stop
+
+    @staticmethod
+    def _generate_variable_masks(variable_count: int, start: int = 0, stop: int = None) -> List[int]:
+        # Bit j of a mask holds the value in row start + j. Row order matches
+        # _generate_value_combinations: the first variable is True for the
+        # first half of the rows, the last variable alternates every row.
+        if stop is None:
+            stop = 1 << variable_count
+        length = stop - start
+        full_mask = (1 << length) - 1
+        variable_masks = []
+        for idx in range(variable_count):
+            block = 1 << (variable_count - idx - 1)
+            first_value = (start // block) % 2 == 0
+            if block >= length:
+                # The range crosses at most one block boundary.
+                boundary = (start // block + 1) * block - start
+                mask = full_mask if boundary >= length else \
+                    (1 << boundary) - 1
+                variable_masks.append(
+                    mask if first_value else full_mask ^ mask)
+                continue
+            # Repeat the period by doubling; dividing by a repunit would be
+            # quadratic in the mask size.
+            phase = start % (2 * block)
+            repeated, repeated_length = (1 << block) - 1, 2 * block
+            while repeated_length < length + phase:
+                repeated |= repeated << repeated_length
+                repeated_length *= 2
+            variable_masks.append((repeated >> phase) & full_mask)
+        return variable_masks
+
+    def generate_table_masks(
+        self,
+        tree: TreeNode,
+        variables: Set[str],
+        start: int = 0,
+        stop: int = None
+    ) -> Tuple[List[str], List[int]]:
         variable_ls = sorted(list(variables), key=str.casefold)
-        variable_dict = {name: i for i, name in enumerate(variable_ls)}
+        start, stop = self._get_row_range(len(variable_ls), start, stop)
+        full_mask = (1 << (stop - start)) - 1
+        variable_masks = dict(zip(variable_ls, self._generate_variable_masks(
+            len(variable_ls), start, stop)))
+        expression_names_ls = tree.get_expression_names()
+
+        expression_masks = {}
+        with self.metrics.time("evaluate", profile=True):
+            result_mask = tree.get_mask(
+                variable_masks, full_mask, expression_masks)
+        self.metrics.count("rows_evaluated", stop - start)
+
+        header = variable_ls + expression_names_ls + ["V"]
+        masks = [variable_masks[name] for name in variable_ls] + \
+            [expression_masks[name] for name in expression_names_ls] + \
+            [result_mask]
+        return header, masks
+
+    @classmethod
+    def _generate_variable_words(cls, variable_count: int) -> List["np.ndarray"]:
+        # The bit layout of _generate_variable_masks, cut into 64-bit words.
+        # Variables alternating faster than every 64 rows repeat the same
+        # word; the others fill whole words with ones or zeros.
+        row_count = 1 << variable_count
+        word_count = (row_count + 63) // 64
+        word_masks = cls._generate_variable_masks(
+            variable_count, 0, min(row_count, 64))
+        word_indices = np.arange(word_count, dtype=np.uint64)
+        variable_words = []
+        for idx in range(variable_count):
+            shift = variable_count - idx - 1 - 6
+            if shift < 0:
+                variable_words.append(
+                    np.full(word_count, word_masks[idx], dtype=np.uint64))
+            else:
+                variable_words.append(np.where(
+                    (word_indices >> np.uint64(shift)) & np.uint64(1) == 0,
+                    np.uint64((1 << 64) - 1), np.uint64(0)))
+        return variable_words
+
+    def _generate_table_columns_numpy(self, tree: TreeNode, variables: Set[str]) -> Tuple[List[str], List["np.ndarray"]]:
+        # Columns stay bit-packed, so get_mask runs the same bitwise
+        # operations as on int masks, 64 rows per word: 20 variables take
+        # 128 KiB per column.
+        variable_ls = sorted(list(variables), key=str.casefold)
+        row_count = 1 << len(variable_ls)
+        full_array = np.full((row_count + 63) // 64,
+                             (1 << min(row_count, 64)) - 1, dtype=np.uint64)
+        variable_arrays = dict(
+            zip(variable_ls, self._generate_variable_words(len(variable_ls))))
+        expression_names_ls = tree.get_expression_names()
+
+        expression_arrays = {}
+        with self.metrics.time("evaluate", profile=True):
+            result_array = tree.get_mask(
+                variable_arrays, full_array, expression_arrays)
+        self.metrics.count("rows_evaluated", row_count)
+
+        header = variable_ls + expression_names_ls + ["V"]
+        columns = [variable_arrays[name] for name in variable_ls] + \
+            [expression_arrays[name] for name in expression_names_ls] + \
+            [result_array]
+        return header, columns
+
+    def generate_table_columns(self, tree: TreeNode, variables: Set[str]) -> Tuple[List[str], List[Union[int, "np.ndarray"]]]:
+        """
+        Returns the table column by column, bit-packed: bit r of a column
+        holds row r. With NumPy a column is an array of uint64 words,
+        otherwise an int mask as from generate_table_masks. unpack_column
+        turns either into one bool per row.
+        """
+        if self._use_numpy and _import_numpy():
+            return self._generate_table_columns_numpy(tree, variables)
+        return self.generate_table_masks(tree, variables)
+
+    @staticmethod
+    def unpack_column(column: Union[int, "np.ndarray"], row_count: int) -> Sequence[bool]:
+        if isinstance(column, int):
+            return [bit == "1" for bit in format(column, f"0{row_count}b")[::-1]]
+        return np.unpackbits(column.astype("<u8", copy=False).view(np.uint8),
+                             count=row_count, bitorder="little").astype(bool)
+
+    @staticmethod
+    def masks_to_rows(masks: List[int], variable_count: int, row_count: int) -> List[List[Union[int, bool]]]:
+        columns = [format(mask, f"0{row_count}b")[::-1] for mask in masks]
+        return [
+            [int(column[row]) for column in columns[:variable_count]] +
+            [column[row] == "1" for column in columns[variable_count:]]
+            for row in range(row_count)
+        ]
+
+    def _generate_table_content_bitwise(self, tree: TreeNode, variables: Set[str]) -> List[List[str]]:
+        header, masks = self.generate_table_masks(tree, variables)
+        with self.metrics.time("render", profile=True):
+            return [header] + self.masks_to_rows(
+                masks, len(variables), 1 << len(variables))
+
+    def get_table_header(self, tree: TreeNode, variables: Set[str]) -> List[str]:
+        return sorted(list(variables), key=str.casefold) + \
+            tree.get_expression_names() + ["V"]
+
+    def generate_row_chunks(
+        self,
+        tree: TreeNode,
+        variables: Set[str],
+        chunk_size: int = 4096,
+        *,
+        start: int = 0,
+        stop: int = None,
+        gray_code: bool = False
+    ) -> Generator[List[List[Union[int, bool]]], None, None]:
+        """
+        Yields the rows start..stop of the table in lists of at most
+        chunk_size rows, without materialising the rest of the table.
+        With gray_code, row r holds the assignment of Gray code r ^ (r >> 1),
+        so consecutive rows differ in exactly one variable.
+        """
+        start, stop = self._get_row_range(len(variables), start, stop)
+        if gray_code:
+            chunk = []
+            for row in self.generate_rows(tree, variables, start=start, stop=stop, gray_code=True):
+                chunk.append(row)
+                if len(chunk) == chunk_size:
+                    yield chunk
+                    chunk = []
+            if len(chunk) != 0:
+                yield chunk
+            return
+        for chunk_start in range(start, stop, chunk_size):
+            chunk_stop = min(chunk_start + chunk_size, stop)
+            _, masks = self.generate_table_masks(
+                tree, variables, chunk_start, chunk_stop)
+            with self.metrics.time("render", profile=True):
+                rows = self.masks_to_rows(
+                    masks, len(variables), chunk_stop - chunk_start)
+            yield rows
+
+    def generate_rows(
+        self,
+        tree: TreeNode,
+        variables: Set[str],
+        *,
+        start: int = 0,
+        stop: int = None,
+        gray_code: bool = False
+    ) -> Generator[List[Union[int, bool]], None, None]:
+        start, stop = self._get_row_range(len(variables), start, stop)
+        if not gray_code:
+            for chunk in self.generate_row_chunks(tree, variables, start=start, stop=stop):
+                yield from chunk
+            return
+        variable_count = len(variables)
+        shifts = range(variable_count - 1, -1, -1)
+        compiled = tree.compile(sorted(list(variables), key=str.casefold))
+        for row in range(start, stop):
+            code = row ^ (row >> 1)
+            value_combination = tuple(
+                (code >> shift) & 1 == 0 for shift in shifts)
+            result_value, expression_values = compiled(value_combination)
+            yield [int(x) for x in value_combination] + \
+                list(expression_values) + [result_value]
+
+    def evaluate(
+        self,
+        tree: TreeNode,
+        variables: Set[str],
+        value_combinations: Iterable[Tuple[bool, ...]]
+    ) -> Generator[Tuple[bool, Tuple[bool, ...]], None, None]:
+        variable_ls = sorted(list(variables), key=str.casefold)
+        compiled = tree.compile(variable_ls)
+        for value_combination in value_combinations:
+            yield compiled(value_combination)
+
+    def _generate_table_content_rowwise(self, tree: TreeNode, variables: Set[str]) -> List[List[str]]:
+        variable_ls = sorted(list(variables), key=str.casefold)
+        compiled = tree.compile(variable_ls)
         value_combinations = self._generate_value_combinations(
             [None] * len(variable_ls), 0, len(variable_ls))
         expression_names_ls = tree.get_expression_names()
 
         table_content = [variable_ls + expression_names_ls + ["V"]]
-        for value_combination in value_combinations:
-            expression_values_dict = {}
-            result_value = tree.get_value(
-                variable_dict, value_combination, expression_values_dict)
+        with self.metrics.time("evaluate", profile=True):
+            for value_combination in value_combinations:
+                result_value, expression_values = compiled(
+                    tuple(value_combination))
+                table_content.append(
+                    [int(x) for x in value_combination] +
+                    list(expression_values) +
+                    [result_value]
+                )
+        self.metrics.count("rows_evaluated", len(value_combinations))
 
-            table_content.append(
-                [int(x) for x in value_combination] +
-                [expression_values_dict[expression_name]
-                    for expression_name in expression_names_ls] +
-                [result_value]
-            )
+        return table_content
 
+    def generate_table_content(self, tree: TreeNode, variables: Set[str]) -> List[List[str]]:
+        # Callers get their own copy, so changing it leaves the cache intact.
+        key = (tree, frozenset(variables))
+        table_content = self.cache.get(key)
+        if table_content is not None:
+            self.metrics.count("table_cache_hits")
+            return [list(row) for row in table_content]
+        self.metrics.count("table_cache_misses")
+        if self._bitwise:
+            table_content = self._generate_table_content_bitwise(
+                tree, variables)
+        else:
+            table_content = self._generate_table_content_rowwise(
+                tree, variables)
+        self.cache.put(key, tuple(tuple(row) for row in table_content))
         return table_content
+
+    @staticmethod
+    def _get_shards(
+        start: int,
+        stop: int,
+        workers: int,
+        shard_size: Union[int, None],
+        max_shard_size: int = 1 << 22
+    ) -> List[Tuple[int, int]]:
+        if shard_size is None:
+            # A few shards per worker keeps the pool busy when shards differ
+            # in cost, capped so no single shard gets huge.
+            shard_size = min(max((stop - start) // (workers * 4), 1), max_shard_size)
+        # Whole bytes per shard let merging concatenate mask bytes.
+        shard_size = (shard_size + 7) // 8 * 8
+        return [(shard_start, min(shard_start + shard_size, stop))
+                for shard_start in range(start, stop, shard_size)]
+
+    def _map_shards(
+        self,
+        function: Callable[[str, int, int], T],
+        expression: str,
+        shards: List[Tuple[int, int]],
+        workers: int
+    ) -> Generator[T, None, None]:
+        # Keeps a bounded number of shards in flight and yields results in
+        # shard order, so a slow consumer does not pile up finished shards.
+        from concurrent.futures import ProcessPoolExecutor
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            pending: Deque["Future"] = deque(
+                executor.submit(function, expression, *shard)
+                for shard in shards[:2 * workers])
+            try:
+                for shard in shards[2 * workers:]:
+                    result = pending.popleft().result()
+                    pending.append(executor.submit(
+                        function, expression, *shard))
+                    yield result
+                while len(pending) != 0:
+                    yield pending.popleft().result()
+            finally:
+                for future in pending:
+                    future.cancel()
+
+    def generate_row_chunks_parallel(
+        self,
+        expression: str,
+        *,
+        start: int = 0,
+        stop: int = None,
+        workers: int = None,
+        shard_size: int = None
+    ) -> Generator[List[List[Union[int, bool]]], None, None]:
+        """
+        Splits rows start..stop into contiguous shards evaluated in a
+        process pool and yields each shard's rows in order. Workers get
+        the expression string, parse it themselves and decode their rows,
+        so the parent only unpickles finished shards.
+        """
+        _, variables = _parse_for_shard(expression)
+        start, stop = self._get_row_range(len(variables), start, stop)
+        workers = workers or os.cpu_count() or 1
+        # Decoded rows take far more memory than masks, hence smaller shards.
+        shards = self._get_shards(start, stop, workers, shard_size, 1 << 16)
+        yield from self._map_shards(_evaluate_shard_rows, expression, shards, workers)
+
+    def generate_table_masks_parallel(
+        self,
+        expression: str,
+        *,
+        start: int = 0,
+        stop: int = None,
+        workers: int = None,
+        shard_size: int = None
+    ) -> Tuple[List[str], List[int]]:
+        tree, variables = _parse_for_shard(expression)
+        start, stop = self._get_row_range(len(variables), start, stop)
+        workers = workers or os.cpu_count() or 1
+        shards = self._get_shards(start, stop, workers, shard_size)
+        header = self.get_table_header(tree, variables)
+        column_bytes: List[List[bytes]] = [[] for _ in header]
+        for (shard_start, shard_stop), masks in zip(shards, self._map_shards(_evaluate_shard, expression, shards, workers)):
+            byte_count = (shard_stop - shard_start + 7) // 8
+            for column, mask in zip(column_bytes, masks):
+                column.append(mask.to_bytes(byte_count, "little"))
+        return header, [int.from_bytes(b"".join(column), "little") for column in column_bytes]
@@ -1,49 +1,206 @@
 from __future__ import annotations
 from abc import ABC, abstractmethod
-from typing import Dict, List
+from typing import TYPE_CHECKING, Any, Callable, Dict, Generator, List, Tuple, Union
+
+if TYPE_CHECKING:
+    from solver.bdd import BDD
+    from solver.cnf import CNF
+
+
+CompiledFunction = Callable[[Tuple[bool, ...]],
+                            Tuple[bool, Tuple[bool, ...]]]
 
 
 class TreeNode(ABC):
     def __init__(self, id: int):
         self._id = id
         self._children: List[TreeNode] = []
+        self._compiled_functions: Dict[Tuple[str, ...],
+                                       CompiledFunction] = None
 
     def add_child(self, child: TreeNode) -> None:
         self._children.append(child)
 
-    @abstractmethod
+    def get_children(self) -> List[TreeNode]:
+        return self._children
+
+    def fold(
+        self,
+        combine: Callable[[TreeNode, List[Any]], Any],
+        results: Dict[int, Any] = None
+    ) -> Any:
+        """
+        Calls combine(node, child_results) for every distinct node in
+        post-order and returns the result for this node. Shared nodes are
+        combined once, and the walk is iterative so depth is not limited.
+        Nodes whose id is already in results are not combined again.
+        """
+        if results is None:
+            results = {}
+        stack: List[Tuple[TreeNode, bool]] = [(self, False)]
+        while len(stack) != 0:
+            node, expanded = stack.pop()
+            if id(node) in results:
+                continue
+            if expanded:
+                results[id(node)] = combine(
+                    node, [results[id(child)] for child in node._children])
+            else:
+                stack.append((node, True))
+                stack.extend((child, False)
+                             for child in reversed(node._children))
+        return results[id(self)]
+
+    def _walk(self) -> Generator[TreeNode, None, None]:
+        # Post-order like fold, but a shared node is visited once for every
+        # parent it has, as the tree reads in the expression text.
+        stack: List[Tuple[TreeNode, bool]] = [(self, False)]
+        while len(stack) != 0:
+            node, expanded = stack.pop()
+            if expanded:
+                yield node
+            else:
+                stack.append((node, True))
+                stack.extend((child, False)
+                             for child in reversed(node._children))
+
     def get_value(
         self,
         variable_dict: Dict[str, int],
         value_combination: List[bool],
         expression_values_dict: Dict[str, bool]
     ) -> bool:
+        return self.fold(lambda node, operands: node._get_value(
+            variable_dict, value_combination, expression_values_dict, operands))
+
+    @abstractmethod
+    def _get_value(
+        self,
+        variable_dict: Dict[str, int],
+        value_combination: List[bool],
+        expression_values_dict: Dict[str, bool],
+        operands: List[bool]
+    ) -> bool:
+        pass
+
+    def get_mask(
+        self,
+        variable_masks: Dict[str, int],
+        full_mask: int,
+        expression_masks: Dict[str, int],
+        memo: Dict[int, int] = None
+    ) -> int:
+        # Nodes may be shared between several parents (see NodeInterner),
+        # memo makes every distinct node evaluate only once.
+        return self.fold(lambda node, operands: node._get_mask(
+            variable_masks, full_mask, expression_masks, operands), memo)
+
+    @abstractmethod
+    def _get_mask(
+        self,
+        variable_masks: Dict[str, int],
+        full_mask: int,
+        expression_masks: Dict[str, int],
+        operands: List[int]
+    ) -> int:
+        pass
+
+    @abstractmethod
+    def _generate_code(
+        self,
+        variable_names: Dict[str, str],
+        lines: List[str],
+        operand_names: List[str]
+    ) -> str:
+        pass
+
+    @abstractmethod
+    def get_bdd(self, bdd: BDD, operands: List[int]) -> int:
+        pass
+
+    @abstractmethod
+    def get_cnf_literal(self, cnf: CNF, operands: List[int]) -> int:
         pass
 
+    def get_key(self) -> Tuple:
+        return (type(self), tuple(id(child) for child in self._children))
+
+    def compile(self, variable_ls: List[str]) -> CompiledFunction:
+        """
+        Generates a Python function taking a tuple of booleans (ordered as
+        variable_ls) and returning the value of the tree together with
+        the values of its captured expressions, in get_expression_names
+        order. The function is cached per variable order.
+        """
+        key = tuple(variable_ls)
+        if self._compiled_functions is None:
+            self._compiled_functions = {}
+        if key in self._compiled_functions:
+            return self._compiled_functions[key]
+
+        variable_names = {name: f"_v{i}" for i, name in enumerate(key)}
+        lines, node_names = [], {}
+        # A shared node is generated once; its captures are repeated for
+        # every occurrence so they line up with get_expression_names.
+        result_name = self.fold(lambda node, operand_names: node._generate_code(
+            variable_names, lines, operand_names), node_names)
+        captured_names = [node_names[id(node)] for node in self._walk()
+                          if node._get_expression_name() is not None]
+        source = ["def _compiled(values):"]
+        if len(key) != 0:
+            source.append(f"    {', '.join(variable_names.values())}, = values")
+        source += [f"    {line}" for line in lines]
+        source.append(
+            f"    return {result_name}, ({''.join(n + ', ' for n in captured_names)})")
+
+        namespace = {}
+        exec(compile("\n".join(source), "<compiled expression>", "exec"),
+             namespace)
+        self._compiled_functions[key] = namespace["_compiled"]
+        return namespace["_compiled"]
+
     def _get_error_here(self) -> str:
         return f"Invalid tree topology at node with ID {self._id}."
 
     def _get_representation(self, nest=0):
-        representation = f"{nest * '|---'}{type(self).__name__}\n"
-        for child in self._children:
-            representation += child._get_representation(nest + 1)
-        return representation
+        lines = []
+        stack = [(self, nest)]
+        while len(stack) != 0:
+            node, nest = stack.pop()
+            lines.append(f"{nest * '|---'}{type(node).__name__}\n")
+            stack.extend((child, nest + 1)
+                         for child in reversed(node._children))
+        return "".join(lines)
+
+    def _get_expression_name(self) -> Union[str, None]:
+        return None
 
     def get_expression_names(self) -> List[str]:
-        expression_names = []
-        for child in self._children:
-            expression_names += child.get_expression_names()
-        return expression_names
+        names = [node._get_expression_name() for node in self._walk()]
+        return [name for name in names if name is not None]
 
     def __repr__(self):
         return self._get_representation()
 
 
 class TNOperator(TreeNode):
+    CODE_TEMPLATE = ""
+
     def __init__(self, id: int, operand_count: int):
         super().__init__(id)
         self._operand_count = operand_count
 
+    def _generate_code(
+        self,
+        _: Dict[str, str],
+        lines: List[str],
+        operand_names: List[str]
+    ) -> str:
+        self._check_validity()
+        name = f"_t{len(lines)}"
+        lines.append(f"{name} = {self.CODE_TEMPLATE.format(*operand_names)}")
+        return name
+
     def _check_validity(self):
         if len(self._children) != self._operand_count:
             raise Exception(
@@ -58,91 +215,187 @@ class TNOperator(TreeNode):
 
 
 class TNOperatorAND(TNOperator):
+    CODE_TEMPLATE = "{0} and {1}"
+
     def __init__(self, id: int):
         super().__init__(id, 2)
 
-    def get_value(
+    def _get_value(
         self,
-        variable_dict: Dict[str, int],
-        value_combination: List[bool],
-        expression_values_dict: Dict[str, bool]
+        _: Dict[str, int],
+        __: List[bool],
+        ___: Dict[str, bool],
+        operands: List[bool]
     ) -> bool:
         self._check_validity()
-        lvalue = self._children[0].get_value(variable_dict, value_combination,
-                                             expression_values_dict)
-        rvalue = self._children[1].get_value(variable_dict,
-                                             value_combination, expression_values_dict)
+        lvalue, rvalue = operands
         return lvalue and rvalue
 
+    def _get_mask(
+        self,
+        _: Dict[str, int],
+        __: int,
+        ___: Dict[str, int],
+        operands: List[int]
+    ) -> int:
+        self._check_validity()
+        lmask, rmask = operands
+        return lmask & rmask
+
+    def get_bdd(self, bdd: BDD, operands: List[int]) -> int:
+        self._check_validity()
+        return bdd.apply_and(*operands)
+
+    def get_cnf_literal(self, cnf: CNF, operands: List[int]) -> int:
+        self._check_validity()
+        return cnf.add_and(*operands)
+
 
 class TNOperatorOR(TNOperator):
+    CODE_TEMPLATE = "{0} or {1}"
+
     def __init__(self, id: int):
         super().__init__(id, 2)
 
-    def get_value(
+    def _get_value(
         self,
-        variable_dict: Dict[str, int],
-        value_combination: List[bool],
-        expression_values_dict: Dict[str, bool]
+        _: Dict[str, int],
+        __: List[bool],
+        ___: Dict[str, bool],
+        operands: List[bool]
     ) -> bool:
         self._check_validity()
-        lvalue = self._children[0].get_value(variable_dict, value_combination,
-                                             expression_values_dict)
-        rvalue = self._children[1].get_value(variable_dict,
-                                             value_combination, expression_values_dict)
+        lvalue, rvalue = operands
         return lvalue or rvalue
 
+    def _get_mask(
+        self,
+        _: Dict[str, int],
+        __: int,
+        ___: Dict[str, int],
+        operands: List[int]
+    ) -> int:
+        self._check_validity()
+        lmask, rmask = operands
+        return lmask | rmask
+
+    def get_bdd(self, bdd: BDD, operands: List[int]) -> int:
+        self._check_validity()
+        return bdd.apply_or(*operands)
+
+    def get_cnf_literal(self, cnf: CNF, operands: List[int]) -> int:
+        self._check_validity()
+        return cnf.add_or(*operands)
+
 
 class TNOperatorNOT(TNOperator):
+    CODE_TEMPLATE = "not {0}"
+
     def __init__(self, id: int):
         super().__init__(id, 1)
 
-    def get_value(
+    def _get_value(
         self,
-        variable_dict: Dict[str, int],
-        value_combination: List[bool],
-        expression_values_dict: Dict[str, bool]
+        _: Dict[str, int],
+        __: List[bool],
+        ___: Dict[str, bool],
+        operands: List[bool]
     ) -> bool:
         self._check_validity()
-        return not self._children[0].get_value(variable_dict, value_combination,
-                                               expression_values_dict)
+        return not operands[0]
+
+    def _get_mask(
+        self,
+        _: Dict[str, int],
+        full_mask: int,
+        __: Dict[str, int],
+        operands: List[int]
+    ) -> int:
+        self._check_validity()
+        return full_mask ^ operands[0]
+
+    def get_bdd(self, bdd: BDD, operands: List[int]) -> int:
+        self._check_validity()
+        return bdd.apply_not(*operands)
+
+    def get_cnf_literal(self, cnf: CNF, operands: List[int]) -> int:
+        self._check_validity()
+        return cnf.add_not(*operands)
 
 
 class TNOperatorImplication(TNOperator):
+    CODE_TEMPLATE = "not {0} or {1}"
+
     def __init__(self, id: int):
         super().__init__(id, 2)
 
-    def get_value(
+    def _get_value(
         self,
-        variable_dict: Dict[str, int],
-        value_combination: List[bool],
-        expression_values_dict: Dict[str, bool]
+        _: Dict[str, int],
+        __: List[bool],
+        ___: Dict[str, bool],
+        operands: List[bool]
     ) -> bool:
         self._check_validity()
-        lvalue = self._children[0].get_value(variable_dict, value_combination,
-                                             expression_values_dict)
-        rvalue = self._children[1].get_value(variable_dict,
-                                             value_combination, expression_values_dict)
+        lvalue, rvalue = operands
         return not(lvalue and not rvalue)
 
+    def _get_mask(
+        self,
+        _: Dict[str, int],
+        full_mask: int,
+        __: Dict[str, int],
+        operands: List[int]
+    ) -> int:
+        self._check_validity()
+        lmask, rmask = operands
+        return (full_mask ^ lmask) | rmask
+
+    def get_bdd(self, bdd: BDD, operands: List[int]) -> int:
+        self._check_validity()
+        return bdd.apply_implication(*operands)
+
+    def get_cnf_literal(self, cnf: CNF, operands: List[int]) -> int:
+        self._check_validity()
+        return cnf.add_implication(*operands)
+
 
 class TNOperatorEquivalency(TNOperator):
+    CODE_TEMPLATE = "{0} == {1}"
+
     def __init__(self, id: int):
         super().__init__(id, 2)
 
-    def get_value(
+    def _get_value(
         self,
-        variable_dict: Dict[str, int],
-        value_combination: List[bool],
-        expression_values_dict: Dict[str, bool]
+        _: Dict[str, int],
+        __: List[bool],
+        ___: Dict[str, bool],
+        operands: List[bool]
     ) -> bool:
         self._check_validity()
-        lvalue = self._children[0].get_value(variable_dict, value_combination,
-                                             expression_values_dict)
-        rvalue = self._children[1].get_value(variable_dict,
-                                             value_combination, expression_values_dict)
+        lvalue, rvalue = operands
         return lvalue == rvalue
 
+    def _get_mask(
+        self,
+        _: Dict[str, int],
+        full_mask: int,
+        __: Dict[str, int],
+        operands: List[int]
+    ) -> int:
+        self._check_validity()
+        lmask, rmask = operands
+        return full_mask ^ (lmask ^ rmask)
+
+    def get_bdd(self, bdd: BDD, operands: List[int]) -> int:
+        self._check_validity()
+        return bdd.apply_equivalency(*operands)
+
+    def get_cnf_literal(self, cnf: CNF, operands: List[int]) -> int:
+        self._check_validity()
+        return cnf.add_equivalency(*operands)
+
 
 class TNExpression(TreeNode):
     def __init__(self, id: int, to_register: bool, table_repr: str = ""):
@@ -158,24 +411,47 @@ class TNExpression(TreeNode):
             raise Exception(
                 f"{self._get_error_here()} Expressions can only have 1 child.")
 
-    def get_value(
+    def _get_value(
         self,
-        variable_dict: Dict[str, int],
-        value_combination: List[bool],
-        expression_values_dict: Dict[str, bool]
+        _: Dict[str, int],
+        __: List[bool],
+        expression_values_dict: Dict[str, bool],
+        operands: List[bool]
     ) -> bool:
-
-        value = self._children[0].get_value(variable_dict, value_combination,
-                                            expression_values_dict)
         if self._to_register:
-            expression_values_dict[self._table_repr] = value
-        return value
+            expression_values_dict[self._table_repr] = operands[0]
+        return operands[0]
 
-    def get_expression_names(self) -> List[str]:
-        expression_names = super().get_expression_names()
+    def _get_mask(
+        self,
+        _: Dict[str, int],
+        __: int,
+        expression_masks: Dict[str, int],
+        operands: List[int]
+    ) -> int:
         if self._to_register:
-            return expression_names + [self._table_repr]
-        return expression_names
+            expression_masks[self._table_repr] = operands[0]
+        return operands[0]
+
+    def _generate_code(
+        self,
+        _: Dict[str, str],
+        __: List[str],
+        operand_names: List[str]
+    ) -> str:
+        return operand_names[0]
+
+    def _get_expression_name(self) -> Union[str, None]:
+        return self._table_repr if self._to_register else None
+
+    def get_key(self) -> Tuple:
+        return super().get_key() + (self._to_register, self._table_repr)
+
+    def get_bdd(self, _: BDD, operands: List[int]) -> int:
+        return operands[0]
+
+    def get_cnf_literal(self, _: CNF, operands: List[int]) -> int:
+        return operands[0]
 
 
 class TNVariable(TreeNode):
@@ -187,16 +463,40 @@ class TNVariable(TreeNode):
         raise Exception(
             f"{self._get_error_here()} Variables cannot have children.")
 
-    def get_value(
+    def _get_value(
         self,
         variable_dict: Dict[str, int],
         value_combination: List[bool],
-        _: Dict[str, bool]
+        _: Dict[str, bool],
+        __: List[bool]
     ) -> bool:
         return value_combination[variable_dict[self._name]]
 
-    def get_expression_names(self) -> List[str]:
-        return []
+    def _get_mask(
+        self,
+        variable_masks: Dict[str, int],
+        _: int,
+        __: Dict[str, int],
+        ___: List[int]
+    ) -> int:
+        return variable_masks[self._name]
+
+    def _generate_code(
+        self,
+        variable_names: Dict[str, str],
+        _: List[str],
+        __: List[str]
+    ) -> str:
+        return variable_names[self._name]
+
+    def get_key(self) -> Tuple:
+        return super().get_key() + (self._name,)
+
+    def get_bdd(self, bdd: BDD, _: List[int]) -> int:
+        return bdd.get_variable(self._name)
+
+    def get_cnf_literal(self, cnf: CNF, _: List[int]) -> int:
+        return cnf.get_variable(self._name)
 
 
 class TNValue(TreeNode):
@@ -208,13 +508,37 @@ class TNValue(TreeNode):
         raise Exception(
             f"{self._get_error_here()} Values cannot have children.")
 
-    def get_value(
+    def _get_value(
         self,
         _: Dict[str, int],
         __: List[bool],
-        ___: Dict[str, bool]
+        ___: Dict[str, bool],
+        ____: List[bool]
     ) -> bool:
         return self._value
 
-    def get_expression_names(self) -> List[str]:
-        return []
+    def _get_mask(
+        self,
+        _: Dict[str, int],
+        full_mask: int,
+        __: Dict[str, int],
+        ___: List[int]
+    ) -> int:
+        return full_mask if self._value else full_mask ^ full_mask
+
+    def _generate_code(
+        self,
+        _: Dict[str, str],
+        __: List[str],
+        ___: List[str]
+    ) -> str:
+        return str(self._value)
+
+    def get_key(self) -> Tuple:
+        return super().get_key() + (self._value,)
+
+    def get_bdd(self, bdd: BDD, _: List[int]) -> int:
+        return bdd.TRUE if self._value else bdd.FALSE
+
+    def get_cnf_literal(self, cnf: CNF, _: List[int]) -> int:
+        return cnf.get_constant(self._value)
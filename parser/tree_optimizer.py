@@ -0,0 +1,133 @@
+import copy
+from typing import Dict, List, Union
+from parser.node_interner import NodeInterner
+from parser.tree_node import TNExpression, TNOperatorAND, TNOperatorEquivalency, TNOperatorImplication, TNOperatorNOT, TNOperatorOR, TNValue, TreeNode
+
+
+class TreeOptimizer:
+
+    """
+    Rewrites a parsed tree into an equivalent one that is cheaper to
+    evaluate: constants are folded, plain parentheses and double negations
+    are dropped, and identity, idempotence, complement and absorption rules
+    are applied. Captured expressions stay in the tree in their original
+    order, so the table keeps all of its columns; a branch is only ever
+    dropped if it contains no capture.
+    """
+
+    def __init__(self, interner: NodeInterner = None):
+        # Rewritten nodes are interned too, so equal operands end up as the
+        # same node and can be recognized by identity.
+        self._interner = interner or NodeInterner()
+        self._has_captures: Dict[int, bool] = {}
+
+    def optimize(self, tree: TreeNode) -> TreeNode:
+        self._has_captures = {}
+        return tree.fold(self._optimize_node)
+
+    def _optimize_node(self, node: TreeNode, children: List[TreeNode]) -> TreeNode:
+        if isinstance(node, TNExpression) and not node._to_register:
+            return children[0]
+        if isinstance(node, TNOperatorNOT):
+            return self._optimize_not(node, children[0])
+        if isinstance(node, TNOperatorAND):
+            return self._optimize_and_or(node, children, False)
+        if isinstance(node, TNOperatorOR):
+            return self._optimize_and_or(node, children, True)
+        if isinstance(node, TNOperatorImplication):
+            return self._optimize_implication(node, children)
+        if isinstance(node, TNOperatorEquivalency):
+            return self._optimize_equivalency(node, children)
+        return self._rebuild(node, children)
+
+    def _rebuild(self, node: TreeNode, children: List[TreeNode]) -> TreeNode:
+        if [id(child) for child in children] != [id(child) for child in node._children]:
+            node = copy.copy(node)
+            node._children = children
+            node._compiled_functions = None
+        node = self._interner.intern(node)
+        self._has_captures[id(node)] = \
+            (isinstance(node, TNExpression) and node._to_register) or \
+            any(self._has_captures[id(child)] for child in children)
+        return node
+
+    def _droppable(self, node: TreeNode) -> bool:
+        return not self._has_captures[id(node)]
+
+    @staticmethod
+    def _get_constant(node: TreeNode) -> Union[bool, None]:
+        return node._value if isinstance(node, TNValue) else None
+
+    def _make_constant(self, node: TreeNode, value: bool) -> TreeNode:
+        return self._rebuild(TNValue(node._id, "1" if value else "0"), [])
+
+    def _make_not(self, node: TreeNode, child: TreeNode) -> TreeNode:
+        return self._optimize_not(TNOperatorNOT(node._id), child)
+
+    def _optimize_not(self, node: TNOperatorNOT, child: TreeNode) -> TreeNode:
+        constant = self._get_constant(child)
+        if constant is not None:
+            return self._make_constant(node, not constant)
+        if isinstance(child, TNOperatorNOT):
+            return child._children[0]
+        return self._rebuild(node, [child])
+
+    def _is_complement(self, a: TreeNode, b: TreeNode) -> bool:
+        return (isinstance(a, TNOperatorNOT) and a._children[0] is b) or \
+            (isinstance(b, TNOperatorNOT) and b._children[0] is a)
+
+    def _optimize_and_or(self, node: TreeNode, children: List[TreeNode], is_or: bool) -> TreeNode:
+        """
+        AND and OR are duals: with is_or, the absorbing constant is 1 and
+        the neutral one 0, for AND the other way around.
+        """
+        lnode, rnode = children
+        for node_a, node_b in ((lnode, rnode), (rnode, lnode)):
+            constant = self._get_constant(node_a)
+            if constant is None:
+                continue
+            if constant != is_or:
+                return node_b
+            if self._droppable(node_b):
+                return node_a
+        if lnode is rnode and self._droppable(rnode):
+            return lnode
+        if self._is_complement(lnode, rnode) and self._droppable(lnode) and self._droppable(rnode):
+            return self._make_constant(node, is_or)
+        # Absorption: a & (a | b) = a, a | (a & b) = a.
+        dual_type = TNOperatorAND if is_or else TNOperatorOR
+        for node_a, node_b in ((lnode, rnode), (rnode, lnode)):
+            if isinstance(node_b, dual_type) and \
+                    any(child is node_a for child in node_b._children) and \
+                    self._droppable(node_b):
+                return node_a
+        return self._rebuild(node, children)
+
+    def _optimize_implication(self, node: TNOperatorImplication, children: List[TreeNode]) -> TreeNode:
+        lnode, rnode = children
+        lconstant, rconstant = self._get_constant(lnode), self._get_constant(rnode)
+        if lconstant is True:
+            return rnode
+        if lconstant is False and self._droppable(rnode):
+            return self._make_constant(node, True)
+        if rconstant is True and self._droppable(lnode):
+            return rnode
+        if rconstant is False:
+            return self._make_not(node, lnode)
+        if lnode is rnode and self._droppable(lnode):
+            return self._make_constant(node, True)
+        return self._rebuild(node, children)
+
+    def _optimize_equivalency(self, node: TNOperatorEquivalency, children: List[TreeNode]) -> TreeNode:
+        lnode, rnode = children
+        for node_a, node_b in ((lnode, rnode), (rnode, lnode)):
+            constant = self._get_constant(node_a)
+            if constant is True:
+                return node_b
+            if constant is False:
+                return self._make_not(node, node_b)
+        if lnode is rnode and self._droppable(lnode):
+            return self._make_constant(node, True)
+        if self._is_complement(lnode, rnode) and self._droppable(lnode) and self._droppable(rnode):
+            return self._make_constant(node, False)
+        return self._rebuild(node, children)
@@ -0,0 +1,432 @@
+import argparse
+import asyncio
+import json
+from collections import deque
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Deque, Dict, List, Set, Tuple, Union
+from urllib.parse import parse_qs, unquote, urlsplit
+
+from parser.expression_parser import ExpressionParser
+from parser.lru_cache import LRUCache
+from parser.table_generator import TableGenerator
+from bool_function.bool_function_manager import BoolFunctionManager
+
+
+# Per process: pool workers keep their own parse caches between requests.
+_expression_parser = ExpressionParser(optimize=True)
+_table_generator = TableGenerator(cache_size=0)
+
+
+def parse_expressions(expressions: List[str]) -> List[dict]:
+    results = []
+    for expression in expressions:
+        tree, variables, err = _expression_parser.parse(expression)
+        if err:
+            results.append({"expression": expression, "error": str(err)})
+            continue
+        results.append({
+            "expression": expression,
+            "variables": sorted(list(variables), key=str.casefold),
+            "header": _table_generator.get_table_header(tree, variables),
+            "error": None,
+        })
+    return results
+
+
+def evaluate_assignments(requests: List[Tuple[str, Dict[str, bool]]]) -> List[dict]:
+    results = []
+    for expression, assignment in requests:
+        tree, variables, err = _expression_parser.parse(expression)
+        if err:
+            results.append({"expression": expression, "error": str(err)})
+            continue
+        variable_ls = sorted(list(variables), key=str.casefold)
+        missing = [name for name in variable_ls if name not in assignment]
+        if len(missing) != 0:
+            results.append({"expression": expression,
+                            "error": f"Missing values for: {', '.join(missing)}"})
+            continue
+        value, expression_values = tree.compile(variable_ls)(
+            tuple(bool(assignment[name]) for name in variable_ls))
+        results.append({
+            "expression": expression,
+            "value": value,
+            "expressions": dict(zip(tree.get_expression_names(), expression_values)),
+            "error": None,
+        })
+    return results
+
+
+def generate_table_lines(expression: str, start: int, stop: int) -> bytes:
+    """
+    One JSON line with rows start..stop, serialized in the worker so the
+    event loop only has to write bytes.
+    """
+    tree, variables, err = _expression_parser.parse(expression)
+    if err:
+        raise err
+    rows = [row for chunk in _table_generator.generate_row_chunks(
+        tree, variables, stop - start, start=start, stop=stop) for row in chunk]
+    return (json.dumps({"rows": [[int(x) for x in row] for row in rows]}) + "\n").encode()
+
+
+class HTTPError(Exception):
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+
+
+class EvaluationServer:
+
+    """
+    Minimal HTTP/1.1 JSON server on asyncio streams, without external
+    dependencies. Connections are kept alive between requests. Parsing,
+    evaluation and table rows run in a process pool, so the event loop
+    only does I/O; parse results are kept in an LRU cache shared by all
+    connections, and batches go to the pool as a single task.
+
+        POST /parse      {"expressions": [...]} or {"expression": ...}
+        POST /evaluate   {"requests": [{"expression", "assignment"}, ...]}
+                         or {"expression": ..., "assignment": {...}}
+        POST /table      {"expression", "start", "stop", "chunk_size"},
+                         streamed as chunked JSON lines: the header, then
+                         {"rows": [...]} per chunk, at most
+                         MAX_TABLE_ROWS rows per request
+        GET  /functions                        saved function names
+        GET  /functions/NAME                   one saved function
+        GET  /functions?equivalent=EXPRESSION  equivalent saved functions
+    """
+
+    MAX_BODY_SIZE = 1 << 20
+    KEEP_ALIVE_TIMEOUT = 15
+    TABLE_CHUNK_SIZE = 4096
+    # Larger tables have to be paged through with start and stop.
+    MAX_TABLE_ROWS = 1 << 20
+    REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+               411: "Length Required", 413: "Payload Too Large", 500: "Internal Server Error"}
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 8421,
+        workers: int = None,
+        bool_function_manager: BoolFunctionManager = None,
+        cache_size: int = 1024
+    ):
+        self.host = host
+        self.port = port
+        self.workers = workers
+        self.bool_function_manager = bool_function_manager
+        self.parse_cache = LRUCache(cache_size)
+        self._executor: Executor = None
+        # The function store is not thread-safe, so it gets one thread.
+        self._store_executor: Executor = None
+        self._server: asyncio.AbstractServer = None
+        self._connections: Set[asyncio.Task] = set()
+
+    async def start(self) -> Tuple[str, int]:
+        """
+        Starts listening and returns the bound address, so port 0 picks a
+        free port.
+        """
+        self._executor = ProcessPoolExecutor(max_workers=self.workers)
+        self._store_executor = ThreadPoolExecutor(max_workers=1)
+        self._server = await asyncio.start_server(
+            self._handle_connection, self.host, self.port)
+        return self._server.sockets[0].getsockname()[:2]
+
+    async def serve_forever(self) -> None:
+        if self._server is None:
+            await self.start()
+        await self._server.serve_forever()
+
+    async def close(self) -> None:
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+        # Idle keep-alive connections would otherwise outlive the server.
+        for task in self._connections:
+            task.cancel()
+        await asyncio.gather(*self._connections, return_exceptions=True)
+        if self._executor is not None:
+            self._executor.shutdown(cancel_futures=True)
+            self._store_executor.shutdown(cancel_futures=True)
+
+    async def _run(self, function, *args) -> Any:
+        return await asyncio.get_running_loop().run_in_executor(self._executor, function, *args)
+
+    async def _read_request(self, reader: asyncio.StreamReader) -> Union[Tuple[str, str, Dict[str, str], bytes, str], None]:
+        try:
+            request_line = await asyncio.wait_for(reader.readline(), self.KEEP_ALIVE_TIMEOUT)
+        except asyncio.TimeoutError:
+            return None
+        if not request_line.strip():
+            return None
+        try:
+            method, target, version = request_line.decode("latin-1").split()
+        except ValueError:
+            raise HTTPError(400, "Malformed request line.")
+        headers = {}
+        while True:
+            line = await reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+        if "chunked" in headers.get("transfer-encoding", ""):
+            raise HTTPError(411, "Chunked request bodies are not supported.")
+        try:
+            length = int(headers.get("content-length", 0))
+        except ValueError:
+            raise HTTPError(400, "Invalid Content-Length.")
+        if length < 0:
+            raise HTTPError(400, "Invalid Content-Length.")
+        if length > self.MAX_BODY_SIZE:
+            raise HTTPError(413, "Request body too large.")
+        body = await reader.readexactly(length) if length else b""
+        return method, target, headers, body, version
+
+    @staticmethod
+    def _is_keep_alive(headers: Dict[str, str], version: str) -> bool:
+        connection = headers.get("connection", "").lower()
+        if version == "HTTP/1.0":
+            return connection == "keep-alive"
+        return connection != "close"
+
+    def _get_status_line(self, status: int) -> str:
+        return f"HTTP/1.1 {status} {self.REASONS[status]}\r\n"
+
+    async def _send_json(self, writer: asyncio.StreamWriter, status: int, payload: Any, keep_alive: bool) -> None:
+        body = json.dumps(payload).encode()
+        writer.write((
+            self._get_status_line(status) +
+            "Content-Type: application/json\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n").encode() + body)
+        await writer.drain()
+
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        task = asyncio.current_task()
+        self._connections.add(task)
+        try:
+            while True:
+                keep_alive = False
+                try:
+                    request = await self._read_request(reader)
+                    if request is None:
+                        break
+                    method, target, headers, body, version = request
+                    keep_alive = self._is_keep_alive(headers, version)
+                    await self._dispatch(method, target, body, writer, keep_alive)
+                except HTTPError as e:
+                    await self._send_json(writer, e.status, {"error": str(e)}, keep_alive)
+                except (asyncio.IncompleteReadError, ConnectionError):
+                    break
+                except Exception as e:
+                    await self._send_json(writer, 500, {"error": str(e)}, False)
+                    break
+                if not keep_alive:
+                    break
+        finally:
+            self._connections.discard(task)
+            writer.close()
+
+    @staticmethod
+    def _load_json(body: bytes) -> dict:
+        try:
+            payload = json.loads(body or b"{}")
+        except ValueError:
+            raise HTTPError(400, "Request body is not valid JSON.")
+        if not isinstance(payload, dict):
+            raise HTTPError(400, "Request body has to be a JSON object.")
+        return payload
+
+    async def _dispatch(self, method: str, target: str, body: bytes, writer: asyncio.StreamWriter, keep_alive: bool) -> None:
+        url = urlsplit(target)
+        path = url.path.rstrip("/")
+        if path.startswith("/functions"):
+            if method != "GET":
+                raise HTTPError(405, "Use GET for functions.")
+            payload = await self._handle_functions(unquote(path[len("/functions/"):]),
+                                                   parse_qs(url.query))
+            await self._send_json(writer, 200, payload, keep_alive)
+            return
+
+        handlers = {"/parse": self._handle_parse,
+                    "/evaluate": self._handle_evaluate}
+        if path not in handlers and path != "/table":
+            raise HTTPError(404, f"No endpoint {path}.")
+        if method != "POST":
+            raise HTTPError(405, f"Use POST for {path}.")
+        payload = self._load_json(body)
+        if path == "/table":
+            await self._handle_table(payload, writer, keep_alive)
+            return
+        await self._send_json(writer, 200, await handlers[path](payload), keep_alive)
+
+    @staticmethod
+    def _get_batch(payload: dict, key: str, single_keys: List[str]) -> Tuple[List[dict], bool]:
+        if key in payload:
+            if not isinstance(payload[key], list):
+                raise HTTPError(400, f"{key} has to be a list.")
+            return payload[key], True
+        if not all(single_key in payload for single_key in single_keys):
+            raise HTTPError(400, f"Expected {key} or {', '.join(single_keys)}.")
+        return [payload], False
+
+    async def _parse(self, expressions: List[str]) -> List[dict]:
+        results: List[dict] = [self.parse_cache.get(e) for e in expressions]
+        missing = list(dict.fromkeys(e for e, result in zip(expressions, results)
+                                     if result is None))
+        if len(missing) != 0:
+            parsed = dict(zip(missing, await self._run(parse_expressions, missing)))
+            for expression, result in parsed.items():
+                self.parse_cache.put(expression, result)
+            results = [parsed[e] if result is None else result
+                       for e, result in zip(expressions, results)]
+        return results
+
+    async def _handle_parse(self, payload: dict) -> dict:
+        if "expressions" in payload:
+            expressions, batched = payload["expressions"], True
+        elif "expression" in payload:
+            expressions, batched = [payload["expression"]], False
+        else:
+            raise HTTPError(400, "Expected expressions or expression.")
+        if not isinstance(expressions, list) or \
+                not all(isinstance(e, str) for e in expressions):
+            raise HTTPError(400, "Expressions have to be a list of strings.")
+        results = await self._parse(expressions)
+        return {"results": results} if batched else results[0]
+
+    async def _handle_evaluate(self, payload: dict) -> dict:
+        requests, batched = self._get_batch(
+            payload, "requests", ["expression", "assignment"])
+        if not all(isinstance(r, dict) and isinstance(r.get("expression"), str) and
+                   isinstance(r.get("assignment"), dict) for r in requests):
+            raise HTTPError(
+                400, "Every request needs an expression string and an assignment object.")
+        requests = [(r["expression"], r["assignment"]) for r in requests]
+        results = await self._run(evaluate_assignments, requests)
+        return {"results": results} if batched else results[0]
+
+    async def _handle_table(self, payload: dict, writer: asyncio.StreamWriter, keep_alive: bool) -> None:
+        expression = payload.get("expression")
+        if not isinstance(expression, str):
+            raise HTTPError(400, "Expected expression.")
+        parsed = (await self._parse([expression]))[0]
+        if parsed["error"]:
+            raise HTTPError(400, parsed["error"])
+        row_count = 1 << len(parsed["variables"])
+        try:
+            start = int(payload.get("start", 0))
+            stop = int(payload.get("stop", row_count))
+            chunk_size = int(payload.get("chunk_size", self.TABLE_CHUNK_SIZE))
+        except (TypeError, ValueError):
+            raise HTTPError(400, "start, stop and chunk_size have to be integers.")
+        if not 0 <= start <= stop <= row_count or chunk_size <= 0:
+            raise HTTPError(400, f"Invalid row range for {row_count} rows.")
+        if stop - start > self.MAX_TABLE_ROWS:
+            raise HTTPError(400, f"At most {self.MAX_TABLE_ROWS} rows per request, "
+                                 "use start and stop to page through larger tables.")
+
+        writer.write((
+            self._get_status_line(200) +
+            "Content-Type: application/x-ndjson\r\n"
+            "Transfer-Encoding: chunked\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n").encode())
+        self._write_chunk(writer, (json.dumps(
+            {"header": parsed["header"], "start": start, "stop": stop}) + "\n").encode())
+
+        # A bounded window of chunks in flight, written in order; drain()
+        # holds it back while the client is slower than the pool.
+        loop = asyncio.get_running_loop()
+        window = 2 * (self.workers or 1)
+        pending: Deque[asyncio.Future] = deque()
+        try:
+            for chunk_start in range(start, stop, chunk_size):
+                pending.append(loop.run_in_executor(
+                    self._executor, generate_table_lines, expression,
+                    chunk_start, min(chunk_start + chunk_size, stop)))
+                if len(pending) >= window:
+                    self._write_chunk(writer, await pending.popleft())
+                    await writer.drain()
+            while len(pending) != 0:
+                self._write_chunk(writer, await pending.popleft())
+                await writer.drain()
+        except Exception as e:
+            # The status line is out already; all that is left is to drop
+            # the connection so the client sees an incomplete response.
+            raise ConnectionAbortedError(str(e))
+        finally:
+            for future in pending:
+                future.cancel()
+        writer.write(b"0\r\n\r\n")
+        await writer.drain()
+
+    @staticmethod
+    def _write_chunk(writer: asyncio.StreamWriter, data: bytes) -> None:
+        writer.write(f"{len(data):x}\r\n".encode() + data + b"\r\n")
+
+    async def _handle_functions(self, name: str, query: Dict[str, List[str]]) -> dict:
+        manager = self.bool_function_manager
+        if manager is None:
+            raise HTTPError(404, "No functions file is being served.")
+
+        def to_json(bool_function) -> dict:
+            return {"name": bool_function.name, "expression": bool_function.expression,
+                    "variables": bool_function.variable_ls}
+
+        # File access runs on the store thread, off the event loop.
+        loop = asyncio.get_running_loop()
+        if name:
+            functions = await loop.run_in_executor(
+                self._store_executor, lambda: list(manager.load_by_name(name)))
+            if len(functions) == 0:
+                raise HTTPError(404, f"No function named {name}.")
+            return to_json(functions[0])
+        if "equivalent" in query:
+            expression = query["equivalent"][0]
+
+            def find_equivalent() -> List:
+                try:
+                    return list(manager.find_equivalent(expression))
+                except Exception as e:
+                    raise HTTPError(400, str(e))
+            functions = await loop.run_in_executor(self._store_executor, find_equivalent)
+            return {"functions": [to_json(f) for f in functions]}
+        names = await loop.run_in_executor(
+            self._store_executor, lambda: list(manager.load_all_names()))
+        return {"names": names}
+
+
+def main(argv: List[str] = None):
+    arg_parser = argparse.ArgumentParser(
+        description="Serve expression parsing and evaluation over local HTTP.")
+    arg_parser.add_argument("--host", default="127.0.0.1")
+    arg_parser.add_argument("--port", type=int, default=8421)
+    arg_parser.add_argument("--workers", type=int, default=None,
+                            help="worker processes, defaults to the CPU count")
+    arg_parser.add_argument("--functions", metavar="FILENAME",
+                            help="saved functions file to serve under /functions")
+    args = arg_parser.parse_args(argv)
+
+    manager = BoolFunctionManager(args.functions) if args.functions else None
+    server = EvaluationServer(args.host, args.port, args.workers, manager)
+
+    async def serve():
+        host, port = await server.start()
+        print(f"Serving on http://{host}:{port}")
+        try:
+            await server.serve_forever()
+        finally:
+            await server.close()
+
+    try:
+        asyncio.run(serve())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,30 @@
+"""
+Decision procedures on expression trees: BDDs, SAT, minimization and
+fingerprints.
+Names are imported on first access (PEP 562), so importing the package
+itself costs next to nothing.
+"""
+import importlib
+from typing import Any, Dict, List
+
+_EXPORTS: Dict[str, str] = {
+    "BDD": "solver.bdd",
+    "CNF": "solver.cnf",
+    "SATSolver": "solver.sat_solver",
+    "Minimizer": "solver.minimizer",
+    "Fingerprinter": "solver.fingerprinter",
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name: str) -> Any:
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(_EXPORTS[name]), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> List[str]:
+    return sorted(set(globals()) | set(__all__))
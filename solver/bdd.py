@@ -0,0 +1,177 @@
+from typing import Dict, List, Tuple
+from parser.tree_node import TreeNode
+
+
+class BDD:
+
+    """
+    Reduced ordered binary decision diagram manager. Nodes are integers:
+    0 and 1 are the terminals, every other node is (level, low, high)
+    stored once in the unique table, so equal functions built in the same
+    manager get the same node. Variables are ordered by first use unless
+    an order is passed in.
+    """
+
+    FALSE, TRUE = 0, 1
+
+    def __init__(self, variable_ls: List[str] = None):
+        self._variable_levels: Dict[str, int] = {}
+        terminal_level = float("inf")
+        self._levels: List[float] = [terminal_level, terminal_level]
+        self._lows: List[int] = [self.FALSE, self.TRUE]
+        self._highs: List[int] = [self.FALSE, self.TRUE]
+        self._unique_table: Dict[Tuple[int, int, int], int] = {}
+        self._ite_cache: Dict[Tuple[int, int, int], int] = {}
+        for name in variable_ls or []:
+            self.get_variable(name)
+
+    def get_variable_ls(self) -> List[str]:
+        return list(self._variable_levels)
+
+    def get_node_count(self) -> int:
+        return len(self._levels)
+
+    def _make_node(self, level: int, low: int, high: int) -> int:
+        if low == high:
+            return low
+        key = (level, low, high)
+        node = self._unique_table.get(key)
+        if node is None:
+            node = len(self._levels)
+            self._levels.append(level)
+            self._lows.append(low)
+            self._highs.append(high)
+            self._unique_table[key] = node
+        return node
+
+    def get_variable(self, name: str) -> int:
+        if name not in self._variable_levels:
+            self._variable_levels[name] = len(self._variable_levels)
+        return self._make_node(self._variable_levels[name], self.FALSE, self.TRUE)
+
+    def _get_cofactors(self, node: int, level: int) -> Tuple[int, int]:
+        if self._levels[node] != level:
+            return node, node
+        return self._lows[node], self._highs[node]
+
+    def ite(self, f: int, g: int, h: int) -> int:
+        if f == self.TRUE:
+            return g
+        if f == self.FALSE:
+            return h
+        if g == h:
+            return g
+        if g == self.TRUE and h == self.FALSE:
+            return f
+        key = (f, g, h)
+        result = self._ite_cache.get(key)
+        if result is not None:
+            return result
+        level = min(self._levels[f], self._levels[g], self._levels[h])
+        f_low, f_high = self._get_cofactors(f, level)
+        g_low, g_high = self._get_cofactors(g, level)
+        h_low, h_high = self._get_cofactors(h, level)
+        result = self._make_node(
+            level, self.ite(f_low, g_low, h_low), self.ite(f_high, g_high, h_high))
+        self._ite_cache[key] = result
+        return result
+
+    def apply_not(self, f: int) -> int:
+        return self.ite(f, self.FALSE, self.TRUE)
+
+    def apply_and(self, f: int, g: int) -> int:
+        return self.ite(f, g, self.FALSE)
+
+    def apply_or(self, f: int, g: int) -> int:
+        return self.ite(f, self.TRUE, g)
+
+    def apply_implication(self, f: int, g: int) -> int:
+        return self.ite(f, g, self.TRUE)
+
+    def apply_equivalency(self, f: int, g: int) -> int:
+        return self.ite(f, g, self.apply_not(g))
+
+    def build(self, tree: TreeNode) -> int:
+        return tree.fold(lambda node, operands: node.get_bdd(self, operands))
+
+    def count_models(self, node: int) -> int:
+        """
+        Number of assignments to all variables known to the manager for
+        which node evaluates to true.
+        """
+        variable_count = len(self._variable_levels)
+        counts: Dict[int, int] = {self.FALSE: 0, self.TRUE: 1}
+
+        def get_level(node: int) -> int:
+            return min(self._levels[node], variable_count)
+
+        stack = [node]
+        while len(stack) != 0:
+            current = stack[-1]
+            if current in counts:
+                stack.pop()
+                continue
+            low, high = self._lows[current], self._highs[current]
+            if low not in counts or high not in counts:
+                stack.extend(child for child in (low, high)
+                             if child not in counts)
+                continue
+            stack.pop()
+            level = get_level(current)
+            counts[current] = \
+                (counts[low] << (get_level(low) - level - 1)) + \
+                (counts[high] << (get_level(high) - level - 1))
+        return counts[node] << get_level(node)
+
+    def _get_descendants(self, node: int) -> List[int]:
+        """
+        Inner nodes reachable from node, every node after its children.
+        """
+        order, seen = [], {self.FALSE, self.TRUE}
+        stack = [(node, False)]
+        while len(stack) != 0:
+            current, expanded = stack.pop()
+            if expanded:
+                order.append(current)
+            elif current not in seen:
+                seen.add(current)
+                stack.append((current, True))
+                stack.append((self._highs[current], False))
+                stack.append((self._lows[current], False))
+        return order
+
+    def get_support(self, node: int) -> List[str]:
+        """
+        Variables node actually depends on, in manager order.
+        """
+        variable_ls = self.get_variable_ls()
+        levels = {self._levels[n] for n in self._get_descendants(node)}
+        return [variable_ls[level] for level in sorted(levels)]
+
+    def get_canonical_form(self, node: int) -> str:
+        """
+        Serializes the diagram under node by variable name. Reduced
+        diagrams are canonical, so two functions get the same string iff
+        they are equal, as long as both managers order the variables they
+        share the same way.
+        """
+        variable_ls = self.get_variable_ls()
+        names = {self.FALSE: "0", self.TRUE: "1"}
+        lines = []
+        for current in self._get_descendants(node):
+            names[current] = f"n{len(lines)}"
+            lines.append(f"{variable_ls[self._levels[current]]}?"
+                         f"{names[self._highs[current]]}:{names[self._lows[current]]}")
+        return ";".join(lines) if len(lines) != 0 else names[node]
+
+    def is_tautology(self, tree: TreeNode) -> bool:
+        return self.build(tree) == self.TRUE
+
+    def is_contradiction(self, tree: TreeNode) -> bool:
+        return self.build(tree) == self.FALSE
+
+    def are_equivalent(self, tree_a: TreeNode, tree_b: TreeNode) -> bool:
+        return self.build(tree_a) == self.build(tree_b)
+
+    def count_satisfying(self, tree: TreeNode) -> int:
+        return self.count_models(self.build(tree))
@@ -0,0 +1,66 @@
+from typing import Dict, List
+from parser.tree_node import TreeNode
+
+
+class CNF:
+
+    """
+    Clause set in DIMACS convention: variables are positive integers and
+    a negative literal is a negated variable. build() applies the Tseitin
+    transform, giving every operator node a fresh variable constrained to
+    equal its value, so the clause count stays linear in the tree size.
+    """
+
+    def __init__(self):
+        self.clauses: List[List[int]] = []
+        self.variable_count = 0
+        self._variables: Dict[str, int] = {}
+        self._true_literal: int = None
+
+    def get_variables(self) -> Dict[str, int]:
+        return dict(self._variables)
+
+    def new_variable(self) -> int:
+        self.variable_count += 1
+        return self.variable_count
+
+    def get_variable(self, name: str) -> int:
+        if name not in self._variables:
+            self._variables[name] = self.new_variable()
+        return self._variables[name]
+
+    def get_constant(self, value: bool) -> int:
+        if self._true_literal is None:
+            self._true_literal = self.new_variable()
+            self.clauses.append([self._true_literal])
+        return self._true_literal if value else -self._true_literal
+
+    def add_not(self, a: int) -> int:
+        return -a
+
+    def add_and(self, a: int, b: int) -> int:
+        x = self.new_variable()
+        self.clauses += [[-x, a], [-x, b], [x, -a, -b]]
+        return x
+
+    def add_or(self, a: int, b: int) -> int:
+        x = self.new_variable()
+        self.clauses += [[x, -a], [x, -b], [-x, a, b]]
+        return x
+
+    def add_implication(self, a: int, b: int) -> int:
+        return self.add_or(-a, b)
+
+    def add_equivalency(self, a: int, b: int) -> int:
+        x = self.new_variable()
+        self.clauses += [[-x, -a, b], [-x, a, -b], [x, a, b], [x, -a, -b]]
+        return x
+
+    def build(self, tree: TreeNode) -> int:
+        """
+        Encodes tree and asserts it, returning the literal of its root.
+        """
+        literal = tree.fold(
+            lambda node, operands: node.get_cnf_literal(self, operands))
+        self.clauses.append([literal])
+        return literal
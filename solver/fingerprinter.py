@@ -0,0 +1,81 @@
+import hashlib
+from typing import List, Set, Tuple
+from parser.expression_parser import ExpressionParser
+from parser.table_generator import TableGenerator
+from parser.tree_node import TreeNode
+from solver.bdd import BDD
+
+
+class Fingerprinter:
+
+    """
+    Semantic fingerprints: two expressions get the same fingerprint iff
+    they are equivalent, also when one mentions variables the other does
+    not but neither depends on. Functions of up to TABLE_VARIABLE_LIMIT
+    relevant variables are identified by their result column over those
+    variables, larger ones by their reduced BDD; both over variables in
+    table order.
+    """
+
+    TABLE_VARIABLE_LIMIT = 16
+
+    def __init__(self, expression_parser: ExpressionParser = None, table_generator: TableGenerator = None):
+        self.expression_parser = expression_parser or ExpressionParser()
+        self.table_generator = table_generator or TableGenerator(cache_size=0)
+
+    @staticmethod
+    def _hash(canonical_form: str) -> str:
+        return hashlib.sha256(canonical_form.encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def _sort_variables(variables: Set[str]) -> List[str]:
+        # Table order, with ties between names differing only in case
+        # broken by the names themselves, so the order never depends on
+        # set iteration order.
+        return sorted(list(variables), key=lambda name: (name.casefold(), name))
+
+    def _get_support(self, tree: TreeNode, variable_ls: List[str]) -> Tuple[List[str], int]:
+        """
+        Drops the variables the result column does not depend on: variable
+        i is irrelevant iff every row where it is true matches the row
+        2^(n - 1 - i) further down, where only it is false.
+        """
+        masks = self.table_generator._generate_variable_masks(len(variable_ls))
+        full_mask = (1 << (1 << len(variable_ls))) - 1
+        result_mask = tree.get_mask(
+            dict(zip(variable_ls, masks)), full_mask, {})
+        support = []
+        for i, name in enumerate(variable_ls):
+            stride = 1 << (len(variable_ls) - i - 1)
+            if (result_mask & masks[i]) << stride != result_mask & (full_mask ^ masks[i]):
+                support.append(name)
+        return support, result_mask
+
+    def _get_table_form(self, tree: TreeNode, variable_ls: List[str], support: List[str], result_mask: int) -> str:
+        if len(support) != len(variable_ls):
+            # The other variables do not matter, so any constant will do.
+            variable_masks = dict.fromkeys(variable_ls, 0)
+            variable_masks.update(zip(
+                support, self.table_generator._generate_variable_masks(len(support))))
+            result_mask = tree.get_mask(
+                variable_masks, (1 << (1 << len(support))) - 1, {})
+        return f"table:{','.join(support)}:{result_mask:x}"
+
+    def get_fingerprint(self, tree: TreeNode, variables: Set[str]) -> str:
+        variable_ls = self._sort_variables(variables)
+        if len(variable_ls) <= self.TABLE_VARIABLE_LIMIT:
+            support, result_mask = self._get_support(tree, variable_ls)
+            return self._hash(self._get_table_form(tree, variable_ls, support, result_mask))
+
+        bdd = BDD(variable_ls)
+        root = bdd.build(tree)
+        support = bdd.get_support(root)
+        if len(support) <= self.TABLE_VARIABLE_LIMIT:
+            return self._hash(self._get_table_form(tree, variable_ls, support, None))
+        return self._hash(f"bdd:{bdd.get_canonical_form(root)}")
+
+    def get_expression_fingerprint(self, expression: str) -> str:
+        tree, variables, err = self.expression_parser.parse(expression)
+        if err:
+            raise err
+        return self.get_fingerprint(tree, variables)
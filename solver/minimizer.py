@@ -0,0 +1,195 @@
+from typing import Dict, FrozenSet, List, Set, Tuple, Union
+from parser.table_generator import TableGenerator
+from parser.tree_node import TreeNode
+
+
+# (care, value): covers minterm m iff m & care == value. Minterm bit
+# n - 1 - i holds variable i, so the first variable is the top bit.
+Cube = Tuple[int, int]
+
+
+class Minimizer:
+
+    """
+    Two-level minimization into this project's expression syntax.
+    Up to EXACT_VARIABLE_LIMIT variables, Quine-McCluskey prime implicants
+    are covered exactly with Petrick's method, or greedily once it would
+    need more than PETRICK_PRODUCT_LIMIT products, as most functions of
+    7 or 8 variables do. Above it an Espresso-style expand / irredundant
+    pass works on bit-packed minterm sets, where dropping a literal from
+    a cube is a single shift-and-or. That pass still takes seconds at 16
+    variables; parity, where no cube grows, is the slowest case.
+    """
+
+    EXACT_VARIABLE_LIMIT = 8
+    PETRICK_PRODUCT_LIMIT = 512
+
+    def __init__(self, table_generator: TableGenerator = None):
+        self.table_generator = table_generator or TableGenerator()
+
+    @staticmethod
+    def _get_on_set(result_mask: int, variable_count: int) -> int:
+        # Table row r holds minterm ~r (row 0 is the all-true assignment),
+        # so the minterm bitset is the row mask reversed.
+        row_count = 1 << variable_count
+        return int(format(result_mask, f"0{row_count}b")[::-1], 2)
+
+    def _get_prime_implicants(self, minterms: List[int], variable_count: int) -> Set[Cube]:
+        full_care = (1 << variable_count) - 1
+        current = {(full_care, m) for m in minterms}
+        primes = set()
+        while len(current) != 0:
+            combined, merged = set(), set()
+            for care, value in current:
+                bit = care
+                while bit:
+                    stride = bit & -bit
+                    bit ^= stride
+                    partner = (care, value ^ stride)
+                    if partner in current:
+                        merged.add((care, value))
+                        merged.add(partner)
+                        combined.add((care ^ stride, value & ~stride))
+            primes |= current - merged
+            current = combined
+        return primes
+
+    @staticmethod
+    def _get_cube_cost(cube: Cube) -> int:
+        return bin(cube[0]).count("1")
+
+    def _petrick(self, primes: List[Cube], minterms: List[int]) -> Union[List[Cube], None]:
+        # Gives up with None once the product of sums grows past
+        # PETRICK_PRODUCT_LIMIT, as it can grow exponentially.
+        products: Set[FrozenSet[int]] = {frozenset()}
+        for m in minterms:
+            covering = frozenset(
+                i for i, (care, value) in enumerate(primes) if m & care == value)
+            expanded = set()
+            for product in products:
+                if product & covering:
+                    expanded.add(product)
+                else:
+                    expanded.update(product | {i} for i in covering)
+            if len(expanded) > self.PETRICK_PRODUCT_LIMIT:
+                return None
+            # Absorption: drop every product a smaller one is a subset of.
+            products = set()
+            for product in sorted(expanded, key=len):
+                if not any(other < product for other in products):
+                    products.add(product)
+        best = min(products, key=lambda product: (
+            len(product), sum(self._get_cube_cost(primes[i]) for i in product)))
+        return [primes[i] for i in sorted(best)]
+
+    def _cover_greedy(self, primes: List[Cube], minterms: List[int]) -> List[Cube]:
+        # Repeatedly takes the prime covering the most uncovered minterms,
+        # preferring fewer literals on ties.
+        uncovered = set(minterms)
+        cover = []
+        while len(uncovered) != 0:
+            best = max(primes, key=lambda cube: (
+                sum(1 for m in uncovered if m & cube[0] == cube[1]),
+                -self._get_cube_cost(cube)))
+            cover.append(best)
+            uncovered = {m for m in uncovered if m & best[0] != best[1]}
+        return sorted(cover)
+
+    def _minimize_exact(self, on_set: int, variable_count: int) -> List[Cube]:
+        minterms = [m for m in range(1 << variable_count) if on_set >> m & 1]
+        primes = sorted(self._get_prime_implicants(minterms, variable_count))
+        coverage: Dict[int, List[int]] = {
+            m: [i for i, (care, value) in enumerate(primes) if m & care == value]
+            for m in minterms}
+
+        essential = {covering[0] for covering in coverage.values()
+                     if len(covering) == 1}
+        remaining = [m for m, covering in coverage.items()
+                     if essential.isdisjoint(covering)]
+        cover = [primes[i] for i in sorted(essential)]
+        if len(remaining) != 0:
+            cover += self._petrick(primes, remaining) or \
+                self._cover_greedy(primes, remaining)
+        return cover
+
+    def _minimize_heuristic(self, on_set: int, variable_count: int) -> List[Cube]:
+        off_set = ((1 << (1 << variable_count)) - 1) ^ on_set
+
+        # Expand every still uncovered minterm into a cube as large as the
+        # off-set allows.
+        expanded: List[Tuple[Cube, int]] = []
+        uncovered = on_set
+        while uncovered:
+            m = (uncovered & -uncovered).bit_length() - 1
+            care, bits = (1 << variable_count) - 1, 1 << m
+            for shift in range(variable_count - 1, -1, -1):
+                stride = 1 << shift
+                candidate = bits | (bits >> stride if m & stride else bits << stride)
+                if candidate & off_set == 0:
+                    care ^= stride
+                    bits = candidate
+            expanded.append(((care, m & care), bits))
+            uncovered &= ~bits
+
+        # Irredundant: drop cubes fully covered by the kept cubes before
+        # them and by all cubes after them.
+        suffix_unions = [0] * (len(expanded) + 1)
+        for i in range(len(expanded) - 1, -1, -1):
+            suffix_unions[i] = suffix_unions[i + 1] | expanded[i][1]
+        cover, kept_union = [], 0
+        for i, (cube, bits) in enumerate(expanded):
+            if bits & ~(kept_union | suffix_unions[i + 1]):
+                cover.append(cube)
+                kept_union |= bits
+        return cover
+
+    def _minimize_cubes(self, on_set: int, variable_count: int) -> List[Cube]:
+        if on_set == 0:
+            return []
+        if variable_count <= self.EXACT_VARIABLE_LIMIT:
+            return self._minimize_exact(on_set, variable_count)
+        return self._minimize_heuristic(on_set, variable_count)
+
+    @staticmethod
+    def _get_literals(cube: Cube, variable_ls: List[str], negate: bool) -> List[str]:
+        care, value = cube
+        literals = []
+        for i, name in enumerate(variable_ls):
+            stride = 1 << (len(variable_ls) - i - 1)
+            if care & stride:
+                positive = (value & stride != 0) != negate
+                literals.append(name if positive else f"!{name}")
+        return literals
+
+    def minimize_column(self, result_mask: int, variable_ls: List[str], cnf: bool = False) -> str:
+        """
+        Minimizes a result column in TableGenerator mask layout over
+        variable_ls, returning a sum of products, or with cnf a product of
+        sums built from the minimized complement.
+        """
+        variable_count = len(variable_ls)
+        on_set = self._get_on_set(result_mask, variable_count)
+        if cnf:
+            on_set ^= (1 << (1 << variable_count)) - 1
+        cubes = self._minimize_cubes(on_set, variable_count)
+        positions = {name: i for i, name in enumerate(variable_ls)}
+        terms = sorted(
+            [self._get_literals(cube, variable_ls, cnf) for cube in cubes],
+            key=lambda term: [(positions[literal.lstrip("!")], literal[0] == "!")
+                              for literal in term])
+
+        if len(terms) == 0:
+            return "1" if cnf else "0"
+        if any(len(term) == 0 for term in terms):
+            return "0" if cnf else "1"
+        if cnf:
+            if len(terms) == 1:
+                return " | ".join(terms[0])
+            return " & ".join(
+                term[0] if len(term) == 1 else f"({' | '.join(term)})" for term in terms)
+        return " | ".join(" & ".join(term) for term in terms)
+
+    def minimize(self, tree: TreeNode, variables: Set[str], cnf: bool = False) -> str:
+        header, masks = self.table_generator.generate_table_masks(
+            tree, variables)
+        return self.minimize_column(masks[-1], header[:len(variables)], cnf)
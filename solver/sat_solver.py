@@ -0,0 +1,247 @@
+import heapq
+from typing import Dict, List, Tuple, Union
+from parser.tree_node import TreeNode
+from solver.cnf import CNF
+
+
+class SATSolver:
+
+    """
+    CDCL solver: two watched literals per clause, unit propagation,
+    first-UIP clause learning with non-chronological backjumping, VSIDS
+    branching with phase saving and Luby restarts.
+    """
+
+    ACTIVITY_DECAY = 0.95
+    RESTART_UNIT = 100
+
+    def __init__(self):
+        self._reset(0)
+
+    def _reset(self, variable_count: int):
+        self._variable_count = variable_count
+        self._clauses: List[List[int]] = []
+        self._watches: Dict[int, List[int]] = {}
+        for var in range(1, variable_count + 1):
+            self._watches[var] = []
+            self._watches[-var] = []
+        # Per variable: 1 true, -1 false, 0 unassigned.
+        self._values = [0] * (variable_count + 1)
+        self._levels = [0] * (variable_count + 1)
+        self._reasons: List[Union[int, None]] = [None] * (variable_count + 1)
+        self._phases = [False] * (variable_count + 1)
+        self._trail: List[int] = []
+        self._trail_limits: List[int] = []
+        self._queue_head = 0
+        self._activities = [0.0] * (variable_count + 1)
+        self._activity_increment = 1.0
+        self._order_heap: List[Tuple[float, int]] = [
+            (0.0, var) for var in range(1, variable_count + 1)]
+
+    def _get_literal_value(self, literal: int) -> int:
+        value = self._values[abs(literal)]
+        return value if literal > 0 else -value
+
+    def _enqueue(self, literal: int, reason: Union[int, None]) -> None:
+        var = abs(literal)
+        self._values[var] = 1 if literal > 0 else -1
+        self._levels[var] = len(self._trail_limits)
+        self._reasons[var] = reason
+        self._trail.append(literal)
+
+    def _add_clause(self, clause: List[int]) -> bool:
+        clause = list(dict.fromkeys(clause))
+        literals = set(clause)
+        if any(-literal in literals for literal in clause):
+            return True
+        if len(clause) == 0:
+            return False
+        if len(clause) == 1:
+            value = self._get_literal_value(clause[0])
+            if value == 0:
+                self._enqueue(clause[0], None)
+            return value != -1
+        self._watch_clause(clause)
+        return True
+
+    def _watch_clause(self, clause: List[int]) -> int:
+        clause_idx = len(self._clauses)
+        self._clauses.append(clause)
+        self._watches[clause[0]].append(clause_idx)
+        self._watches[clause[1]].append(clause_idx)
+        return clause_idx
+
+    def _propagate(self) -> Union[int, None]:
+        """
+        Returns the index of a conflicting clause, or None. Watched
+        literals sit at positions 0 and 1; the implied literal of a reason
+        clause is always at position 0.
+        """
+        while self._queue_head < len(self._trail):
+            false_literal = -self._trail[self._queue_head]
+            self._queue_head += 1
+            watchers = self._watches[false_literal]
+            kept_watchers = []
+            for i, clause_idx in enumerate(watchers):
+                clause = self._clauses[clause_idx]
+                if clause[0] == false_literal:
+                    clause[0], clause[1] = clause[1], clause[0]
+                if self._get_literal_value(clause[0]) == 1:
+                    kept_watchers.append(clause_idx)
+                    continue
+                for k in range(2, len(clause)):
+                    if self._get_literal_value(clause[k]) != -1:
+                        clause[1], clause[k] = clause[k], clause[1]
+                        self._watches[clause[1]].append(clause_idx)
+                        break
+                else:
+                    kept_watchers.append(clause_idx)
+                    if self._get_literal_value(clause[0]) == -1:
+                        kept_watchers += watchers[i + 1:]
+                        self._watches[false_literal] = kept_watchers
+                        self._queue_head = len(self._trail)
+                        return clause_idx
+                    self._enqueue(clause[0], clause_idx)
+            self._watches[false_literal] = kept_watchers
+        return None
+
+    def _bump_activity(self, var: int) -> None:
+        self._activities[var] += self._activity_increment
+        if self._activities[var] > 1e100:
+            self._activities = [a * 1e-100 for a in self._activities]
+            self._activity_increment *= 1e-100
+            self._order_heap = [(-self._activities[v], v)
+                                for v in range(1, self._variable_count + 1)
+                                if self._values[v] == 0]
+            heapq.heapify(self._order_heap)
+        elif self._values[var] == 0:
+            heapq.heappush(self._order_heap, (-self._activities[var], var))
+
+    def _analyze(self, conflict_idx: int) -> Tuple[List[int], int]:
+        """
+        Derives the first-UIP learned clause (asserting literal first) and
+        the decision level to jump back to.
+        """
+        current_level = len(self._trail_limits)
+        seen = set()
+        learned = [0]
+        counter = 0
+        literal = None
+        clause = self._clauses[conflict_idx]
+        trail_idx = len(self._trail) - 1
+        while True:
+            for other in clause[0 if literal is None else 1:]:
+                var = abs(other)
+                if var in seen or self._levels[var] == 0:
+                    continue
+                seen.add(var)
+                self._bump_activity(var)
+                if self._levels[var] == current_level:
+                    counter += 1
+                else:
+                    learned.append(other)
+            while abs(self._trail[trail_idx]) not in seen:
+                trail_idx -= 1
+            literal = self._trail[trail_idx]
+            trail_idx -= 1
+            seen.discard(abs(literal))
+            counter -= 1
+            if counter == 0:
+                break
+            clause = self._clauses[self._reasons[abs(literal)]]
+        learned[0] = -literal
+
+        backjump_level = 0
+        if len(learned) > 1:
+            max_idx = max(range(1, len(learned)),
+                          key=lambda i: self._levels[abs(learned[i])])
+            learned[1], learned[max_idx] = learned[max_idx], learned[1]
+            backjump_level = self._levels[abs(learned[1])]
+        return learned, backjump_level
+
+    def _backtrack(self, level: int) -> None:
+        if len(self._trail_limits) <= level:
+            return
+        limit = self._trail_limits[level]
+        for literal in self._trail[limit:]:
+            var = abs(literal)
+            self._phases[var] = literal > 0
+            self._values[var] = 0
+            self._reasons[var] = None
+            heapq.heappush(self._order_heap, (-self._activities[var], var))
+        del self._trail[limit:]
+        del self._trail_limits[level:]
+        self._queue_head = len(self._trail)
+
+    def _pick_branch_literal(self) -> Union[int, None]:
+        while len(self._order_heap) != 0:
+            _, var = heapq.heappop(self._order_heap)
+            if self._values[var] == 0:
+                return var if self._phases[var] else -var
+        return None
+
+    @staticmethod
+    def _luby(i: int) -> int:
+        size, sequence = 1, 0
+        while size < i + 1:
+            sequence += 1
+            size = 2 * size + 1
+        while size - 1 != i:
+            size = (size - 1) >> 1
+            sequence -= 1
+            i %= size
+        return 1 << sequence
+
+    def solve_cnf(self, clauses: List[List[int]], variable_count: int) -> Union[List[bool], None]:
+        """
+        Returns a model as a list indexed by variable - 1, or None when the
+        clauses are unsatisfiable.
+        """
+        self._reset(variable_count)
+        for clause in clauses:
+            if not self._add_clause(clause):
+                return None
+
+        restart_count, conflict_count = 0, 0
+        restart_limit = self.RESTART_UNIT * self._luby(restart_count)
+        while True:
+            conflict_idx = self._propagate()
+            if conflict_idx is not None:
+                if len(self._trail_limits) == 0:
+                    return None
+                learned, backjump_level = self._analyze(conflict_idx)
+                self._backtrack(backjump_level)
+                if len(learned) == 1:
+                    self._enqueue(learned[0], None)
+                else:
+                    self._enqueue(learned[0], self._watch_clause(learned))
+                self._activity_increment /= self.ACTIVITY_DECAY
+                conflict_count += 1
+                if conflict_count >= restart_limit:
+                    self._backtrack(0)
+                    restart_count += 1
+                    conflict_count = 0
+                    restart_limit = self.RESTART_UNIT * \
+                        self._luby(restart_count)
+                continue
+
+            literal = self._pick_branch_literal()
+            if literal is None:
+                return [value == 1 for value in self._values[1:]]
+            self._trail_limits.append(len(self._trail))
+            self._enqueue(literal, None)
+
+    def solve(self, tree: TreeNode) -> Union[Dict[str, bool], None]:
+        """
+        Returns an assignment of the tree's variables under which it is
+        true, or None if there is none.
+        """
+        cnf = CNF()
+        cnf.build(tree)
+        model = self.solve_cnf(cnf.clauses, cnf.variable_count)
+        if model is None:
+            return None
+        return {name: model[var - 1] for name, var in cnf.get_variables().items()}
+
+    def is_satisfiable(self, tree: TreeNode) -> bool:
+        return self.solve(tree) is not None
@@ -0,0 +1,35 @@
+import unittest
+from parser.expression_parser import ExpressionParser
+from parser.table_generator import TableGenerator
+from solver.bdd import BDD
+
+
+class BDD_Test(unittest.TestCase):
+    parser = ExpressionParser()
+
+    def test_matches_truth_table(self):
+        for expression in ("a & b <=> c", "[a | !b] => (c & d) | 0",
+                           "!(a => b) | (b <=> !c)", "a & !a", "a | !a"):
+            tree, variables, _ = self.parser.parse(expression)
+            _, masks = TableGenerator().generate_table_masks(tree, variables)
+            bdd = BDD(sorted(variables))
+            self.assertEqual(bdd.count_satisfying(tree),
+                             bin(masks[-1]).count("1"), expression)
+
+    def test_queries(self):
+        bdd = BDD()
+        parse = lambda expression: self.parser.parse(expression)[0]
+        self.assertTrue(bdd.is_tautology(parse("(a => b) <=> (!a | b)")))
+        self.assertTrue(bdd.is_contradiction(parse("a & !a & b")))
+        self.assertFalse(bdd.is_tautology(parse("a | b")))
+        self.assertTrue(bdd.are_equivalent(
+            parse("!(a & b)"), parse("!b | !a")))
+        self.assertFalse(bdd.are_equivalent(parse("a => b"), parse("b => a")))
+
+    def test_many_variables(self):
+        expression = " & ".join(
+            f"(x{i} <=> y{i})" for i in range(40))
+        tree, variables, _ = self.parser.parse(expression)
+        bdd = BDD(sorted(variables, key=lambda name: (name[1:], name)))
+        self.assertEqual(bdd.count_satisfying(tree), 1 << 40)
+        self.assertFalse(bdd.is_contradiction(tree))
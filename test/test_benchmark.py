@@ -0,0 +1,32 @@
+import random
+import unittest
+from benchmark.corpus import generate_corpus, generate_expression
+from benchmark.run import compare, get_scaling
+from parser.expression_parser import ExpressionParser
+
+
+class Benchmark_Test(unittest.TestCase):
+    def test_generated_expressions_parse(self):
+        parser = ExpressionParser()
+        rng = random.Random(1)
+        for _ in range(20):
+            expression = generate_expression(rng, 40, 6, capture_count=5, depth=3)
+            tree, variables, err = parser.parse(expression)
+            self.assertIsNone(err, expression)
+            self.assertEqual(variables, {f"x{i}" for i in range(6)})
+            self.assertEqual(expression.count("["), 5)
+            self.assertTrue(expression.startswith("!(!(!("))
+
+    def test_corpus_is_reproducible(self):
+        self.assertEqual(generate_corpus(3, 5, 16, 4),
+                         generate_corpus(3, 5, 16, 4))
+
+    def test_scaling_and_compare(self):
+        results = [{"benchmark": "parse", "axis": "length", "parameter": n, "seconds": n * n / 100}
+                   for n in (10, 20, 40)]
+        self.assertAlmostEqual(get_scaling(results)["parse[length]"], 2.0)
+
+        slower = [dict(result) for result in results]
+        slower[1]["seconds"] *= 2
+        self.assertEqual(compare({"results": slower}, {"results": results}, 0.25),
+                         ["parse[length=20]"])
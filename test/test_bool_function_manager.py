@@ -0,0 +1,26 @@
+import os
+import tempfile
+import unittest
+from bool_function.bool_function import BoolFunction
+from bool_function.bool_function_manager import BoolFunctionManager
+
+
+class FunctionManager_Test(unittest.TestCase):
+    def test_save_function(self):
+        with tempfile.TemporaryDirectory() as directory:
+            test_filename = "functions_test"
+            manager = BoolFunctionManager(test_filename, directory + os.sep)
+            manager.save(BoolFunction("func_1", "a&(b|c)=>a", ["a", "b", "c"]))
+
+            with open(os.path.join(directory, test_filename), "r") as file:
+                file_content = file.read()
+            self.assertEqual(file_content, "func_1:a&(b|c)=>a:a,b,c\n")
+
+    def test_fingerprints_are_filled_in_for_old_files(self):
+        with tempfile.TemporaryDirectory() as directory:
+            with open(os.path.join(directory, "functions_test"), "w") as file:
+                file.write("f:a => b:a,b\ng:!a | b:a,b\nh:a:a\n")
+            manager = BoolFunctionManager("functions_test", directory + os.sep)
+            self.assertEqual(manager.find_duplicates(), [["f", "g"]])
+            with open(os.path.join(directory, "functions_test.fingerprints"), "r") as file:
+                self.assertEqual(len(file.readlines()), 3)
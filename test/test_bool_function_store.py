@@ -0,0 +1,104 @@
+import os
+import tempfile
+import unittest
+from bool_function.bool_function import BoolFunction
+from bool_function.bool_function_manager import BoolFunctionManager
+from bool_function.sqlite_bool_function_manager import SQLiteBoolFunctionManager
+from solver.fingerprinter import Fingerprinter
+
+
+class CountingFingerprinter(Fingerprinter):
+    def __init__(self):
+        super().__init__()
+        self.expressions = []
+
+    def get_expression_fingerprint(self, expression):
+        self.expressions.append(expression)
+        return super().get_expression_fingerprint(expression)
+
+
+class BoolFunctionStore_Test(unittest.TestCase):
+    MANAGER_CLASSES = [BoolFunctionManager, SQLiteBoolFunctionManager]
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.base_path = self.directory.name + os.sep
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def create_manager(self, manager_class):
+        return manager_class(f"functions_{manager_class.__name__}", self.base_path)
+
+    def test_save_and_load(self):
+        for manager_class in self.MANAGER_CLASSES:
+            manager = self.create_manager(manager_class)
+            self.assertEqual(list(manager.load_all()), [])
+            self.assertIsNone(manager.save(
+                BoolFunction("f1", "a&(b|c)=>a", ["a", "b", "c"])))
+            self.assertIsNone(manager.save(BoolFunction("g", "1", [])))
+            self.assertIsNotNone(manager.save(BoolFunction("g", "0", [])))
+
+            reopened = self.create_manager(manager_class)
+            self.assertEqual(list(reopened.load_all_names()), ["f1", "g"])
+            function = next(reopened.load_by_name("f1"))
+            self.assertEqual((function.name, function.expression, function.variable_ls),
+                             ("f1", "a&(b|c)=>a", ["a", "b", "c"]))
+            self.assertEqual(next(reopened.load_by_name("g")).variable_ls, [])
+            self.assertEqual(list(reopened.load_by_name("missing")), [])
+            self.assertEqual(
+                [f.expression for f in reopened.load_all()], ["a&(b|c)=>a", "1"])
+
+    def test_save_many(self):
+        for manager_class in self.MANAGER_CLASSES:
+            manager = self.create_manager(manager_class)
+            results = manager.save_many(
+                [BoolFunction(f"f{i % 1000}", "a | b", ["a", "b"]) for i in range(1500)])
+            self.assertEqual(sum(result is None for result in results), 1000)
+            reopened = self.create_manager(manager_class)
+            self.assertEqual(next(reopened.load_by_name("f999")).expression, "a | b")
+            self.assertEqual(len(list(reopened.load_all())), 1000)
+
+    def test_sqlite_separators(self):
+        manager = SQLiteBoolFunctionManager("functions.db", self.base_path)
+        manager.save(BoolFunction("f:1", "a:b", ["a:b"]))
+        function = next(manager.load_by_name("f:1"))
+        self.assertEqual((function.expression, function.variable_ls), ("a:b", ["a:b"]))
+        manager.close()
+
+    def test_find_equivalent_and_duplicates(self):
+        for manager_class in self.MANAGER_CLASSES:
+            manager = self.create_manager(manager_class)
+            manager.save_many([
+                BoolFunction("implies", "a => b", ["a", "b"]),
+                BoolFunction("both", "a & b", ["a", "b"]),
+                BoolFunction("or_not", "!a | b", ["a", "b"]),
+                BoolFunction("broken", "a &", ["a"]),
+            ])
+            manager.save(BoolFunction("padded", "b | !a | (c & !c)", ["a", "b", "c"]))
+
+            reopened = self.create_manager(manager_class)
+            self.assertEqual([f.name for f in reopened.find_equivalent("!(a & !b)")],
+                             ["implies", "or_not", "padded"])
+            self.assertEqual([f.name for f in reopened.find_equivalent("b & a")], ["both"])
+            self.assertEqual(list(reopened.find_equivalent("a | b")), [])
+            self.assertEqual(reopened.find_duplicates(),
+                             [["implies", "or_not", "padded"]])
+
+    def test_fingerprints_are_computed_lazily(self):
+        for manager_class in self.MANAGER_CLASSES:
+            fingerprinter = CountingFingerprinter()
+            manager = manager_class(f"functions_{manager_class.__name__}",
+                                    self.base_path, fingerprinter)
+            manager.save_many([BoolFunction("broken", "a &", ["a"]),
+                               BoolFunction("f", "a | b", ["a", "b"])])
+            manager.save(BoolFunction("g", "b | a", ["a", "b"]))
+            self.assertEqual(fingerprinter.expressions, [])
+
+            self.assertEqual(manager.find_duplicates(), [["f", "g"]])
+            self.assertEqual(fingerprinter.expressions, ["a &", "a | b", "b | a"])
+            manager.save(BoolFunction("h", "a", ["a"]))
+            self.assertEqual([f.name for f in manager.find_equivalent("a")], ["h"])
+            # Failed records are neither indexed nor tried again.
+            self.assertEqual(fingerprinter.expressions[3:], ["a", "a"])
+
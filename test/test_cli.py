@@ -0,0 +1,111 @@
+import io
+import json
+import os
+import tempfile
+import unittest
+import cli
+from parser.table_generator import TableGenerator
+
+
+class FailingTableGenerator(TableGenerator):
+    def generate_table_masks(self, *args, **kwargs):
+        raise RecursionError("maximum recursion depth exceeded")
+
+
+class CLI_Test(unittest.TestCase):
+    EXPRESSIONS = [("1", "a & b"), ("2", "a &"), ("3", "[a | b] => c")]
+
+    def run_cli(self, mode: str, output_format: str = "jsonl", jobs: int = 1, expressions=None) -> str:
+        output = io.StringIO()
+        cli.run(expressions or self.EXPRESSIONS, mode, output_format, jobs, output)
+        return output.getvalue()
+
+    def run_jsonl(self, mode: str, **kwargs) -> list:
+        return [json.loads(line)
+                for line in self.run_cli(mode, **kwargs).splitlines()]
+
+    def test_table(self):
+        records = self.run_jsonl("table")
+        self.assertEqual(records[0], {"id": "1", "expression": "a & b",
+                                      "header": ["a", "b", "V"]})
+        self.assertEqual([r["row"] for r in records[1:5]],
+                         [[1, 1, 1], [1, 0, 0], [0, 1, 0], [0, 0, 0]])
+        self.assertIn("error", records[5])
+        self.assertEqual(records[6]["header"], ["a", "b", "c", "a | b", "V"])
+        self.assertEqual(len(records), 15)
+        self.assertEqual(self.run_cli("table", "csv").splitlines()[:2],
+                         ["id,a,b,V", "1,1,1,1"])
+
+    def test_column(self):
+        records = self.run_jsonl("column")
+        self.assertEqual(records[0], {"id": "1", "expression": "a & b",
+                                      "variables": ["a", "b"], "column": "1000"})
+        self.assertEqual(records[1]["id"], "2")
+        self.assertIn("error", records[1])
+        self.assertEqual(records[2]["column"], "10101011")
+        lines = self.run_cli("column", "csv").splitlines()
+        self.assertEqual(lines[:2], ["id,expression,variables,column,error",
+                                     '1,a & b,"a,b",1000,'])
+        self.assertTrue(lines[2].startswith("2,a &,,,"))
+        self.assertEqual(len(lines), 4)
+
+    def test_sat(self):
+        records = self.run_jsonl("sat", expressions=[
+            ("1", "a & !b"), ("2", "a & !a")])
+        self.assertEqual(records[0]["assignment"], {"a": True, "b": False})
+        self.assertEqual((records[1]["satisfiable"], records[1]["assignment"]),
+                         (False, None))
+        self.assertEqual(self.run_cli("sat", "csv", expressions=[("1", "a & !b")]),
+                         "id,expression,satisfiable,assignment,error\n"
+                         "1,a & !b,True,a=1 b=0,\n")
+
+    def test_sat_fills_in_optimized_away_variables(self):
+        records = self.run_jsonl("sat", expressions=[
+            ("1", "a | !a"), ("2", "a & 0 | b")])
+        self.assertEqual([r["satisfiable"] for r in records], [True, True])
+        self.assertEqual(set(records[0]["assignment"]), {"a"})
+        self.assertEqual(set(records[1]["assignment"]), {"a", "b"})
+        self.assertTrue(records[1]["assignment"]["b"])
+
+    def test_count(self):
+        records = self.run_jsonl("count")
+        self.assertEqual([r.get("count") for r in records], [1, None, 5])
+        self.assertEqual(self.run_cli("count", "csv", jobs=2).splitlines()[::2],
+                         ["id,expression,count,error", "2,a &,,Invalid syntax: unexpected end of expression."])
+
+    def test_jobs_keeps_input_order(self):
+        expressions = [(str(i), f"x{i} | y") for i in range(20)]
+        self.assertEqual(self.run_cli("column", jobs=2, expressions=expressions),
+                         self.run_cli("column", expressions=expressions))
+
+    def test_jobs_streams_table_rows(self):
+        parallel_table_variables = cli.PARALLEL_TABLE_VARIABLES
+        cli.PARALLEL_TABLE_VARIABLES = 2
+        try:
+            self.assertEqual(self.run_cli("table", jobs=2),
+                             self.run_cli("table"))
+        finally:
+            cli.PARALLEL_TABLE_VARIABLES = parallel_table_variables
+
+    def test_failure_is_reported_per_expression(self):
+        table_generator = cli._table_generator
+        cli._table_generator = FailingTableGenerator()
+        try:
+            records = self.run_jsonl("column")
+        finally:
+            cli._table_generator = table_generator
+        self.assertEqual([r["id"] for r in records], ["1", "2", "3"])
+        self.assertEqual(records[0]["error"], "maximum recursion depth exceeded")
+
+    def test_main(self):
+        with tempfile.TemporaryDirectory() as directory:
+            input_path = os.path.join(directory, "expressions.txt")
+            output_path = os.path.join(directory, "output.jsonl")
+            with open(input_path, "w") as file:
+                file.write("a | b\n\n!a\n")
+            cli.main([input_path, "--mode", "count", "--jobs", "2",
+                      "--output", output_path])
+            with open(output_path, "r") as file:
+                records = [json.loads(line) for line in file]
+        self.assertEqual([(r["id"], r["count"]) for r in records],
+                         [("1", 3), ("3", 1)])
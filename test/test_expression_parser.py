@@ -0,0 +1,100 @@
+import unittest
+from parser.expression_parser import ExpressionParser, TokenType
+from parser.table_generator import TableGenerator
+
+
+class ExpressionParser_Test(unittest.TestCase):
+    def test_tokenize(self):
+        token_list = ExpressionParser()._tokenize(" a<=>b => [c1 | 0]")
+        self.assertEqual(
+            [(t.value, t.token_type, t.position) for t in token_list], [
+                ("a", TokenType.VARIABLE, 1),
+                ("<=>", TokenType.EQUIVALENCY, 2),
+                ("b", TokenType.VARIABLE, 5),
+                ("=>", TokenType.IMPLICATION, 7),
+                ("[", TokenType.LBRACKET, 10),
+                ("c1", TokenType.VARIABLE, 11),
+                ("|", TokenType.OR, 14),
+                ("0", TokenType.VALUE, 16),
+                ("]", TokenType.RBRACKET, 17),
+            ])
+
+    def test_tokenize_invalid_symbol(self):
+        with self.assertRaisesRegex(Exception, "column 6: \\$b"):
+            ExpressionParser()._tokenize("a &  $b")
+
+    def test_parse_tree_shape(self):
+        tree, variables, err = ExpressionParser().parse("!a & [b | c] & d => a")
+        self.assertIsNone(err)
+        self.assertEqual(variables, {"a", "b", "c", "d"})
+        self.assertEqual(repr(tree), "\n".join([
+            "TNOperatorImplication",
+            "|---TNOperatorAND",
+            "|---|---TNOperatorNOT",
+            "|---|---|---TNVariable",
+            "|---|---TNOperatorAND",
+            "|---|---|---TNExpression",
+            "|---|---|---|---TNOperatorOR",
+            "|---|---|---|---|---TNVariable",
+            "|---|---|---|---|---TNVariable",
+            "|---|---|---TNVariable",
+            "|---TNVariable",
+            "",
+        ]))
+        self.assertEqual(tree.get_expression_names(), ["b | c"])
+
+    def test_parse_invalid_syntax(self):
+        for expression in ("a b", "a & (b]", "(a", "a &", "!", "()", "a !b"):
+            tree, variables, err = ExpressionParser().parse(expression)
+            self.assertIsNone(tree, expression)
+            self.assertIsNotNone(err, expression)
+
+    def test_parse_deep_nesting(self):
+        # Every capture's name is its own text, so fewer captures keep the
+        # test fast.
+        for depth, opening, closing in ((5000, "(", ")"), (1000, "[", "]"),
+                                        (5000, "!", "")):
+            tree, variables, err = ExpressionParser().parse(
+                opening * depth + "a" + closing * depth)
+            self.assertIsNone(err)
+            self.assertEqual(variables, {"a"})
+            header, masks = TableGenerator().generate_table_masks(
+                tree, variables)
+            self.assertEqual(masks[-1], 0b01)
+            self.assertTrue(tree.compile(["a"])((True,))[0])
+            self.assertTrue(tree.get_value({"a": 0}, [True], {}))
+            self.assertEqual(len(header), len(tree.get_expression_names()) + 2)
+            self.assertEqual(repr(tree).count("\n"), depth + 1)
+
+    def test_parsers_do_not_share_state(self):
+        first, second = ExpressionParser(), ExpressionParser()
+        _, variables, _ = first.parse("a & b")
+        second.parse("c")
+        self.assertEqual(variables, {"a", "b"})
+        self.assertEqual(second.parse("d")[1], {"d"})
+
+    def test_parse_cache(self):
+        parser = ExpressionParser(cache_size=2)
+        tree, variables, _ = parser.parse("a&(b|c)")
+        self.assertIs(parser.parse(" a & ( b | c ) ")[0], tree)
+        self.assertIs(parser.parse("a&(b|c)")[0], tree)
+        self.assertEqual((parser.cache.hits, parser.cache.misses), (2, 1))
+        self.assertEqual(len(parser.cache), 1)
+        variables.add("x")
+        self.assertEqual(parser.parse("a&(b|c)")[1], {"a", "b", "c"})
+
+        parser.cache.invalidate()
+        self.assertIsNot(parser.parse("a&(b|c)")[0], tree)
+        self.assertIsNotNone(parser.parse("a &")[2])
+        self.assertEqual(len(parser.cache), 1)
+        self.assertEqual(parser.cache.misses, 3)
+
+    def test_parse_shares_identical_subtrees(self):
+        tree, _, _ = ExpressionParser().parse("[a&b] | ([a&b] => c) <=> !(a&b)")
+        lhs, rhs = tree._children
+        first_capture = lhs._children[0]
+        second_capture = lhs._children[1]._children[0]._children[0]
+        self.assertIs(first_capture, second_capture)
+        self.assertIs(first_capture._children[0],
+                      rhs._children[0]._children[0])
+        self.assertEqual(tree.get_expression_names(), ["a & b", "a & b"])
@@ -0,0 +1,56 @@
+import os
+import subprocess
+import sys
+import unittest
+from solver.fingerprinter import Fingerprinter
+
+
+class Fingerprinter_Test(unittest.TestCase):
+    fingerprinter = Fingerprinter()
+
+    def get_fingerprint(self, expression):
+        return self.fingerprinter.get_expression_fingerprint(expression)
+
+    def test_equivalent_expressions(self):
+        pairs = [
+            ("a => b", "!a | b"),
+            ("a & b", "b & a"),
+            ("a", "a | (b & !b)"),
+            ("1", "c | !c"),
+            ("!(a <=> b)", "(a & !b) | (!a & b)"),
+        ]
+        for left, right in pairs:
+            self.assertEqual(self.get_fingerprint(left),
+                             self.get_fingerprint(right), (left, right))
+
+    def test_different_expressions(self):
+        fingerprints = [self.get_fingerprint(e)
+                        for e in ["a", "b", "!a", "a & b", "a | b", "0", "1"]]
+        self.assertEqual(len(set(fingerprints)), len(fingerprints))
+
+    def test_large_functions_use_bdd(self):
+        names = [f"x{i}" for i in range(20)]
+        disjunction = " | ".join(names)
+        self.assertEqual(self.get_fingerprint(disjunction),
+                         self.get_fingerprint(" | ".join(reversed(names))))
+        self.assertNotEqual(self.get_fingerprint(disjunction),
+                            self.get_fingerprint(disjunction + " | x20"))
+        tautologies = " & ".join(f"({name} | !{name})" for name in names)
+        self.assertEqual(self.get_fingerprint(f"a & ({tautologies})"),
+                         self.get_fingerprint("a"))
+
+    def test_names_differing_in_case(self):
+        self.assertNotEqual(self.get_fingerprint("A & !a"),
+                            self.get_fingerprint("a & !A"))
+        # Set iteration order, and so the old column order, changes with
+        # the hash seed.
+        fingerprints = set()
+        for seed in range(4):
+            fingerprints.add(subprocess.run(
+                [sys.executable, "-c",
+                 "from solver.fingerprinter import Fingerprinter; "
+                 "print(Fingerprinter().get_expression_fingerprint('A & !a'))"],
+                env=dict(os.environ, PYTHONHASHSEED=str(seed)),
+                cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                capture_output=True, text=True, check=True).stdout)
+        self.assertEqual(fingerprints, {self.get_fingerprint("A & !a") + "\n"})
@@ -0,0 +1,18 @@
+import unittest
+from benchmark.import_time import CORE_STATEMENT, LAZY_MODULES, measure_import_time
+
+
+class Imports_Test(unittest.TestCase):
+    def test_core_does_not_import_lazy_modules(self):
+        _, modules = measure_import_time(CORE_STATEMENT)
+        self.assertEqual([name for name in LAZY_MODULES if name in modules], [])
+
+    def test_main_is_headless_until_run(self):
+        _, modules = measure_import_time("import main")
+        self.assertNotIn("tkinter", modules)
+
+    def test_package_exports(self):
+        _, modules = measure_import_time(
+            "from solver import BDD; from parser import TableFileReader")
+        self.assertIn("solver.bdd", modules)
+        self.assertNotIn("solver.sat_solver", modules)
@@ -0,0 +1,64 @@
+import random
+import unittest
+from parser.expression_parser import ExpressionParser
+from parser.live_evaluator import LiveEvaluator
+from parser.table_generator import TableGenerator
+
+
+class LiveEvaluator_Test(unittest.TestCase):
+    EDITS = [
+        "a",
+        "a &",
+        "a & b",
+        "a & [b | c]",
+        "a & [b | c] => d",
+        "a & [b | c] => [d]",
+        "(a & [b | c]) => [d]",
+        "(a & [b | c]) => [d] <=> x",
+        "(ab & [b | c]) => [d] <=> x",
+        "(ab & [b | c]) => [d] <=> x1",
+        "[b | c] <=> x1",
+    ]
+
+    def test_tokenize_incremental_matches_tokenize(self):
+        parser = ExpressionParser()
+        rng = random.Random(0)
+        alphabet = ["a", "bc", " ", "&", "|", "!", "=>", "<=>", "<", "=", ">",
+                    "(", ")", "[", "]", "0", "1"]
+        for _ in range(2000):
+            previous = "".join(rng.choice(alphabet) for _ in range(rng.randint(1, 12)))
+            i = rng.randint(0, len(previous))
+            j = rng.randint(i, len(previous))
+            expression = previous[:i] + \
+                "".join(rng.choice(alphabet) for _ in range(rng.randint(0, 3))) + previous[j:]
+            try:
+                previous_token_list = parser._tokenize(previous)
+                expected = [(t.value, t.token_type, t.position)
+                            for t in parser._tokenize(expression)]
+            except Exception:
+                continue
+            got = [(t.value, t.token_type, t.position) for t in parser.tokenize_incremental(
+                expression, previous, previous_token_list)]
+            self.assertEqual(got, expected, (previous, expression))
+
+    def test_updates_match_full_generation(self):
+        live_evaluator = LiveEvaluator(ExpressionParser(), TableGenerator())
+        parser = ExpressionParser()
+        for expression in self.EDITS:
+            tree, variables, err = parser.parse(expression)
+            if err:
+                with self.assertRaises(Exception):
+                    live_evaluator.update(expression)
+                continue
+            self.assertEqual(live_evaluator.update(expression),
+                             TableGenerator().generate_table_masks(tree, variables), expression)
+
+    def test_unchanged_subtrees_are_reused(self):
+        live_evaluator = LiveEvaluator(ExpressionParser(), TableGenerator())
+        tree, variables = live_evaluator.parse("a & [b | c]")
+        live_evaluator.evaluate(tree, variables)
+        captured = tree.get_children()[1]
+        edited, variables = live_evaluator.parse("!a & [b | c]")
+        self.assertIs(edited.get_children()[1], captured)
+        live_evaluator.evaluate(edited, variables)
+        self.assertEqual(live_evaluator.table_generator.metrics.counters["rows_evaluated"], 16)
@@ -0,0 +1,40 @@
+import contextlib
+import io
+import pstats
+import unittest
+from parser.expression_parser import ExpressionParser
+from parser.metrics import Metrics
+from parser.table_generator import TableGenerator
+
+
+class Metrics_Test(unittest.TestCase):
+    def test_parser_stages_and_counters(self):
+        events = []
+        metrics = Metrics(lambda kind, name, value: events.append((kind, name)))
+        parser = ExpressionParser(debug=True, metrics=metrics)
+        stdout = io.StringIO()
+        with contextlib.redirect_stdout(stdout):
+            parser.parse("a & [b | a]")
+            parser.parse("a&[b|a]")
+            parser.parse("a &")
+        self.assertEqual(stdout.getvalue(), "")
+        self.assertEqual(set(metrics.timings),
+                         {"tokenize", "check_syntax", "build_tree"})
+        self.assertEqual(metrics.counters["parse_cache_misses"], 2)
+        self.assertEqual(metrics.counters["parse_cache_hits"], 1)
+        self.assertEqual(metrics.counters["nodes_built"], 5)
+        self.assertIn(("time", "tokenize"), events)
+        self.assertIn(("count", "nodes_built"), events)
+
+    def test_table_generator_stages_and_profiler(self):
+        metrics = Metrics(profile=True)
+        tree, variables, _ = ExpressionParser().parse("a => (b <=> c)")
+        table_generator = TableGenerator(metrics=metrics)
+        table_generator.generate_table_content(tree, variables)
+        table_generator.generate_table_content(tree, variables)
+        self.assertEqual(set(metrics.timings), {"evaluate", "render"})
+        self.assertEqual(metrics.counters["rows_evaluated"], 8)
+        self.assertEqual(metrics.counters["table_cache_hits"], 1)
+        profiled = {function for _, _, function in pstats.Stats(
+            metrics.profiler).stats}
+        self.assertIn("masks_to_rows", profiled)
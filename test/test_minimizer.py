@@ -0,0 +1,49 @@
+import random
+import unittest
+from parser.expression_parser import ExpressionParser
+from solver.bdd import BDD
+from parser.table_generator import TableGenerator
+from solver.minimizer import Minimizer
+
+
+class Minimizer_Test(unittest.TestCase):
+    parser = ExpressionParser()
+
+    def test_minimal_forms(self):
+        minimizer = Minimizer()
+        for expression, dnf, cnf in (
+            ("a & b | a & !b", "a", "a"),
+            ("(a | b) & (a | !b) & c", "a & c", "a & c"),
+            ("a => b", "!a | b", "!a | b"),
+            ("a & !a", "0", "0"),
+            ("b | !b | a", "1", "1"),
+        ):
+            tree, variables, _ = self.parser.parse(expression)
+            self.assertEqual(minimizer.minimize(tree, variables), dnf)
+            self.assertEqual(minimizer.minimize(tree, variables, cnf=True), cnf)
+
+    def test_heuristic_is_equivalent(self):
+        minimizer = Minimizer()
+        expression = " | ".join(
+            f"(x{i} & !x{(i * 7 + 3) % 12} & x{(i * 5 + 1) % 12})" for i in range(12))
+        tree, variables, _ = self.parser.parse(expression)
+        for cnf in (False, True):
+            minimized, _, err = self.parser.parse(
+                minimizer.minimize(tree, variables, cnf))
+            self.assertIsNone(err)
+            self.assertTrue(BDD(sorted(variables)).are_equivalent(tree, minimized))
+
+    def test_large_petrick_falls_back_to_greedy_cover(self):
+        minimizer = Minimizer()
+        variable_ls = [f"x{i}" for i in range(8)]
+        variable_masks = dict(zip(
+            variable_ls, TableGenerator._generate_variable_masks(8)))
+        generator = random.Random(8)
+        for _ in range(5):
+            # Random functions of 8 variables overflow Petrick's method.
+            result_mask = generator.getrandbits(256)
+            minimized, _, err = self.parser.parse(
+                minimizer.minimize_column(result_mask, variable_ls))
+            self.assertIsNone(err)
+            self.assertEqual(minimized.get_mask(
+                variable_masks, (1 << 256) - 1, {}), result_mask)
@@ -0,0 +1,35 @@
+import itertools
+import random
+import unittest
+from parser.expression_parser import ExpressionParser
+from solver.sat_solver import SATSolver
+
+
+class SATSolver_Test(unittest.TestCase):
+    def test_solve_cnf_matches_brute_force(self):
+        rng = random.Random(7)
+        solver = SATSolver()
+        for _ in range(500):
+            variable_count = rng.randint(1, 8)
+            clauses = [[rng.choice((1, -1)) * rng.randint(1, variable_count)
+                        for _ in range(rng.randint(1, 3))]
+                       for _ in range(rng.randint(1, 35))]
+            satisfies = lambda values: all(
+                any((literal > 0) == values[abs(literal) - 1] for literal in clause)
+                for clause in clauses)
+            model = solver.solve_cnf(clauses, variable_count)
+            expected = any(satisfies(values) for values in itertools.product(
+                (False, True), repeat=variable_count))
+            self.assertEqual(model is not None, expected, clauses)
+            if model is not None:
+                self.assertTrue(satisfies(model))
+
+    def test_solve_tree(self):
+        parser = ExpressionParser()
+        solver = SATSolver()
+        tree, _, _ = parser.parse("[a => b] & a & !(c <=> b) & (d | 0)")
+        self.assertEqual(solver.solve(tree), {
+            "a": True, "b": True, "c": False, "d": True})
+        tree, _, _ = parser.parse("(a => b) & (b => c) & a & !c")
+        self.assertIsNone(solver.solve(tree))
+        self.assertFalse(solver.is_satisfiable(parser.parse("1 & 0")[0]))
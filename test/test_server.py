@@ -0,0 +1,126 @@
+import asyncio
+import http.client
+import json
+import os
+import tempfile
+import threading
+import unittest
+from bool_function.bool_function import BoolFunction
+from bool_function.bool_function_manager import BoolFunctionManager
+from parser.expression_parser import ExpressionParser
+from parser.table_generator import TableGenerator
+from server import EvaluationServer
+
+
+class EvaluationServer_Test(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.directory = tempfile.TemporaryDirectory()
+        manager = BoolFunctionManager("functions_test", cls.directory.name + os.sep)
+        manager.save(BoolFunction("implies", "a => b", ["a", "b"]))
+        manager.save(BoolFunction("both", "a & b", ["a", "b"]))
+        cls.server = EvaluationServer(port=0, workers=1, bool_function_manager=manager)
+        cls.loop = asyncio.new_event_loop()
+        cls.thread = threading.Thread(target=cls.loop.run_forever, daemon=True)
+        cls.thread.start()
+        cls.host, cls.port = asyncio.run_coroutine_threadsafe(
+            cls.server.start(), cls.loop).result(timeout=10)
+
+    @classmethod
+    def tearDownClass(cls):
+        asyncio.run_coroutine_threadsafe(cls.server.close(), cls.loop).result(timeout=10)
+        cls.loop.call_soon_threadsafe(cls.loop.stop)
+        cls.thread.join(timeout=10)
+        cls.loop.close()
+        cls.directory.cleanup()
+
+    def setUp(self):
+        self.connection = http.client.HTTPConnection(self.host, self.port, timeout=30)
+
+    def tearDown(self):
+        self.connection.close()
+
+    def request(self, method, path, payload=None):
+        body = None if payload is None else json.dumps(payload)
+        self.connection.request(method, path, body, {"Content-Type": "application/json"})
+        response = self.connection.getresponse()
+        return response.status, response.read()
+
+    def test_batched_requests_share_a_connection(self):
+        status, body = self.request("POST", "/parse", {"expressions": ["a & b", "a &", "[a | b] & c"]})
+        self.assertEqual(status, 200)
+        results = json.loads(body)["results"]
+        self.assertEqual(results[0]["header"], ["a", "b", "V"])
+        self.assertIsNotNone(results[1]["error"])
+        self.assertEqual(results[2]["header"], ["a", "b", "c", "a | b", "V"])
+        sock = self.connection.sock
+
+        status, body = self.request("POST", "/evaluate", {"requests": [
+            {"expression": "a => b", "assignment": {"a": True, "b": False}},
+            {"expression": "[!a] | b", "assignment": {"a": False, "b": False}},
+            {"expression": "a | b", "assignment": {"a": True}},
+        ]})
+        self.assertEqual(status, 200)
+        results = json.loads(body)["results"]
+        self.assertFalse(results[0]["value"])
+        self.assertTrue(results[1]["value"])
+        self.assertEqual(results[1]["expressions"], {"! a": True})
+        self.assertIsNotNone(results[2]["error"])
+        self.assertIs(self.connection.sock, sock)
+
+    def test_table_is_streamed_in_chunks(self):
+        expression = "(a | b) & [c <=> d] => e"
+        status, body = self.request("POST", "/table", {"expression": expression, "chunk_size": 5})
+        self.assertEqual(status, 200)
+        lines = [json.loads(line) for line in body.splitlines()]
+        self.assertEqual(lines[0], {"header": ["a", "b", "c", "d", "e", "c <=> d", "V"],
+                                    "start": 0, "stop": 32})
+        self.assertEqual(len(lines), 1 + 7)
+        rows = [row for line in lines[1:] for row in line["rows"]]
+
+        tree, variables, _ = ExpressionParser().parse(expression)
+        expected = list(TableGenerator().generate_rows(tree, variables))
+        self.assertEqual(rows, [[int(x) for x in row] for row in expected])
+
+        status, body = self.request("POST", "/table", {"expression": expression, "start": 8, "stop": 12})
+        self.assertEqual(status, 200)
+        self.assertEqual(json.loads(body.splitlines()[1])["rows"], rows[8:12])
+
+    def test_saved_functions(self):
+        status, body = self.request("GET", "/functions")
+        self.assertEqual(json.loads(body), {"names": ["implies", "both"]})
+        status, body = self.request("GET", "/functions/both")
+        self.assertEqual(json.loads(body)["expression"], "a & b")
+        status, body = self.request("GET", "/functions?equivalent=%21a%20%7C%20b")
+        self.assertEqual([f["name"] for f in json.loads(body)["functions"]], ["implies"])
+        status, _ = self.request("GET", "/functions/missing")
+        self.assertEqual(status, 404)
+
+    def test_errors(self):
+        self.assertEqual(self.request("POST", "/nothing", {})[0], 404)
+        self.assertEqual(self.request("GET", "/parse")[0], 405)
+        self.assertEqual(self.request("POST", "/table", {"expression": "a", "stop": 3})[0], 400)
+        wide = " & ".join(f"x{i}" for i in range(64))
+        self.assertEqual(self.request("POST", "/table", {"expression": wide})[0], 400)
+        self.assertEqual(self.request("POST", "/table", {"expression": wide, "stop": 2})[0], 200)
+        self.connection.request("POST", "/parse", "not json")
+        response = self.connection.getresponse()
+        self.assertEqual(response.status, 400)
+        response.read()
+        self.assertEqual(self.request("POST", "/parse", {"expressions": "a & b"})[0], 400)
+        self.assertEqual(self.request("POST", "/parse", {"expression": ["a"]})[0], 400)
+        for expression in (None, 1, ["a"]):
+            self.assertEqual(self.request("POST", "/evaluate", {
+                "expression": expression, "assignment": {"a": True}})[0], 400)
+        self.assertEqual(self.request("POST", "/evaluate", {"requests": [
+            {"expression": "a", "assignment": [["a", True]]}]})[0], 400)
+        self.connection.putrequest("POST", "/parse")
+        self.connection.putheader("Content-Length", "ten")
+        self.connection.endheaders()
+        response = self.connection.getresponse()
+        self.assertEqual(response.status, 400)
+        response.read()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,45 @@
+import os
+import tempfile
+import unittest
+from parser.expression_parser import ExpressionParser
+from parser.table_file import TableFileReader, write_table_file
+from parser.table_generator import TableGenerator
+
+
+class TableFile_Test(unittest.TestCase):
+    parser = ExpressionParser()
+
+    def setUp(self):
+        handle, self.path = tempfile.mkstemp(suffix=".ttbl")
+        os.close(handle)
+
+    def tearDown(self):
+        os.remove(self.path)
+
+    def test_round_trip(self):
+        tree, variables, _ = self.parser.parse("[a & b] | (c => [!d]) <=> e")
+        table_generator = TableGenerator()
+        write_table_file(self.path, tree, variables, chunk_size=5)
+        header, masks = table_generator.generate_table_masks(tree, variables)
+        with TableFileReader(self.path) as reader:
+            self.assertEqual(reader.header, header)
+            self.assertEqual(reader.row_count, 32)
+            for column, mask in enumerate(masks):
+                self.assertEqual(reader.get_column_mask(column), mask)
+            self.assertEqual(reader.get_rows(3, 29),
+                             list(table_generator.generate_rows(tree, variables, start=3, stop=29)))
+            self.assertEqual([row for chunk in reader.generate_row_chunks(7) for row in chunk],
+                             list(table_generator.generate_rows(tree, variables)))
+
+    def test_variable_columns_are_not_stored(self):
+        tree, variables, _ = self.parser.parse("[a] & b & c & d & e & f & g & h")
+        write_table_file(self.path, tree, variables)
+        with TableFileReader(self.path) as reader:
+            self.assertEqual(len(reader.get_column_bytes(8)), 32)
+            self.assertLess(os.path.getsize(self.path), 3 * 32 + 64)
+
+    def test_invalid_file(self):
+        with open(self.path, "wb") as file:
+            file.write(b"not a table file")
+        with self.assertRaises(Exception):
+            TableFileReader(self.path)
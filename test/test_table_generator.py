@@ -0,0 +1,171 @@
+import unittest
+from parser.expression_parser import ExpressionParser
+from parser.table_generator import TableGenerator
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+class TableGenerator_Test(unittest.TestCase):
+    parser = ExpressionParser()
+
+    EXPRESSIONS = [
+        "a",
+        "1",
+        "!a & 0",
+        "a & b <=> c",
+        "[a | b] => !(c & [!d])",
+        "[a&b] | ([a&b] => c) <=> !(a&b)",
+    ]
+
+    def test_bitwise_matches_rowwise(self):
+        for expression in self.EXPRESSIONS:
+            tree, variables, err = self.parser.parse(expression)
+            self.assertIsNone(err)
+            self.assertEqual(
+                TableGenerator(bitwise=True).generate_table_content(
+                    tree, variables),
+                TableGenerator(bitwise=False).generate_table_content(
+                    tree, variables),
+                expression)
+
+    def test_table_cache_returns_copies(self):
+        tree, variables, _ = self.parser.parse("a | b")
+        generator = TableGenerator()
+        content = generator.generate_table_content(tree, variables)
+        expected = [row[:] for row in content]
+        content[1][2] = "changed"
+        content.pop()
+        cached = generator.generate_table_content(tree, variables)
+        self.assertEqual(generator.cache.hits, 1)
+        self.assertEqual(cached, expected)
+        cached[1][2] = "changed"
+        self.assertEqual(
+            generator.generate_table_content(tree, variables), expected)
+
+    def test_generate_table_masks(self):
+        tree, variables, _ = self.parser.parse("[a & b] | c")
+        header, masks = TableGenerator().generate_table_masks(tree, variables)
+        self.assertEqual(header, ["a", "b", "c", "a & b", "V"])
+        self.assertEqual(masks, [
+            0b00001111, 0b00110011, 0b01010101, 0b00000011, 0b01010111])
+
+    def _check_table_columns(self, use_numpy: bool):
+        tree, variables, _ = self.parser.parse("[a & b] | c")
+        header, columns = TableGenerator(
+            use_numpy=use_numpy).generate_table_columns(tree, variables)
+        self.assertEqual(header, ["a", "b", "c", "a & b", "V"])
+        self.assertEqual(list(TableGenerator.unpack_column(columns[3], 8)), [
+            True, True, False, False, False, False, False, False])
+        self.assertEqual(list(TableGenerator.unpack_column(columns[4], 8)), [
+            True, True, True, False, True, False, True, False])
+        return columns
+
+    @unittest.skipIf(numpy is None, "NumPy is not installed")
+    def test_generate_table_columns_numpy(self):
+        columns = self._check_table_columns(use_numpy=True)
+        self.assertTrue(all(isinstance(column, numpy.ndarray)
+                            for column in columns))
+        # Past one word, the packed columns match the int masks word by word.
+        tree, variables, _ = self.parser.parse(
+            "[a => b] | !(c <=> d) & [e | f] & g | h")
+        generator = TableGenerator()
+        _, columns = generator.generate_table_columns(tree, variables)
+        _, masks = generator.generate_table_masks(tree, variables)
+        self.assertEqual([len(column) for column in columns], [4] * len(masks))
+        self.assertEqual(
+            [int.from_bytes(column.astype("<u8").tobytes(), "little")
+             for column in columns], masks)
+
+    def test_generate_table_columns_fallback(self):
+        columns = self._check_table_columns(use_numpy=False)
+        self.assertTrue(all(isinstance(column, int) for column in columns))
+
+    def test_compiled_matches_get_value(self):
+        tree, variables, _ = self.parser.parse("[!a | b] <=> (c => [a & 1])")
+        variable_ls = sorted(variables)
+        compiled = tree.compile(variable_ls)
+        self.assertIs(compiled, tree.compile(variable_ls))
+        for value_combination in TableGenerator()._generate_value_combinations(
+                [None] * 3, 0, 3):
+            expression_values_dict = {}
+            value = tree.get_value(
+                {name: i for i, name in enumerate(variable_ls)},
+                value_combination, expression_values_dict)
+            self.assertEqual(
+                compiled(tuple(value_combination)),
+                (value, (expression_values_dict["! a | b"],
+                         expression_values_dict["a & 1"])))
+
+    def test_long_chain(self):
+        # 500 operands nest 500 levels deep, as binary operators associate
+        # to the right.
+        tree, variables, _ = self.parser.parse(
+            " | ".join(f"[x{i}]" for i in range(500)))
+        header, masks = TableGenerator().generate_table_masks(
+            tree, variables, 0, 8)
+        self.assertEqual(len(header), 1001)
+        self.assertEqual(masks[-1], 0b11111111)
+        value, expression_values = tree.compile(header[:500])((False,) * 500)
+        self.assertEqual((value, len(expression_values)), (False, 500))
+
+    def test_generate_rows_ranges(self):
+        tree, variables, _ = self.parser.parse("[a => b] <=> !(c | d) & e")
+        content = TableGenerator().generate_table_content(tree, variables)
+        generator = TableGenerator()
+        self.assertEqual(
+            list(generator.generate_rows(tree, variables)), content[1:])
+        for start, stop in ((0, 1), (3, 17), (5, 32), (16, 16)):
+            self.assertEqual(
+                list(generator.generate_rows(
+                    tree, variables, start=start, stop=stop)),
+                content[1 + start:1 + stop])
+        chunks = list(generator.generate_row_chunks(
+            tree, variables, 5, start=2, stop=30))
+        self.assertEqual([len(chunk) for chunk in chunks], [5] * 5 + [3])
+        self.assertEqual(sum(chunks, []), content[3:31])
+
+    def test_generate_rows_gray_code(self):
+        tree, variables, _ = self.parser.parse("a & b | c")
+        rows = list(TableGenerator().generate_rows(
+            tree, variables, gray_code=True))
+        self.assertEqual(sorted(rows), sorted(
+            TableGenerator().generate_table_content(tree, variables)[1:]))
+        for previous, current in zip(rows, rows[1:]):
+            self.assertEqual(
+                sum(x != y for x, y in zip(previous[:3], current[:3])), 1)
+
+    def test_generate_rows_many_variables(self):
+        expression = " | ".join(f"x{i}" for i in range(30))
+        tree, variables, err = self.parser.parse(expression)
+        self.assertIsNone(err)
+        rows = list(TableGenerator().generate_rows(
+            tree, variables, start=(1 << 30) - 2))
+        self.assertEqual([row[-1] for row in rows], [True, False])
+
+    def test_shared_captures(self):
+        tree, variables, _ = self.parser.parse(
+            "[[a] & b] | ([[a] & b] => [a])")
+        expected = [["a", "b", "a", "( a ) & b", "a", "( a ) & b", "a", "V"]]
+        for a in (True, False):
+            for b in (True, False):
+                expected.append(
+                    [int(a), int(b), a, a and b, a, a and b, a, True])
+        for bitwise in (True, False):
+            self.assertEqual(TableGenerator(bitwise=bitwise).generate_table_content(
+                tree, variables), expected)
+
+    def test_parallel_generation(self):
+        expression = "[a => b] <=> !(c | d) & [e & !a]"
+        tree, variables, _ = self.parser.parse(expression)
+        generator = TableGenerator()
+        self.assertEqual(
+            generator.generate_table_masks_parallel(
+                expression, workers=2, shard_size=5),
+            generator.generate_table_masks(tree, variables))
+        self.assertEqual(
+            sum(generator.generate_row_chunks_parallel(
+                expression, start=3, stop=29, workers=2, shard_size=8), []),
+            list(generator.generate_rows(tree, variables, start=3, stop=29)))
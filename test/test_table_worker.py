@@ -0,0 +1,34 @@
+import unittest
+from gui.table_worker import TableWorker
+from parser.expression_parser import ExpressionParser
+from parser.table_generator import TableGenerator
+
+
+class TableWorker_Test(unittest.TestCase):
+    parser = ExpressionParser()
+
+    def test_chunks_make_up_the_table(self):
+        tree, variables, _ = self.parser.parse("[a => b] | !(c <=> d) & e")
+        worker = TableWorker(TableGenerator(), tree, variables, chunk_size=5)
+        worker.start()
+        worker.join(timeout=10)
+        messages = worker.get_messages()
+        self.assertEqual([kind for kind, _ in messages],
+                         ["header"] + ["chunk"] * 7 + ["done"])
+        header, _, row_count = messages[0][1]
+        masks = [0] * len(header)
+        for i, (_, chunk) in enumerate(messages[1:-1]):
+            masks = [mask | chunk_mask << (5 * i)
+                     for mask, chunk_mask in zip(masks, chunk)]
+        self.assertEqual((header, masks),
+                         TableGenerator().generate_table_masks(tree, variables))
+        self.assertEqual(row_count, 32)
+
+    def test_cancel(self):
+        tree, variables, _ = self.parser.parse("a | b")
+        worker = TableWorker(TableGenerator(), tree, variables, chunk_size=1)
+        worker.cancel()
+        worker.start()
+        worker.join(timeout=10)
+        self.assertTrue(worker.is_cancelled())
+        self.assertEqual(worker.get_messages()[-1], ("cancelled", None))
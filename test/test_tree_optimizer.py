@@ -0,0 +1,67 @@
+import random
+import unittest
+from parser.expression_parser import ExpressionParser
+from parser.table_generator import TableGenerator
+
+
+class TreeOptimizer_Test(unittest.TestCase):
+    def setUp(self):
+        self.expression_parser = ExpressionParser(optimize=True)
+
+    def assertOptimizesTo(self, expression, expected):
+        tree, _, err = self.expression_parser.parse(expression)
+        self.assertIsNone(err)
+        expected_tree, _, _ = ExpressionParser().parse(expected)
+        self.assertEqual(repr(tree), repr(expected_tree))
+
+    def test_rules(self):
+        self.assertOptimizesTo("!!a", "a")
+        self.assertOptimizesTo("(((a))) & b", "a & b")
+        self.assertOptimizesTo("a & 1 | 0", "a")
+        self.assertOptimizesTo("1 => a", "a")
+        self.assertOptimizesTo("a => 0", "!a")
+        self.assertOptimizesTo("a <=> 0", "!a")
+        self.assertOptimizesTo("!(a & b) => 1", "1")
+        self.assertOptimizesTo("(b | c) & (b | c)", "b | c")
+        self.assertOptimizesTo("a & (a | b)", "a")
+        self.assertOptimizesTo("b | !b", "1")
+        self.assertOptimizesTo("0 & (a | b) | c", "c")
+
+    def test_captures_are_kept(self):
+        self.assertOptimizesTo("[a & 1] | 0", "[a]")
+        self.assertOptimizesTo("[a | b] & 0", "[a | b] & 0")
+        self.assertOptimizesTo("[a] | [a]", "[a] | [a]")
+        tree, variables, _ = self.expression_parser.parse("!![a & 1] | [b] & (c | 1)")
+        self.assertEqual(tree.get_expression_names(), ["a & 1", "b"])
+        header, _ = TableGenerator().generate_table_masks(tree, variables)
+        self.assertEqual(header, ["a", "b", "c", "a & 1", "b", "V"])
+
+    def test_matches_unoptimized_tables(self):
+        rng = random.Random(0)
+
+        def generate(depth):
+            if depth == 0 or rng.random() < 0.25:
+                return rng.choice(["a", "b", "c", "0", "1"])
+            if rng.random() < 0.3:
+                prefix, suffix = rng.choice([("!", ""), ("(", ")"), ("[", "]")])
+                return prefix + generate(depth - 1) + suffix
+            lhs = generate(depth - 1)
+            rhs = lhs if rng.random() < 0.2 else generate(depth - 1)
+            return f"({lhs} {rng.choice(['&', '|', '=>', '<=>'])} {rhs})"
+
+        plain_parser = ExpressionParser(cache_size=0)
+        table_generator = TableGenerator(cache_size=0)
+        for _ in range(500):
+            expression = generate(rng.randint(1, 5))
+            tree, variables, err = plain_parser.parse(expression)
+            if err:
+                continue
+            optimized_tree, optimized_variables, _ = self.expression_parser.parse(expression)
+            self.assertEqual(optimized_variables, variables)
+            self.assertEqual(
+                table_generator.generate_table_masks(optimized_tree, variables),
+                table_generator.generate_table_masks(tree, variables), expression)
+
+
+if __name__ == "__main__":
+    unittest.main()